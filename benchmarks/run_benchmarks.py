@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Benchmark the local hot paths of the generator on synthetic tag lists and
+compare the results against a committed baseline
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+from lightweight_versioned_gitlab_pages import details, generate
+
+HERE = Path(__file__).parent.resolve()
+BASELINE_FILE = HERE / 'baseline.json'
+CUSTOM_TEMPLATE = HERE.parent / 'tests' / 'data' / 'index.txt'
+# absolute tolerances of short runs and small memory peaks
+SLACK = {'time': 0.005, 'peak': 64 * 1024}
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse CLI arguments.
+
+    :return:    argparse object
+    """
+    parser = argparse.ArgumentParser(description="""
+    Benchmark rendering and serialization of versioned pages
+    """, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--sizes',
+                        nargs='+',
+                        type=int,
+                        default=[1000, 10000],
+                        help='Number of synthetic tags of each run')
+    parser.add_argument('--repeat',
+                        default=5,
+                        type=int,
+                        help='Number of timed runs, the fastest one is used')
+    parser.add_argument('--filter',
+                        default='',
+                        help='Only run benchmarks containing this string')
+    parser.add_argument('--baseline',
+                        default=BASELINE_FILE,
+                        type=Path,
+                        help='Baseline file to compare against')
+    parser.add_argument('--time-tolerance',
+                        default=0.5,
+                        type=float,
+                        help='Allowed relative time increase')
+    parser.add_argument('--memory-tolerance',
+                        default=0.1,
+                        type=float,
+                        help='Allowed relative memory peak increase')
+    parser.add_argument('--update-baseline',
+                        action='store_true',
+                        help='Save the results as new baseline')
+
+    return parser.parse_args()
+
+
+def create_tag_list(size: int) -> List[generate.TagInfo]:
+    """
+    Create a synthetic tag list.
+
+    :param      size:  The number of tags
+    :type       size:  int
+
+    :returns:   The tag list.
+    :rtype:     List[TagInfo]
+    """
+    web_url = 'https://gitlab.com/brainelectronics/lightweight-versioned-' \
+        'gitlab-pages'
+    pages_url = 'https://brainelectronics.gitlab.io/-/lightweight-versioned-' \
+        'gitlab-pages'
+    start = datetime(2023, 1, 1)
+    tag_list = []
+
+    for index in range(size):
+        name = '{}.{}.{}'.format(index // 10000, index // 100 % 100,
+                                 index % 100)
+        sha = '{:040x}'.format(index * 7919)
+        created_at = start + timedelta(minutes=index)
+        commit_attributes = {
+            'id': sha,
+            'short_id': sha[:8],
+            'title': 'Merge branch feature/{} into main'.format(index),
+            'author_name': 'brainelectronics',
+            'created_at': created_at.strftime('%Y-%m-%dT%H:%M:%S.000+00:00'),
+            'web_url': '{}/-/commit/{}'.format(web_url, sha),
+            'last_pipeline': {
+                'id': 700000000 + index,
+                'web_url': '{}/-/pipelines/{}'.format(web_url,
+                                                      700000000 + index),
+            },
+        }
+        tag_attributes = {
+            'name': name,
+            'message': '',
+            'target': sha,
+            'commit': dict(commit_attributes),
+        }
+        job_id = 3500000000 + index
+
+        tag_list.append(generate.TagInfo(
+            tag=SimpleNamespace(attributes=tag_attributes,
+                                **tag_attributes),
+            commit=SimpleNamespace(attributes=commit_attributes,
+                                   **commit_attributes),
+            created_at=created_at,
+            job_id=job_id,
+            pages_url=generate.get_artifact_url(
+                web_url=pages_url,
+                job_id=job_id,
+                folder='public',
+                index_file='index.html'
+            ),
+            job_ids=[{'pages': job_id}, {'deploy': job_id + 1}],
+            jobs={'pages': generate.JobInfo(job_id=job_id)}
+        ))
+
+    return tag_list
+
+
+def get_benchmarks(tag_list: List[generate.TagInfo],
+                   path: Path) -> Dict[str, Callable[[], Any]]:
+    """
+    Get all benchmarks.
+
+    :param      tag_list:  The tag list
+    :type       tag_list:  List[TagInfo]
+    :param      path:      The output folder
+    :type       path:      Path
+
+    :returns:   The benchmark functions by name.
+    :rtype:     Dict[str, Callable[[], Any]]
+    """
+    created_at = [x.tag.commit['created_at'] for x in tag_list]
+    pages_url = 'https://brainelectronics.gitlab.io/-/asdf'
+
+    return {
+        'create_html_files_default': lambda: generate.create_html_files(
+            tag_list=tag_list,
+            path=path
+        ),
+        'create_html_files_custom': lambda: generate.create_html_files(
+            tag_list=tag_list,
+            path=path,
+            template=CUSTOM_TEMPLATE
+        ),
+        'save_version_info_file_json': lambda: generate.save_version_info_file(
+            tag_list=tag_list,
+            file_path=path / 'versions.json'
+        ),
+        'save_version_info_file_ndjson_full': lambda:
+        generate.save_version_info_file(
+            tag_list=tag_list,
+            file_path=path / 'versions.ndjson',
+            versions_format='ndjson',
+            fields=generate.VERSION_INFO_FIELD_PRESETS['full']
+        ),
+        # all but the first run only compare the content hashes
+        'create_detail_pages_unchanged': lambda: details.create_detail_pages(
+            tag_list=tag_list,
+            path=path
+        ),
+        'get_artifact_url': lambda: [
+            generate.get_artifact_url(
+                web_url=pages_url,
+                job_id=x.job_id,
+                folder='public',
+                index_file='index.html'
+            ) for x in tag_list
+        ],
+        'parse_datetime': lambda: [
+            generate.parse_datetime(value=x) for x in created_at
+        ],
+    }
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Measure the fastest run time and the memory peak of a function.
+
+    :param      function:  The function
+    :type       function:  Callable[[], Any]
+    :param      repeat:    The number of timed runs
+    :type       repeat:    int
+
+    :returns:   The time in seconds and the memory peak in bytes.
+    :rtype:     Dict[str, float]
+    """
+    times = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+
+    # tracemalloc slows down the execution, measure memory separately
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'time': min(times), 'peak': peak}
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            time_tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """
+    Compare the results against the baseline.
+
+    :param      results:           The results
+    :type       results:           Dict[str, Dict[str, float]]
+    :param      baseline:          The baseline
+    :type       baseline:          Dict[str, Dict[str, float]]
+    :param      time_tolerance:    The allowed relative time increase
+    :type       time_tolerance:    float
+    :param      memory_tolerance:  The allowed relative memory increase
+    :type       memory_tolerance:  float
+
+    :returns:   Description of each regression.
+    :rtype:     List[str]
+    """
+    regressions = []
+    tolerances = {'time': time_tolerance, 'peak': memory_tolerance}
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        for key, tolerance in tolerances.items():
+            limit = max(baseline[name][key] * (1 + tolerance),
+                        baseline[name][key] + SLACK[key])
+            if result[key] > limit:
+                regressions.append('{} {}: {:.4g} > {:.4g} ({:+.0%})'.format(
+                    name, key, result[key], limit,
+                    result[key] / baseline[name][key] - 1
+                ))
+
+    return regressions
+
+
+def main() -> int:
+    args = parse_arguments()
+    results: Dict[str, Dict[str, float]] = {}
+
+    for size in args.sizes:
+        tag_list = create_tag_list(size=size)
+
+        with TemporaryDirectory() as tmp_dir:
+            benchmarks = get_benchmarks(tag_list=tag_list, path=Path(tmp_dir))
+
+            for name, function in benchmarks.items():
+                name = '{}[{}]'.format(name, size)
+                if args.filter not in name:
+                    continue
+
+                results[name] = measure(function=function, repeat=args.repeat)
+                print('{:<45} {:>10.4f} s {:>12,} B'.format(
+                    name, results[name]['time'], results[name]['peak']
+                ))
+
+    if args.update_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+        baseline.update(results)
+        args.baseline.write_text(
+            json.dumps(baseline, indent=4, sort_keys=True) + '\n'
+        )
+        return 0
+
+    if not args.baseline.exists():
+        return 0
+
+    regressions = compare(
+        results=results,
+        baseline=json.loads(args.baseline.read_text()),
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance
+    )
+    for regression in regressions:
+        print('Regression: {}'.format(regression), file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -136,7 +136,8 @@ setup(
     # https://packaging.python.org/discussions/install-requires-vs-requirements/
     install_requires=[
         "python-gitlab>=3,<4",
-        "jinja2>=3.1.0,<4"
+        "jinja2>=3.1.0,<4",
+        "requests>=2.25.0,<3"
     ],  # Optional
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
@@ -150,6 +151,9 @@ setup(
         "dev": [
             "tox>=3.25.1,<4"
         ],
+        "fast": [
+            "orjson>=3.6.0,<4"
+        ],
         "test": [
             "flake8>=5.0.0,<6",
             "mypy>=0.991,<1",
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Record and replay the GitLab API traffic of a run with a cassette file
+"""
+
+import base64
+import json
+import logging
+from collections import deque
+from io import BytesIO
+from pathlib import Path
+from requests import PreparedRequest, Response, Session
+from requests.exceptions import RequestException
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from threading import Lock
+from time import sleep
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+# response headers never written to a cassette
+IGNORED_HEADERS = ('set-cookie', )
+
+
+class CassetteError(RequestException):
+    """Raised if a request can not be served from a cassette"""
+    pass
+
+
+def encode_body(body: Union[bytes, str, None]) -> Dict[str, Optional[str]]:
+    """
+    Encode a request or response body to be stored in a cassette.
+
+    :param      body:  The body
+    :type       body:  Union[bytes, str, None]
+
+    :returns:   The body as text or base64 string and its encoding.
+    :rtype:     Dict[str, Optional[str]]
+    """
+    if body is None or isinstance(body, str):
+        return {'body': body, 'encoding': 'text'}
+
+    try:
+        return {'body': body.decode('utf-8'), 'encoding': 'text'}
+    except UnicodeDecodeError:
+        return {
+            'body': base64.b64encode(body).decode('ascii'),
+            'encoding': 'base64'
+        }
+
+
+def decode_body(data: Dict[str, Any]) -> bytes:
+    """
+    Decode a body stored in a cassette.
+
+    :param      data:  The body and its encoding
+    :type       data:  Dict[str, Any]
+
+    :returns:   The body.
+    :rtype:     bytes
+    """
+    if data.get('body') is None:
+        return b''
+    if data.get('encoding') == 'base64':
+        return base64.b64decode(data['body'])
+
+    return str(data['body']).encode('utf-8')
+
+
+def get_request_key(method: str,
+                    url: str,
+                    body: Optional[str]) -> Tuple[str, str, str]:
+    """
+    Get the key of a request to match it against the cassette.
+
+    :param      method:  The HTTP method
+    :type       method:  str
+    :param      url:     The full url including the query
+    :type       url:     str
+    :param      body:    The encoded request body
+    :type       body:    Optional[str]
+
+    :returns:   The request key.
+    :rtype:     Tuple[str, str, str]
+    """
+    return (method.upper(), url, body or '')
+
+
+def dump_response(response: Response) -> Dict[str, Any]:
+    """
+    Get the status code, reason, headers and encoded body of a response.
+
+    The complete content is read, a streamed response iterates over it
+    afterwards.
+
+    :param      response:  The response
+    :type       response:  Response
+
+    :returns:   The response data.
+    :rtype:     Dict[str, Any]
+    """
+    content = response.content
+
+    return dict(
+        status_code=response.status_code,
+        reason=response.reason,
+        headers={
+            k: v for k, v in response.headers.items()
+            if k.lower() not in IGNORED_HEADERS
+        },
+        **encode_body(content)
+    )
+
+
+def build_response(request: PreparedRequest, data: Dict[str, Any]) -> Response:
+    """
+    Build the response of a request from a stored response.
+
+    :param      request:  The request
+    :type       request:  PreparedRequest
+    :param      data:     The status code, reason, headers and encoded body
+    :type       data:     Dict[str, Any]
+
+    :returns:   The response.
+    :rtype:     Response
+    """
+    content = decode_body(data)
+    response = Response()
+    response.status_code = data['status_code']
+    response.reason = data.get('reason', '')
+    response.headers = CaseInsensitiveDict(data.get('headers', {}))
+    response.url = request.url or ''
+    response.request = request
+    response.raw = BytesIO(content)
+    response._content = content
+    response._content_consumed = True  # type: ignore[attr-defined]
+    response.encoding = get_encoding_from_headers(response.headers)
+
+    return response
+
+
+class RecordingSession(Session):
+    """
+    Session recording all requests and responses.
+
+    Only the method, URL and body of a request are recorded, request headers
+    like the private token are never written to the cassette.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = Lock()
+        self.interactions: List[Dict[str, Any]] = []
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        response = super().send(request, **kwargs)
+
+        interaction = {
+            'request': dict(
+                method=request.method,
+                url=request.url,
+                **encode_body(request.body)
+            ),
+            'response': dump_response(response=response),
+        }
+
+        with self._lock:
+            self.interactions.append(interaction)
+
+        return response
+
+    def save(self, path: Path) -> None:
+        """
+        Save all recorded interactions to a cassette file.
+
+        :param      path:  The path to the cassette file
+        :type       path:  Path
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            content = {
+                'version': CASSETTE_VERSION,
+                'interactions': self.interactions,
+            }
+            path.write_text(json.dumps(content, indent=2) + '\n')
+
+        logger.info('Recorded {} requests to {}'.format(
+            len(self.interactions), path
+        ))
+
+
+class ReplaySession(Session):
+    """
+    Session serving all responses from a cassette without network access.
+
+    Requests are matched by method, URL and body. Repeated requests are served
+    in the recorded order, a request not or no longer in the cassette raises
+    a CassetteError.
+    """
+
+    def __init__(self, path: Path, latency: float = 0.0) -> None:
+        """
+        Load the interactions of a cassette file.
+
+        :param      path:     The path to the cassette file
+        :type       path:     Path
+        :param      latency:  The injected delay of each response in seconds
+        :type       latency:  float
+        :raise      CassetteError:  The cassette version is not supported
+        """
+        super().__init__()
+        content = json.loads(path.read_text())
+
+        if content.get('version') != CASSETTE_VERSION:
+            raise CassetteError('Unsupported cassette version {}'.format(
+                content.get('version')
+            ))
+
+        self._lock = Lock()
+        self._latency = latency
+        self._responses: Dict[Tuple[str, str, str],
+                              Deque[Dict[str, Any]]] = {}
+
+        for interaction in content['interactions']:
+            request = interaction['request']
+            key = get_request_key(
+                method=request['method'],
+                url=request['url'],
+                body=request.get('body')
+            )
+            self._responses.setdefault(key, deque()).append(
+                interaction['response']
+            )
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        key = get_request_key(
+            method=request.method or 'GET',
+            url=request.url or '',
+            body=encode_body(request.body)['body']
+        )
+
+        with self._lock:
+            recorded = self._responses.get(key)
+            data = recorded.popleft() if recorded else None
+
+        if data is None:
+            raise CassetteError('{} {} not found in cassette'.format(
+                key[0], key[1]
+            ), request=request)
+
+        if self._latency > 0:
+            sleep(self._latency)
+
+        return build_response(request=request, data=data)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Coalesce identical API requests of tags sharing a commit or pipeline
+"""
+
+from concurrent.futures import Future
+from gitlab.base import RESTObject
+from gitlab.v4.objects.commits import ProjectCommit
+from gitlab.v4.objects.projects import Project
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, TypeVar, cast
+
+from .raw import list_pipeline_job_data
+
+T = TypeVar('T')
+
+
+class SingleFlight(object):
+    """
+    Share one call and its result between all callers of the same key.
+
+    A caller of a key already in flight waits for the running call instead of
+    making its own. Results are kept, a failed call is retried by the next
+    caller.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._futures: Dict[Hashable, 'Future[Any]'] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Call the function once per key and return its result.
+
+        :param      key:       The key
+        :type       key:       Hashable
+        :param      function:  The function
+        :type       function:  Callable[[], T]
+
+        :returns:   The result of the only call of the key.
+        :rtype:     T
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+
+            if future is None:
+                future = Future()
+                self._futures[key] = future
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if owner:
+            try:
+                future.set_result(function())
+            except BaseException as e:
+                future.set_exception(e)
+                with self._lock:
+                    del self._futures[key]
+
+        return cast(T, future.result())
+
+
+class RequestCoalescer(object):
+    """
+    Memoize the commit and the pipeline jobs lookups of a run.
+
+    Tags of the same commit share one commit request, tags of the same
+    pipeline one pipeline and job listing.
+    """
+
+    def __init__(self) -> None:
+        self._commits = SingleFlight()
+        self._pipelines = SingleFlight()
+
+    def get_commit(self, project: Project, sha: str) -> ProjectCommit:
+        """
+        Get a commit of the project.
+
+        :param      project:  The project
+        :type       project:  Project
+        :param      sha:      The commit SHA
+        :type       sha:      str
+
+        :returns:   The commit.
+        :rtype:     ProjectCommit
+        """
+        return self._commits.do(
+            key=sha,
+            function=lambda: project.commits.get(sha)
+        )
+
+    def get_pipeline_jobs(self,
+                          project: Project,
+                          pipeline_id: int) -> List[RESTObject]:
+        """
+        Get all jobs of a pipeline of the project.
+
+        :param      project:      The project
+        :type       project:      Project
+        :param      pipeline_id:  The pipeline identifier
+        :type       pipeline_id:  int
+
+        :returns:   The pipeline jobs.
+        :rtype:     List[RESTObject]
+        """
+        def list_jobs() -> List[RESTObject]:
+            pipeline = project.pipelines.get(pipeline_id)
+            return list(pipeline.jobs.list(all=True, as_list=False))
+
+        return self._pipelines.do(key=pipeline_id, function=list_jobs)
+
+    def get_pipeline_job_data(self,
+                              project: Project,
+                              pipeline_id: int) -> List[Dict[str, Any]]:
+        """
+        Get all jobs of a pipeline of the project as plain JSON.
+
+        :param      project:      The project
+        :type       project:      Project
+        :param      pipeline_id:  The pipeline identifier
+        :type       pipeline_id:  int
+
+        :returns:   The pipeline job data.
+        :rtype:     List[Dict[str, Any]]
+        """
+        return self._pipelines.do(
+            key=('data', pipeline_id),
+            function=lambda: list_pipeline_job_data(
+                project=project,
+                pipeline_id=pipeline_id
+            )
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of made and of avoided duplicate lookups.
+
+        :returns:   Number of commit and pipeline lookups and coalesced ones.
+        :rtype:     Dict[str, int]
+        """
+        return {
+            'commits': self._commits.calls,
+            'pipelines': self._pipelines.calls,
+            'coalesced': self._commits.coalesced + self._pipelines.coalesced,
+        }
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Deduplicate identical files of the mirrored versions with a content-addressed
+store
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from urllib.parse import quote, unquote
+
+from .mirror import STORE_FOLDER
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MODES: Tuple[str, ...] = ('hardlink', 'rewrite')
+# files with references relative to their own location, never moved
+LINKED_SUFFIXES: Tuple[str, ...] = ('.html', '.htm', '.css')
+REFERENCE_PATTERN = re.compile(
+    rb'((?:href|src)\s*=\s*["\']|url\(\s*["\']?)([^"\'()#?\s]+)'
+)
+# comma separated image candidates of "<img srcset>" and "<source srcset>",
+# each an URL optionally followed by a width or density descriptor
+SRCSET_PATTERN = re.compile(rb'(srcset\s*=\s*)(["\'])([^"\']*)\2')
+CANDIDATE_PATTERN = re.compile(rb'(^|,)(\s*)([^\s,#?]+)')
+# characters of a path in front of a file name in any context
+PATH_PATTERN = rb'[^"\'()\s,<>=]*'
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """
+    Get the SHA256 hash of a file.
+
+    :param      path:  The path to the file
+    :type       path:  Path
+
+    :returns:   The hex digest of the file content.
+    :rtype:     str
+    """
+    sha256 = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def get_file_hashes(paths: List[Path], workers: int) -> Dict[Path, str]:
+    """
+    Hash all files concurrently, hardlinked files are only hashed once.
+
+    :param      paths:    The file paths
+    :type       paths:    List[Path]
+    :param      workers:  The number of concurrently hashed files
+    :type       workers:  int
+
+    :returns:   The hash of each file.
+    :rtype:     Dict[Path, str]
+    """
+    inodes: Dict[Tuple[int, int], List[Path]] = {}
+
+    for path in paths:
+        stat = path.stat()
+        inodes.setdefault((stat.st_dev, stat.st_ino), []).append(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = executor.map(hash_file, [x[0] for x in inodes.values()])
+
+        return {
+            path: digest
+            for linked, digest in zip(inodes.values(), digests)
+            for path in linked
+        }
+
+
+def get_store_path(store: Path, digest: str, suffix: str) -> Path:
+    """
+    Get the path of a content in the store.
+
+    :param      store:   The store folder
+    :type       store:   Path
+    :param      digest:  The hash of the content
+    :type       digest:  str
+    :param      suffix:  The file suffix, kept to serve the correct MIME type
+    :type       suffix:  str
+
+    :returns:   The store path.
+    :rtype:     Path
+    """
+    return store / digest[:2] / '{}{}'.format(digest, suffix)
+
+
+def link_duplicates(groups: Dict[Tuple[str, str], List[Path]],
+                    store: Path) -> int:
+    """
+    Replace all duplicates by hardlinks to the store.
+
+    :param      groups:  The files of each hash and suffix
+    :type       groups:  Dict[Tuple[str, str], List[Path]]
+    :param      store:   The store folder
+    :type       store:   Path
+
+    :returns:   Number of saved bytes.
+    :rtype:     int
+    """
+    saved = 0
+
+    for (digest, suffix), files in groups.items():
+        store_path = get_store_path(store=store, digest=digest, suffix=suffix)
+
+        if not store_path.exists():
+            if len(files) < 2:
+                continue
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            os.link(files[0], store_path)
+
+        for path in files:
+            if path.samefile(store_path):
+                continue
+
+            tmp_path = path.with_name('.{}.dedup'.format(path.name))
+            os.link(store_path, tmp_path)
+            saved += path.stat().st_size
+            os.replace(tmp_path, path)
+
+    # remove content no longer linked by any version
+    for store_path in store.glob('*/*'):
+        if store_path.stat().st_nlink == 1:
+            store_path.unlink()
+
+    return saved
+
+
+def rewrite_references(path: Path,
+                       duplicates: Dict[str, Path],
+                       referenced: Set[str]) -> Set[str]:
+    """
+    Rewrite the references of a HTML or CSS file to duplicates to the store.
+
+    A rewritten file is replaced by a new file, hardlinks of it are kept
+    unchanged.
+
+    :param      path:        The path to the HTML or CSS file
+    :type       path:        Path
+    :param      duplicates:  The store path of each duplicate
+    :type       duplicates:  Dict[str, Path]
+    :param      referenced:  Store paths referenced by any file, extended
+    :type       referenced:  Set[str]
+
+    :returns:   The rewritten duplicates.
+    :rtype:     Set[str]
+    """
+    rewritten: Set[str] = set()
+    folder = path.parent
+    content = path.read_bytes()
+
+    def rewrite(reference: bytes) -> bytes:
+        url = os.fsdecode(reference)
+        if ':' in url or url.startswith('/'):
+            return reference
+
+        target = os.path.normpath(folder / unquote(url))
+        if target in duplicates:
+            rewritten.add(target)
+            target = str(duplicates[target])
+            url = quote(Path(os.path.relpath(target, folder)).as_posix())
+        referenced.add(target)
+
+        return os.fsencode(url)
+
+    def replace(match: 're.Match[bytes]') -> bytes:
+        return match.group(1) + rewrite(reference=match.group(2))
+
+    def replace_candidate(match: 're.Match[bytes]') -> bytes:
+        return match.group(1) + match.group(2) + \
+            rewrite(reference=match.group(3))
+
+    def replace_srcset(match: 're.Match[bytes]') -> bytes:
+        return match.group(1) + match.group(2) + \
+            CANDIDATE_PATTERN.sub(replace_candidate, match.group(3)) + \
+            match.group(2)
+
+    new_content = REFERENCE_PATTERN.sub(replace, content)
+    new_content = SRCSET_PATTERN.sub(replace_srcset, new_content)
+    if new_content != content:
+        # the file may be hardlinked to the store and other versions by the
+        # "hardlink" mode, a new file breaks the link instead of writing
+        # through it
+        tmp_path = path.with_name('.{}.dedup'.format(path.name))
+        tmp_path.write_bytes(new_content)
+        os.replace(tmp_path, path)
+
+    return rewritten
+
+
+def get_name_pattern(names: Set[str]) -> 're.Pattern[bytes]':
+    """
+    Get the pattern of a path to a file of any of the given names.
+
+    :param      names:  The file names, at least one
+    :type       names:  Set[str]
+
+    :returns:   The pattern of plain and URL quoted names with a leading path.
+    :rtype:     re.Pattern[bytes]
+    """
+    alternatives = sorted(
+        {re.escape(os.fsencode(x)) for x in names} |
+        {re.escape(quote(x).encode()) for x in names},
+        key=len,
+        reverse=True
+    )
+
+    return re.compile(
+        PATH_PATTERN + rb'(?:' + rb'|'.join(alternatives) + rb')(?![\w.%-])'
+    )
+
+
+def find_references(path: Path, pattern: 're.Pattern[bytes]') -> Set[str]:
+    """
+    Find the paths of all references matching a name pattern in a HTML or CSS
+    file, including references not rewritten, e.g. of "data" or "poster"
+    attributes.
+
+    :param      path:     The path to the HTML or CSS file
+    :type       path:     Path
+    :param      pattern:  The pattern of the referenced paths
+    :type       pattern:  re.Pattern[bytes]
+
+    :returns:   The normalized paths of the references relative to the file.
+    :rtype:     Set[str]
+    """
+    found: Set[str] = set()
+
+    for match in pattern.finditer(path.read_bytes()):
+        url = os.fsdecode(match.group(0))
+        if ':' not in url and not url.startswith('/'):
+            found.add(os.path.normpath(path.parent / unquote(url)))
+
+    return found
+
+
+def rewrite_duplicates(path: Path,
+                       groups: Dict[Tuple[str, str], List[Path]],
+                       store: Path) -> int:
+    """
+    Move duplicates to the store and rewrite the references to them.
+
+    Only duplicates referenced by a HTML or CSS file are removed, HTML and CSS
+    files themselves are never moved. Duplicates with any reference left after
+    the rewrite, like a script or an attribute not rewritten, are kept.
+
+    :param      path:    The versions folder
+    :type       path:    Path
+    :param      groups:  The files of each hash and suffix
+    :type       groups:  Dict[Tuple[str, str], List[Path]]
+    :param      store:   The store folder
+    :type       store:   Path
+
+    :returns:   Number of saved bytes.
+    :rtype:     int
+    """
+    duplicates: Dict[str, Path] = {}
+    referenced: Set[str] = set()
+    rewritten: Set[str] = set()
+    saved = 0
+
+    for (digest, suffix), files in groups.items():
+        store_path = get_store_path(store=store, digest=digest, suffix=suffix)
+
+        if suffix.lower() in LINKED_SUFFIXES or \
+                (len(files) < 2 and not store_path.exists()):
+            continue
+
+        if not store_path.exists():
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(files[0], store_path)
+
+        for file in files:
+            duplicates[os.path.normpath(file)] = store_path
+
+    linked = [
+        x for x in path.rglob('*')
+        if x.suffix.lower() in LINKED_SUFFIXES and x.is_file() and
+        STORE_FOLDER not in x.relative_to(path).parts
+    ]
+
+    for file in linked:
+        rewritten |= rewrite_references(
+            path=file,
+            duplicates=duplicates,
+            referenced=referenced
+        )
+
+    # keep duplicates still referenced in a way not rewritten
+    if rewritten:
+        pattern = get_name_pattern(
+            names={os.path.basename(x) for x in rewritten}
+        )
+        for file in linked:
+            kept = rewritten & find_references(path=file, pattern=pattern)
+            for duplicate in kept:
+                logger.debug('Keeping {} referenced by {}'.format(duplicate,
+                                                                  file))
+            rewritten -= kept
+
+    for duplicate in rewritten:
+        saved += os.path.getsize(duplicate)
+        os.remove(duplicate)
+
+    # remove content no longer referenced by any version
+    for store_path in store.glob('*/*'):
+        if os.path.normpath(store_path) not in referenced:
+            store_path.unlink()
+
+    return saved
+
+
+def deduplicate_versions(path: Path,
+                         mode: str = 'hardlink',
+                         workers: int = 4) -> Dict[str, int]:
+    """
+    Deduplicate identical files of the mirrored versions.
+
+    The content of identical files is kept once in a content-addressed store.
+    In "hardlink" mode each duplicate is replaced by a hardlink to the store.
+    As hardlinks are not preserved by the job artifacts archive, the
+    "rewrite" mode removes duplicates and rewrites the references of HTML and
+    CSS files to the store instead.
+
+    :param      path:     The versions folder
+    :type       path:     Path
+    :param      mode:     The mode, one of DEDUP_MODES
+    :type       mode:     str
+    :param      workers:  The number of concurrently hashed files
+    :type       workers:  int
+
+    :returns:   Number of files, hashed contents and saved bytes.
+    :rtype:     Dict[str, int]
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError("Unknown dedup mode '{}'".format(mode))
+
+    path = path.resolve()
+    store = path / STORE_FOLDER
+    files = [
+        x for x in path.rglob('*')
+        if x.is_file() and not x.is_symlink() and
+        STORE_FOLDER not in x.relative_to(path).parts
+    ]
+    groups: Dict[Tuple[str, str], List[Path]] = {}
+
+    for file, digest in get_file_hashes(paths=files, workers=workers).items():
+        groups.setdefault((digest, file.suffix), []).append(file)
+
+    if mode == 'hardlink':
+        saved = link_duplicates(groups=groups, store=store)
+    else:
+        saved = rewrite_duplicates(path=path, groups=groups, store=store)
+
+    result = {
+        'files': len(files),
+        'contents': len(groups),
+        'bytes_saved': saved,
+    }
+    logger.info('Deduplicated versions: {}'.format(result))
+
+    return result
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Create a detail page of each tag listing all jobs of its pipeline
+"""
+
+import hashlib
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from re import sub
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from jinja2 import Environment
+
+from .fingerprint import hash_files
+from .generate import (TEMPLATE_FOLDER, TagInfo, get_template_file,
+                       save_file)
+from .mirror import VERSIONS_FOLDER, get_version_folder_name
+from .version import __version__
+
+logger = logging.getLogger(__name__)
+
+DETAILS_TEMPLATE = 'version.html'
+# content hash of each detail page, kept in the output folder
+DETAILS_FILE = '.details.json'
+
+# environment of each template folder of a render process
+_environments: Dict[Path, Environment] = {}
+
+
+def get_detail_page_name(tag_name: str) -> str:
+    """
+    Get the file name of the detail page of a tag.
+
+    :param      tag_name:  The tag name
+    :type       tag_name:  str
+
+    :returns:   The file name.
+    :rtype:     str
+    """
+    return get_version_folder_name(tag_name=tag_name) + '.html'
+
+
+def get_relative_url(url: str) -> str:
+    """
+    Get a URL relative to the output folder as seen from a detail page.
+
+    :param      url:  The absolute URL or path relative to the output folder
+    :type       url:  str
+
+    :returns:   The URL.
+    :rtype:     str
+    """
+    if not url or '://' in url:
+        return url
+
+    return '../' + url
+
+
+def get_detail_context(tag: TagInfo, project_url: str) -> Dict[str, Any]:
+    """
+    Get the plain data of the detail page of a tag.
+
+    The data is picklable to be rendered by another process and identifies
+    the content of the page.
+
+    :param      tag:          The tag
+    :type       tag:          TagInfo
+    :param      project_url:  The web URL of the project
+    :type       project_url:  str
+
+    :returns:   The template data of the tag.
+    :rtype:     Dict[str, Any]
+    """
+    commit = tag.commit.attributes
+    pipeline = commit.get('last_pipeline') or {}
+    pages_urls = {
+        x.job_id: x.pages_url for x in tag.jobs.values() if x.job_id != -1
+    }
+    jobs = []
+
+    for job in tag.job_ids:
+        for name, job_id in job.items():
+            jobs.append({
+                'id': job_id,
+                'name': name,
+                'status': tag.job_statuses.get(job_id, ''),
+                'web_url': '{}/-/jobs/{}'.format(project_url, job_id),
+                'artifacts_url': '{}/-/jobs/{}/artifacts/browse'.format(
+                    project_url, job_id
+                ),
+                'pages_url': get_relative_url(url=pages_urls.get(job_id, '')),
+            })
+
+    return {
+        'name': tag.tag.name,
+        'tag_url': '{}/-/tags/{}'.format(project_url,
+                                         quote(tag.tag.name, safe='')),
+        'created_at': tag.created_at,
+        'pages_url': get_relative_url(url=tag.pages_url)
+        if tag.job_id != -1 else '',
+        'commit': {
+            x: commit.get(x) or ''
+            for x in ('id', 'short_id', 'title', 'author_name', 'web_url')
+        },
+        'pipeline': {
+            x: pipeline.get(x) for x in ('id', 'status', 'ref', 'web_url')
+        } if pipeline else {},
+        'jobs': jobs,
+    }
+
+
+def get_content_hash(context: Dict[str, Any], template_hash: str) -> str:
+    """
+    Get the hash of the content of a detail page.
+
+    :param      context:        The template data of the tag
+    :type       context:        Dict[str, Any]
+    :param      template_hash:  The hash of the template file
+    :type       template_hash:  str
+
+    :returns:   The hex digest.
+    :rtype:     str
+    """
+    content = json.dumps([__version__, template_hash, context],
+                         sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def render_detail_pages(pages: List[Tuple[Path, Dict[str, Any]]],
+                        template: Optional[Path] = None) -> None:
+    """
+    Render and save detail pages, the template is loaded once per process.
+
+    :param      pages:     The file path and template data of each page
+    :type       pages:     List[Tuple[Path, Dict[str, Any]]]
+    :param      template:  Path to custom template file
+    :type       template:  Optional[Path]
+    """
+    page_template = get_template_file(
+        file_name=template.name if template else DETAILS_TEMPLATE,
+        template_folder=template.parent if template else None,
+        environments=_environments
+    )
+
+    for file_path, context in pages:
+        save_file(content=page_template.render(tag=context), path=file_path)
+
+
+def load_content_hashes(path: Path) -> Dict[str, str]:
+    """
+    Load the content hash of each detail page of the last run.
+
+    :param      path:  The path to the content hash file
+    :type       path:  Path
+
+    :returns:   The content hash by page file name.
+    :rtype:     Dict[str, str]
+    """
+    try:
+        hashes = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    return hashes if isinstance(hashes, dict) else {}
+
+
+def create_detail_pages(tag_list: List[TagInfo],
+                        path: Path,
+                        template: Optional[Path] = None,
+                        workers: int = 4,
+                        deadline: Optional[float] = None) -> Dict[str, int]:
+    """
+    Create the detail page "versions/<tag>.html" of each tag.
+
+    Only pages of new or changed tags are rendered, spread over a pool of
+    processes. Pending tags keep the page of the last run, pages of no longer
+    existing tags are removed. The details URL of each tag is set to its page.
+    After the deadline no page is rendered, changed tags keep the page of the
+    last run like pending tags.
+
+    :param      tag_list:  The tag list
+    :type       tag_list:  List[TagInfo]
+    :param      path:      The path to the output folder
+    :type       path:      Path
+    :param      template:  Path to custom template file
+    :type       template:  Optional[Path]
+    :param      workers:   The number of render processes
+    :type       workers:   int
+    :param      deadline:  The deadline as monotonic time in seconds
+    :type       deadline:  Optional[float]
+
+    :returns:   Number of rendered, unchanged, deferred and removed pages.
+    :rtype:     Dict[str, int]
+    """
+    versions_path = path / VERSIONS_FOLDER
+    hashes_path = path / DETAILS_FILE
+    previous = load_content_hashes(path=hashes_path)
+    template_hash = hash_files(
+        paths=[template or TEMPLATE_FOLDER / DETAILS_TEMPLATE]
+    )[0]
+    hashes: Dict[str, str] = {}
+    pages: List[Tuple[Path, Dict[str, Any]]] = []
+    result = {'rendered': 0, 'unchanged': 0, 'deferred': 0, 'removed': 0}
+    expired = deadline is not None and monotonic() > deadline
+
+    for tag in tag_list:
+        name = get_detail_page_name(tag_name=tag.tag.name)
+        details_url = '{}/{}'.format(VERSIONS_FOLDER, quote(name))
+
+        if tag.pending:
+            if name in previous and (versions_path / name).is_file():
+                hashes[name] = previous[name]
+                tag.details_url = details_url
+            continue
+
+        project_url = sub(pattern=r'\/-\/commit\/.*',
+                          repl='',
+                          string=tag.commit.web_url)
+        context = get_detail_context(tag=tag, project_url=project_url)
+        hashes[name] = get_content_hash(context=context,
+                                        template_hash=template_hash)
+        tag.details_url = details_url
+
+        if previous.get(name) == hashes[name] and \
+                (versions_path / name).is_file():
+            result['unchanged'] += 1
+        elif expired:
+            result['deferred'] += 1
+            if name in previous and (versions_path / name).is_file():
+                hashes[name] = previous[name]
+            else:
+                del hashes[name]
+                tag.details_url = ''
+        else:
+            pages.append((versions_path / name, context))
+
+    for name in previous:
+        if name not in hashes and (versions_path / name).is_file():
+            (versions_path / name).unlink()
+            result['removed'] += 1
+
+    # a few chunks per process keep the processes busy with less overhead
+    size = max(1, -(-len(pages) // (max(workers, 1) * 4)))
+    chunks = [pages[x:x + size] for x in range(0, len(pages), size)]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(render_detail_pages, chunks, repeat(template)))
+    else:
+        for chunk in chunks:
+            render_detail_pages(pages=chunk, template=template)
+
+    result['rendered'] = len(pages)
+    save_file(content=json.dumps(hashes, indent=2, sort_keys=True) + '\n',
+              path=hashes_path)
+    logger.info('Detail pages: {}'.format(result))
+
+    return result
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Skip runs of an unchanged tag set by a fingerprint of the latest tags
+"""
+
+import hashlib
+import json
+import logging
+from gitlab.v4.objects.projects import Project
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from .version import __version__
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .generate import TagInfo
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_FILE = '.fingerprint'
+# pipeline states without further changes of its jobs and artifacts
+FINISHED_PIPELINE_STATUSES = ('success', 'failed', 'canceled', 'skipped',
+                              'manual')
+
+
+def get_fingerprint(project: Project,
+                    config: Dict[str, Any],
+                    page_size: int = 20) -> Optional[str]:
+    """
+    Get the fingerprint of the tag set and the configuration of a run.
+
+    Only the first page of the most recently updated tags is requested. The
+    fingerprint changes with the total number of tags, the name and commit of
+    the latest tags, the configuration and the package version.
+
+    A deleted older tag is only detected by the total number of tags. GitLab
+    omits the total for large collections, without it there is no
+    fingerprint and the tag set is taken as changed.
+
+    :param      project:    The project
+    :type       project:    Project
+    :param      config:     The configuration affecting the output, JSON
+                            serializable
+    :type       config:     Dict[str, Any]
+    :param      page_size:  The number of latest tags
+    :type       page_size:  int
+
+    :returns:   The hex digest of the fingerprint, None if the total number
+                of tags is unknown.
+    :rtype:     Optional[str]
+    """
+    # the default order of the API is not part of its contract
+    tags = project.tags.list(as_list=False,
+                             per_page=page_size,
+                             order_by='updated',
+                             sort='desc')
+    total = getattr(tags, 'total', None)
+
+    if total is None:
+        logger.info('Total number of tags unknown, no fingerprint')
+        return None
+
+    data = {
+        'version': __version__,
+        'config': config,
+        'total': total,
+        'tags': [
+            [x.name, x.attributes['commit']['id']]
+            for x in islice(tags, page_size)
+        ],
+    }
+    content = json.dumps(data, sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def hash_files(paths: List[Path]) -> List[str]:
+    """
+    Get the SHA256 hash of the content of each file.
+
+    :param      paths:  The file paths
+    :type       paths:  List[Path]
+
+    :returns:   The hex digest of each file.
+    :rtype:     List[str]
+    """
+    return [hashlib.sha256(x.read_bytes()).hexdigest() for x in paths]
+
+
+def load_fingerprint(path: Path) -> Optional[str]:
+    """
+    Load the fingerprint of the last complete run.
+
+    :param      path:  The path to the fingerprint file
+    :type       path:  Path
+
+    :returns:   The fingerprint, None if there is none.
+    :rtype:     Optional[str]
+    """
+    try:
+        return path.read_text().strip() or None
+    except OSError:
+        return None
+
+
+def save_fingerprint(path: Path, fingerprint: Optional[str]) -> None:
+    """
+    Save the fingerprint of a run, an existing one is removed if None.
+
+    :param      path:         The path to the fingerprint file
+    :type       path:         Path
+    :param      fingerprint:  The fingerprint
+    :type       fingerprint:  Optional[str]
+    """
+    if fingerprint is None:
+        if path.exists():
+            path.unlink()
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(fingerprint + '\n')
+
+
+def is_complete(tag_list: List['TagInfo']) -> bool:
+    """
+    Determine whether the result of a run is final for its tag set.
+
+    A run with pending tags or with a pipeline of any tag not yet finished,
+    e.g. a retried pipeline of an older tag, has to be repeated even without
+    a new tag.
+
+    :param      tag_list:  The tag list
+    :type       tag_list:  List[TagInfo]
+
+    :returns:   True if complete, False otherwise.
+    :rtype:     bool
+    """
+    for tag in tag_list:
+        if tag.pending:
+            return False
+
+        pipeline = tag.commit.attributes.get('last_pipeline') or {}
+        if pipeline and \
+                pipeline.get('status') not in FINISHED_PIPELINE_STATUSES:
+            return False
+
+    return True
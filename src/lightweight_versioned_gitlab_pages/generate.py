@@ -9,21 +9,66 @@ build
 import argparse
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from re import sub
 from gitlab import Gitlab
+from gitlab.base import RESTObject
+from gitlab.exceptions import GitlabError
 from gitlab.v4.objects.commits import ProjectCommit
 from gitlab.v4.objects.projects import Project
 from gitlab.v4.objects.tags import ProjectTag
 from jinja2 import Environment, FileSystemLoader
 from jinja2.environment import Template
+from requests import Session
 from sys import stdout
-from datetime import datetime
+from time import monotonic
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
-
+from typing import (Any, Dict, Iterable, List, Optional, Sequence, Tuple,
+                    Union)
+
+from .cassette import RecordingSession, ReplaySession
+from .coalesce import RequestCoalescer
+from .dedup import DEDUP_MODES, deduplicate_versions
+from .fingerprint import (FINGERPRINT_FILE, hash_files, is_complete,
+                          load_fingerprint, save_fingerprint)
+from .graphql import GraphQLError, get_tag_pipelines, parse_global_id
+from .httpcache import ResponseCache
+from .mirror import VERSIONS_FOLDER
+from .raw import list_tag_data
 from .version import __version__
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+    HAS_ORJSON = False
+
+TEMPLATE_FOLDER = Path(__file__).parent / 'templates'
+BACKENDS: Tuple[str, ...] = ('rest', 'graphql')
+VERSIONS_FORMATS: Tuple[str, ...] = ('json', 'ndjson', 'compact')
+VERSIONS_FILE_NAMES: Dict[str, str] = {
+    'json': 'versions.json',
+    'ndjson': 'versions.ndjson',
+    'compact': 'versions.json',
+}
+# "*" expands to all attributes of the GitLab ProjectTag
+VERSION_INFO_FIELD_PRESETS: Dict[str, Tuple[str, ...]] = {
+    'minimal': (
+        'name', 'created_at', 'commit_id', 'pipeline', 'job_id', 'pages_url',
+        'available', 'pending', 'jobs'
+    ),
+    'full': (
+        '*', 'pages_url', 'job_id', 'available', 'pending', 'jobs',
+        'commit_info'
+    ),
+}
+# exit code of a run with pending tags, see "--partial-exit-code"
+PARTIAL_EXIT_CODE = 3
+# minimum timeout of an API request after the deadline passed
+MIN_TIMEOUT = 1.0
+
 
 def parse_arguments() -> argparse.Namespace:
     """
@@ -62,9 +107,67 @@ def parse_arguments() -> argparse.Namespace:
                         required=True,
                         help='Project ID')
     parser.add_argument('--job-name',
-                        default=None,
+                        action='append',
                         required=True,
-                        help='Job name which generated the public folder')
+                        help='Job name which generated the public folder, '
+                        'can be given multiple times, the first job is used '
+                        'for the version links')
+    parser.add_argument('--artifact-folder',
+                        action='append',
+                        help='Artifact folder of the n-th job, defaults to '
+                        '"public"')
+    parser.add_argument('--index-file',
+                        action='append',
+                        help='Index file in the artifact folder of the n-th '
+                        'job, defaults to "index.html"')
+    parser.add_argument('--backend',
+                        default='rest',
+                        choices=BACKENDS,
+                        help='GitLab API used to fetch tags, pipelines and '
+                        'jobs, "graphql" falls back to "rest" if unsupported')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record',
+                                default=None,
+                                type=Path,
+                                help='Record all GitLab API requests and '
+                                'responses to this cassette file')
+    cassette_group.add_argument('--replay',
+                                default=None,
+                                type=lambda x: parser_valid_file(
+                                    parser=parser, arg=x),
+                                help='Serve all GitLab API requests from this '
+                                'cassette file without network access')
+    parser.add_argument('--replay-latency',
+                        default=0.0,
+                        type=float,
+                        help='Injected delay of each replayed response in '
+                        'seconds')
+    parser.add_argument('--fetch-workers',
+                        default=1,
+                        type=int,
+                        help='Number of tags resolved concurrently with the '
+                        'REST API')
+    parser.add_argument('--raw-json',
+                        action='store_true',
+                        help='Use the tag and job listings of the REST API as '
+                        'plain JSON without creating python-gitlab objects')
+    parser.add_argument('--http-cache',
+                        default=None,
+                        type=Path,
+                        help='Folder of the cached GitLab API responses, '
+                        'revalidated by conditional requests')
+    parser.add_argument('--http-cache-size',
+                        default=100,
+                        type=int,
+                        help='Maximum size of the HTTP cache in MiB, the '
+                        'least recently used responses are removed')
+    parser.add_argument('--http-cache-ttl',
+                        action='append',
+                        type=parse_cache_ttl,
+                        help='Time in seconds a cached response of an API '
+                        'path matching the pattern is used without '
+                        'revalidation, e.g. "*/pipelines/*/jobs=3600", can be '
+                        'given multiple times, the first match applies')
     parser.add_argument('--output-dir',
                         default=Path('public').expanduser().resolve(),
                         type=Path,
@@ -72,15 +175,127 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument('--pages-base-url',
                         default=None,
                         help='URL of GitLab page, see Settings -> Pages')
+    parser.add_argument('--site-url',
+                        default=None,
+                        help='URL of the published page used by feeds and '
+                        'sitemaps, defaults to '
+                        '"https://<namespace>.gitlab.io/<project>"')
     parser.add_argument('--create-version-info-file',
                         action='store_true',
                         help='Create version info JSON file in output folder')
+    parser.add_argument('--versions-format',
+                        default='json',
+                        choices=VERSIONS_FORMATS,
+                        help='Format of the version info file')
+    parser.add_argument('--versions-fields',
+                        default='minimal',
+                        type=parse_version_info_fields,
+                        help='Fields of the version info file, either a '
+                        'preset ({}) or a comma separated list of fields'.
+                        format(', '.join(VERSION_INFO_FIELD_PRESETS)))
+    parser.add_argument('--verify-artifacts',
+                        action='store_true',
+                        help='Verify the availability of the job artifacts')
+    parser.add_argument('--probe-workers',
+                        default=8,
+                        type=int,
+                        help='Number of concurrent artifact availability '
+                        'requests')
+    parser.add_argument('--probe-time-budget',
+                        default=30.0,
+                        type=float,
+                        help='Time budget of the artifact verification in '
+                        'seconds')
+    parser.add_argument('--hide-unavailable',
+                        action='store_true',
+                        help='Skip versions with unavailable artifacts')
+    parser.add_argument('--mirror-artifacts',
+                        action='store_true',
+                        help='Download the artifacts of the first job of each '
+                        'tag into the versions folder of the output directory '
+                        'and link to them')
+    parser.add_argument('--mirror-workers',
+                        default=4,
+                        type=int,
+                        help='Number of concurrent artifact downloads')
+    parser.add_argument('--mirror-max-size',
+                        default=100,
+                        type=int,
+                        help='Maximum artifacts size per tag in MiB')
+    parser.add_argument('--dedup',
+                        default=None,
+                        choices=DEDUP_MODES,
+                        help='Deduplicate identical files of the mirrored '
+                        'versions by hardlinks or by rewriting references')
+    parser.add_argument('--dedup-workers',
+                        default=4,
+                        type=int,
+                        help='Number of concurrently hashed files')
     parser.add_argument('--template-file',
-                        type=lambda x: parser_valid_file(parser=parser, arg=x),
-                        help='Path to custom index template file')
+                        action=TemplateFileAction,
+                        type=lambda x: parser_template_file(parser=parser,
+                                                            arg=x),
+                        help='Path to custom index template file or name of '
+                        'a template of this package ({}), can be given '
+                        'multiple times'.format(', '.join(
+                            sorted(x.name for x in TEMPLATE_FOLDER.iterdir())
+                        )))
+    parser.add_argument('--output',
+                        action=OutputAction,
+                        type=Path,
+                        help='Output file of the preceding template file, '
+                        'relative to the output directory, defaults to the '
+                        'template file name')
+    parser.add_argument('--detail-pages',
+                        action='store_true',
+                        help='Create a detail page of each tag listing all '
+                        'jobs of its pipeline in the versions folder')
+    parser.add_argument('--detail-template',
+                        default=None,
+                        type=lambda x: parser_template_file(parser=parser,
+                                                            arg=x),
+                        help='Path to custom detail page template file')
+    parser.add_argument('--detail-workers',
+                        default=4,
+                        type=int,
+                        help='Number of processes rendering the detail pages')
+    parser.add_argument('--time-budget',
+                        default=None,
+                        type=float,
+                        help='Time budget of the run in seconds, tags are '
+                        'resolved newest first, older tags not resolved in '
+                        'time are taken from the previous version info file '
+                        'or marked pending, afterwards no artifacts are '
+                        'mirrored, deduplicated or rendered to detail pages')
+    parser.add_argument('--partial-exit-code',
+                        default=PARTIAL_EXIT_CODE,
+                        type=int,
+                        help='Exit code if tags are pending after the time '
+                        'budget, the output files are created nevertheless')
+    parser.add_argument('--skip-unchanged',
+                        action='store_true',
+                        help='Keep the existing output and skip the run if '
+                        'the latest tags and the configuration did not change '
+                        'since the last complete run')
+    parser.add_argument('--fingerprint-file',
+                        default=None,
+                        type=Path,
+                        help='File of the fingerprint of the last complete '
+                        'run, defaults to "{}" in the output directory'.format(
+                            FINGERPRINT_FILE))
+    parser.add_argument('--render-workers',
+                        default=4,
+                        type=int,
+                        help='Number of output files rendered concurrently')
 
     parsed_args = parser.parse_args()
 
+    for name in ('artifact_folder', 'index_file'):
+        if len(getattr(parsed_args, name) or []) > len(parsed_args.job_name):
+            parser.error("More --{} than --job-name arguments given".format(
+                name.replace('_', '-')
+            ))
+
     return parsed_args
 
 
@@ -103,6 +318,127 @@ def parser_valid_file(parser: argparse.ArgumentParser, arg: str) -> Path:
         return Path(arg).resolve()
 
 
+def parser_template_file(parser: argparse.ArgumentParser, arg: str) -> Path:
+    """
+    Determine whether template file exists, either as path or in this package.
+
+    :param      parser:                 The parser
+    :type       parser:                 parser object
+    :param      arg:                    The template file to check
+    :type       arg:                    str
+    :raise      argparse.ArgumentError: Argument is not a template file
+
+    :returns:   Template file path, parser error is thrown otherwise.
+    :rtype:     Path
+    """
+    if not Path(arg).is_file() and (TEMPLATE_FOLDER / arg).is_file():
+        return TEMPLATE_FOLDER / arg
+
+    return parser_valid_file(parser=parser, arg=arg)
+
+
+def parse_version_info_fields(arg: str) -> Tuple[str, ...]:
+    """
+    Parse the version info fields argument.
+
+    :param      arg:    Preset name or comma separated list of fields
+    :type       arg:    str
+
+    :returns:   The fields to use in the version info file.
+    :rtype:     Tuple[str, ...]
+    """
+    if arg in VERSION_INFO_FIELD_PRESETS:
+        return VERSION_INFO_FIELD_PRESETS[arg]
+
+    fields = tuple(x.strip() for x in arg.split(',') if x.strip())
+    if not fields:
+        raise argparse.ArgumentTypeError(
+            "No version info fields given in '{}'".format(arg)
+        )
+
+    return fields
+
+
+def parse_cache_ttl(arg: str) -> Tuple[str, float]:
+    """
+    Parse the HTTP cache time to live argument.
+
+    :param      arg:    URL path pattern and seconds, e.g. "*/tags=60"
+    :type       arg:    str
+
+    :returns:   The URL path pattern and the time to live in seconds.
+    :rtype:     Tuple[str, float]
+    """
+    pattern, _, seconds = arg.rpartition('=')
+
+    try:
+        ttl = float(seconds)
+    except ValueError:
+        ttl = -1
+
+    if not pattern or ttl < 0:
+        raise argparse.ArgumentTypeError(
+            "Invalid HTTP cache time to live '{}', expected PATTERN=SECONDS".
+            format(arg)
+        )
+
+    return pattern, ttl
+
+
+class TemplateFileAction(argparse.Action):
+    """Append a template file, outputs must follow their template file"""
+
+    def __call__(self,
+                 parser: argparse.ArgumentParser,
+                 namespace: argparse.Namespace,
+                 values: Union[str, Sequence[Any], None],
+                 option_string: Optional[str] = None) -> None:
+        templates = list(getattr(namespace, self.dest) or [])
+
+        if len(getattr(namespace, 'output', None) or []) > len(templates):
+            parser.error("--output must follow the --template-file it "
+                         "belongs to")
+
+        templates.append(values)
+        setattr(namespace, self.dest, templates)
+
+
+class OutputAction(argparse.Action):
+    """Set the output file of the preceding template file"""
+
+    def __call__(self,
+                 parser: argparse.ArgumentParser,
+                 namespace: argparse.Namespace,
+                 values: Union[str, Sequence[Any], None],
+                 option_string: Optional[str] = None) -> None:
+        # the default template if no template file is given yet
+        index = max(len(getattr(namespace, 'template_file', None) or []) - 1,
+                    0)
+        outputs = list(getattr(namespace, self.dest) or [])
+
+        if len(outputs) > index:
+            parser.error("More than one --output given for a "
+                         "--template-file")
+
+        outputs.extend([None] * (index - len(outputs)))
+        outputs.append(values)
+        setattr(namespace, self.dest, outputs)
+
+
+@dataclass
+class ArtifactJob:
+    name: Optional[str]
+    folder: str = 'public'
+    index_file: str = 'index.html'
+
+
+@dataclass
+class JobInfo:
+    job_id: int = -1
+    pages_url: str = ''
+    artifacts_expire_at: Optional[datetime] = None
+
+
 @dataclass
 class TagInfo:
     tag: ProjectTag
@@ -111,112 +447,653 @@ class TagInfo:
     job_id: int = -1
     pages_url: str = ''
     job_ids: List[Dict[str, int]] = field(default_factory=list)
+    artifacts_expire_at: Optional[datetime] = None
+    available: Optional[bool] = None
+    jobs: Dict[str, JobInfo] = field(default_factory=dict)
+    pending: bool = False
+    job_statuses: Dict[int, str] = field(default_factory=dict)
+    details_url: str = ''
 
 
-def get_project(url: str, private_token: str, project_id: int) -> Project:
+def get_artifact_jobs(job_names: Sequence[Optional[str]],
+                      folders: Sequence[str] = (),
+                      index_files: Sequence[str] = ()) -> List[ArtifactJob]:
+    """
+    Get the artifact jobs, the n-th folder and index file belong to the n-th
+    job name.
+
+    :param      job_names:    The job names
+    :type       job_names:    Sequence[Optional[str]]
+    :param      folders:      The artifact folders
+    :type       folders:      Sequence[str]
+    :param      index_files:  The index files
+    :type       index_files:  Sequence[str]
+
+    :returns:   The artifact jobs.
+    :rtype:     List[ArtifactJob]
+    """
+    artifact_jobs: List[ArtifactJob] = []
+
+    for index, name in enumerate(job_names):
+        artifact_job = ArtifactJob(name=name)
+        if index < len(folders):
+            artifact_job.folder = folders[index]
+        if index < len(index_files):
+            artifact_job.index_file = index_files[index]
+        artifact_jobs.append(artifact_job)
+
+    return artifact_jobs
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse a GitLab API datetime string as UTC datetime, a missing timezone
+    offset is taken as UTC.
+
+    :param      value:  The datetime string, e.g. "2023-02-03T15:04:40.000Z"
+    :type       value:  str
+
+    :returns:   The timezone aware datetime in UTC.
+    :rtype:     datetime
+    """
+    # fromisoformat of Python < 3.11 accepts neither "Z" nor an offset
+    # without colon, a missing offset is added
+    value = sub(pattern=r'(?:Z|([+-]\d{2}):?(\d{2}))?$',
+                repl=lambda x: '{}:{}'.format(x.group(1) or '+00',
+                                              x.group(2) or '00'),
+                string=value,
+                count=1)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        # fractions other than milliseconds or microseconds
+        value = value[:-6] + value[-6:].replace(':', '')
+        parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+    return parsed.astimezone(timezone.utc)
+
+
+def format_utc(value: datetime, format: str) -> str:
+    """
+    Format a datetime in UTC, a naive datetime is taken as UTC. Available as
+    "utc" filter in templates.
+
+    :param      value:   The datetime
+    :type       value:   datetime
+    :param      format:  The strftime format, e.g. "%Y-%m-%dT%H:%M:%SZ"
+    :type       format:  str
+
+    :returns:   The formatted datetime.
+    :rtype:     str
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(timezone.utc).strftime(format)
+
+
+class DeadlineGitlab(Gitlab):
+    """
+    GitLab client limiting the timeout of each request to the time left until
+    a deadline.
+
+    The client reads its timeout for every request, a request made shortly
+    before the deadline does not get the full timeout.
+    """
+
+    def __init__(self,
+                 *args: Any,
+                 deadline: Optional[float] = None,
+                 **kwargs: Any) -> None:
+        self.deadline = deadline
+        super().__init__(*args, **kwargs)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Get the timeout of the next request.
+
+        :returns:   The timeout in seconds, at least MIN_TIMEOUT with a
+                    deadline, None for no timeout.
+        :rtype:     Optional[float]
+        """
+        if self.deadline is None:
+            return self._timeout
+
+        remaining = max(self.deadline - monotonic(), MIN_TIMEOUT)
+        if self._timeout is None:
+            return remaining
+
+        return min(self._timeout, remaining)
+
+    @timeout.setter
+    def timeout(self, value: Optional[float]) -> None:
+        self._timeout = value
+
+
+def get_project(url: str,
+                private_token: Optional[str],
+                project_id: int,
+                session: Optional[Session] = None,
+                timeout: Optional[float] = None,
+                deadline: Optional[float] = None) -> Project:
     """
     Get the GitLab project.
 
     :param      url:            The url
     :type       url:            str
     :param      private_token:  The private token
-    :type       private_token:  str
+    :type       private_token:  Optional[str]
     :param      project_id:     The project identifier
     :type       project_id:     int
+    :param      session:        The session of all API requests
+    :type       session:        Optional[Session]
+    :param      timeout:        The timeout of each API request in seconds
+    :type       timeout:        Optional[float]
+    :param      deadline:       The deadline as monotonic time in seconds,
+                                limits the timeout of each API request
+    :type       deadline:       Optional[float]
 
     :returns:   The project.
     :rtype:     Project
     """
-    gl = Gitlab(url=url, private_token=private_token)
+    gl = DeadlineGitlab(url=url,
+                        private_token=private_token,
+                        session=session,
+                        timeout=timeout,
+                        deadline=deadline)
     project = gl.projects.get(project_id)
 
     return project
 
 
-def get_project_tags(project: Project,
-                     job_name: str,
-                     web_url: str) -> List[TagInfo]:
+def get_project_tags(
+        project: Project,
+        job_name: Optional[str],
+        web_url: str,
+        artifact_jobs: Optional[Sequence[ArtifactJob]] = None,
+        deadline: Optional[float] = None,
+        workers: int = 1,
+        coalescer: Optional[RequestCoalescer] = None,
+        raw: bool = False
+) -> List[TagInfo]:
     """
     Get all project tags.
 
-    :param      project:   The project
-    :type       project:   Project
-    :param      job_name:  The job name
-    :type       job_name:  str
-    :param      web_url:   The web url
-    :type       web_url:   str
-
-    :returns:   The project tags.
+    The tags are resolved newest first, by multiple threads if more than one
+    worker is given. After the deadline all remaining tags are returned as
+    pending tags without any further request, the newest tag is always
+    resolved. Tags of the same commit or pipeline share one lookup.
+
+    In raw mode the tag and job listings are used as plain JSON, only the tag
+    and commit objects of the returned tags are created.
+
+    :param      project:        The project
+    :type       project:        Project
+    :param      job_name:       The job name
+    :type       job_name:       Optional[str]
+    :param      web_url:        The web url
+    :type       web_url:        str
+    :param      artifact_jobs:  The jobs to resolve, replaces the job name
+    :type       artifact_jobs:  Optional[Sequence[ArtifactJob]]
+    :param      deadline:       The deadline as monotonic time in seconds
+    :type       deadline:       Optional[float]
+    :param      workers:        The number of concurrently resolved tags
+    :type       workers:        int
+    :param      coalescer:      The lookups shared with other calls of a run
+    :type       coalescer:      Optional[RequestCoalescer]
+    :param      raw:            Flag to skip python-gitlab objects of the
+                                listings
+    :type       raw:            bool
+
+    :returns:   The project tags in the order of the API.
     :rtype:     List[TagInfo]
     """
-    tags: List[TagInfo] = []
+    if coalescer is None:
+        coalescer = RequestCoalescer()
+
+    project_tags: List[Any]
+    if raw:
+        project_tags = list_tag_data(project=project)
+        created_at = [
+            parse_datetime(value=x['commit']['created_at'])
+            for x in project_tags
+        ]
+    else:
+        project_tags = list(project.tags.list(all=True, as_list=False))
+        created_at = [
+            parse_datetime(value=x.commit['created_at']) for x in project_tags
+        ]
+    newest_first = sorted(
+        range(len(project_tags)), key=lambda x: created_at[x], reverse=True
+    )
+
+    def resolve(count: int, index: int) -> Optional[TagInfo]:
+        tag: ProjectTag
+        if raw:
+            tag = ProjectTag(project.tags, project_tags[index],
+                             created_from_list=True)
+        else:
+            tag = project_tags[index]    # type: ignore
+
+        if count and deadline is not None and monotonic() >= deadline:
+            return get_pending_tag_info(project=project, tag=tag)
 
-    for tag in project.tags.list(all=True, as_list=False):
         tag_info = TagInfo(
-            tag=tag,    # type: ignore
-            commit=project.commits.get(tag.attributes['commit']['id']),
-            created_at=datetime.strptime(
-                sub(pattern=r'\+.*', repl='', string=tag.commit['created_at']),
-                "%Y-%m-%dT%H:%M:%S.%f"
+            tag=tag,
+            commit=coalescer.get_commit(
+                project=project,
+                sha=tag.attributes['commit']['id']
             ),
+            created_at=created_at[index],
         )
 
         # skip the tag is there was no last pipeline
         if tag_info.commit.last_pipeline is None:
-            continue
+            return None
 
         get_pipeline_job(
             project=project,
             tag_info=tag_info,
             job_name=job_name,
-            web_url=web_url
+            web_url=web_url,
+            artifact_jobs=artifact_jobs,
+            coalescer=coalescer,
+            raw=raw
         )
 
-        tags.append(tag_info)
+        return tag_info
 
-    return tags
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resolved = executor.map(resolve, range(len(newest_first)),
+                                newest_first)
+        tags = {
+            index: tag_info
+            for index, tag_info in zip(newest_first, resolved)
+            if tag_info is not None
+        }
+
+    logging.getLogger(__name__).info(
+        'Coalesced requests: {}'.format(coalescer.stats)
+    )
+
+    return [tags[x] for x in sorted(tags)]
+
+
+def get_pending_tag_info(project: Project, tag: ProjectTag) -> TagInfo:
+    """
+    Get the information of a tag not resolved in time.
+
+    The commit is created from the commit data of the tag listing.
+
+    :param      project:  The project
+    :type       project:  Project
+    :param      tag:      The tag
+    :type       tag:      ProjectTag
+
+    :returns:   The pending tag information.
+    :rtype:     TagInfo
+    """
+    commit_attributes = dict(tag.attributes['commit'])
+
+    return TagInfo(
+        tag=tag,
+        commit=ProjectCommit(project.commits, commit_attributes),
+        created_at=parse_datetime(value=commit_attributes['created_at']),
+        pending=True
+    )
 
 
-def get_pipeline_job(project: Project,
-                     tag_info: TagInfo,
-                     job_name: str,
-                     web_url: str) -> None:
+def get_pipeline_job(
+        project: Project,
+        tag_info: TagInfo,
+        job_name: Optional[str],
+        web_url: str,
+        artifact_jobs: Optional[Sequence[ArtifactJob]] = None,
+        coalescer: Optional[RequestCoalescer] = None,
+        raw: bool = False) -> None:
     """
     Get the pipeline job informations and set the tag info values.
 
-    :param      project:   The project
-    :type       project:   Project
-    :param      tag_info:  The tag information
-    :type       tag_info:  TagInfo
-    :param      job_name:  The job name
-    :type       job_name:  str
-    :param      web_url:   The web url
-    :type       web_url:   str
+    :param      project:        The project
+    :type       project:        Project
+    :param      tag_info:       The tag information
+    :type       tag_info:       TagInfo
+    :param      job_name:       The job name
+    :type       job_name:       Optional[str]
+    :param      web_url:        The web url
+    :type       web_url:        str
+    :param      artifact_jobs:  The jobs to resolve, replaces the job name
+    :type       artifact_jobs:  Optional[Sequence[ArtifactJob]]
+    :param      coalescer:      The lookups shared with other tags
+    :type       coalescer:      Optional[RequestCoalescer]
+    :param      raw:            Flag to list the jobs as plain JSON without
+                                requesting the pipeline
+    :type       raw:            bool
     """
-    pages_url: str = ''
-    job_id: int = -1
-    pipeline_ids: List[Dict[str, int]] = []
+    if coalescer is None:
+        coalescer = RequestCoalescer()
 
     last_pipeline_id = tag_info.commit.last_pipeline['id']
-    pipeline = project.pipelines.get(last_pipeline_id)
+    jobs: Sequence[Union[RESTObject, Dict[str, Any]]]
+
+    if raw:
+        jobs = coalescer.get_pipeline_job_data(
+            project=project,
+            pipeline_id=last_pipeline_id
+        )
+    else:
+        jobs = coalescer.get_pipeline_jobs(
+            project=project,
+            pipeline_id=last_pipeline_id
+        )
+
+    set_job_info(
+        tag_info=tag_info,
+        jobs=jobs,
+        job_name=job_name,
+        web_url=web_url,
+        artifact_jobs=artifact_jobs
+    )
+
+
+def set_job_info(
+        tag_info: TagInfo,
+        jobs: Iterable[Union[RESTObject, Dict[str, Any]]],
+        job_name: Optional[str],
+        web_url: str,
+        artifact_jobs: Optional[Sequence[ArtifactJob]] = None) -> None:
+    """
+    Set the tag info values based on the jobs of the tag pipeline.
+
+    All artifact jobs are resolved from the same job listing, the first one
+    sets the job ID, pages URL and artifacts expiration of the tag info.
+
+    :param      tag_info:       The tag information
+    :type       tag_info:       TagInfo
+    :param      jobs:           The jobs of the pipeline, as objects or plain
+                                JSON
+    :type       jobs:           Iterable[Union[RESTObject, Dict[str, Any]]]
+    :param      job_name:       The job name
+    :type       job_name:       Optional[str]
+    :param      web_url:        The web url
+    :type       web_url:        str
+    :param      artifact_jobs:  The jobs to resolve, replaces the job name
+    :type       artifact_jobs:  Optional[Sequence[ArtifactJob]]
+    """
+    if not artifact_jobs:
+        artifact_jobs = [ArtifactJob(name=job_name)]
+
+    job_infos: Dict[str, JobInfo] = {
+        x.name or '': JobInfo() for x in artifact_jobs
+    }
+    pipeline_ids: List[Dict[str, int]] = []
+    job_statuses: Dict[int, str] = {}
+
+    for job in jobs:
+        if isinstance(job, dict):
+            name, job_id, status = job['name'], job['id'], job['status']
+        else:
+            name, job_id, status = job.name, job.id, job.status
 
-    for job in pipeline.jobs.list(all=True, as_list=False):
-        pipeline_ids.append({job.name: job.id})
+        pipeline_ids.append({name: job_id})
+        job_statuses[job_id] = status
+
+        if status != "success":
+            continue
 
-        if job.status == "success" and (
-            job_name is None or job.name == job_name
-        ):
-            job_id = job.id
-            pages_url = get_artifact_url(
-                web_url=web_url,
+        for artifact_job in artifact_jobs:
+            if artifact_job.name is not None and name != artifact_job.name:
+                continue
+
+            attributes = job if isinstance(job, dict) else job.attributes
+            expire_at = attributes.get('artifacts_expire_at')
+            job_infos[artifact_job.name or ''] = JobInfo(
                 job_id=job_id,
-                folder='public',
-                index_file='index.html'
+                pages_url=get_artifact_url(
+                    web_url=web_url,
+                    job_id=job_id,
+                    folder=artifact_job.folder,
+                    index_file=artifact_job.index_file
+                ),
+                artifacts_expire_at=parse_datetime(value=expire_at)
+                if expire_at else None
             )
 
-    tag_info.job_id = job_id
+    primary = job_infos[artifact_jobs[0].name or '']
+
+    tag_info.job_id = primary.job_id
     tag_info.job_ids = pipeline_ids
-    tag_info.pages_url = pages_url
+    tag_info.job_statuses = job_statuses
+    tag_info.pages_url = primary.pages_url
+    tag_info.artifacts_expire_at = primary.artifacts_expire_at
+    tag_info.jobs = job_infos
+
+
+def get_project_tags_graphql(
+        project: Project,
+        job_name: Optional[str],
+        web_url: str,
+        artifact_jobs: Optional[Sequence[ArtifactJob]] = None,
+        deadline: Optional[float] = None,
+        workers: int = 1,
+        coalescer: Optional[RequestCoalescer] = None,
+        raw: bool = False
+) -> List[TagInfo]:
+    """
+    Get all project tags with a few paged GraphQL queries.
+
+    Only existing tags with a tag pipeline are returned. The tags and their
+    commits are taken from the REST tag listing, the last pipeline of the
+    commit with its jobs from the GraphQL API. Unlike the REST API, the
+    commits have no "stats". The REST API is used if the GraphQL API is not
+    supported by the GitLab instance.
+
+    Pipelines are fetched newest first. After the deadline all tags without a
+    fetched pipeline are listed and returned as pending tags.
+
+    :param      project:        The project
+    :type       project:        Project
+    :param      job_name:       The job name
+    :type       job_name:       Optional[str]
+    :param      web_url:        The web url
+    :type       web_url:        str
+    :param      artifact_jobs:  The jobs to resolve, replaces the job name
+    :type       artifact_jobs:  Optional[Sequence[ArtifactJob]]
+    :param      deadline:       The deadline as monotonic time in seconds
+    :type       deadline:       Optional[float]
+    :param      workers:        The number of workers of the REST fallback
+    :type       workers:        int
+    :param      coalescer:      The lookups of the REST fallback
+    :type       coalescer:      Optional[RequestCoalescer]
+    :param      raw:            Flag to skip python-gitlab objects of the
+                                REST fallback listings
+    :type       raw:            bool
+
+    :returns:   The project tags.
+    :rtype:     List[TagInfo]
+    """
+    gl = project.manager.gitlab
+    full_path = project.attributes['path_with_namespace']
+    pipelines: List[Dict[str, Any]] = []
+    partial = False
+
+    # pipelines of deleted tags are kept, only existing tags are returned
+    project_tags = {
+        x.name: x for x in project.tags.list(all=True, as_list=False)
+    }
+
+    try:
+        for pipeline in get_tag_pipelines(gl=gl,
+                                          full_path=full_path,
+                                          refs=project_tags):
+            pipelines.append(pipeline)
+
+            if deadline is not None and monotonic() >= deadline:
+                partial = True
+                break
+    except (GraphQLError, GitlabError) as e:
+        logging.getLogger(__name__).warning(
+            'GraphQL API not usable, falling back to REST: {}'.format(e)
+        )
+        return get_project_tags(
+            project=project,
+            job_name=job_name,
+            web_url=web_url,
+            artifact_jobs=artifact_jobs,
+            deadline=deadline,
+            workers=workers,
+            coalescer=coalescer,
+            raw=raw
+        )
+
+    tags: List[TagInfo] = []
+
+    for pipeline in pipelines:
+        tag = project_tags[pipeline['tag']]
+        # same attributes as a commit of the REST API, except the stats
+        commit_attributes = dict(tag.attributes['commit'])
+        commit_attributes.update({
+            'status': pipeline['status'].lower(),
+            'project_id': project.id,
+            'last_pipeline': {
+                'id': parse_global_id(gid=pipeline['id']),
+                'iid': int(pipeline['iid']),
+                'project_id': project.id,
+                'sha': pipeline['sha'],
+                'ref': pipeline['ref'],
+                'status': pipeline['status'].lower(),
+                'source': pipeline['source'],
+                'created_at': pipeline['createdAt'],
+                'updated_at': pipeline['updatedAt'],
+                'web_url': '{}{}'.format(gl.url, pipeline['path']),
+            },
+        })
+
+        tag_info = TagInfo(
+            tag=tag,    # type: ignore
+            commit=ProjectCommit(project.commits, commit_attributes),
+            created_at=parse_datetime(value=tag.commit['created_at']),
+        )
+
+        jobs = []
+        for job in pipeline['jobs']:
+            # the expiration of the job artifacts is the one of its archive
+            expire_at = [
+                x['expireAt'] for x in job['artifacts']['nodes']
+                if x['fileType'] == 'ARCHIVE'
+            ]
+            jobs.append({
+                'id': parse_global_id(gid=job['id']),
+                'name': job['name'],
+                'status': job['status'].lower(),
+                'artifacts_expire_at': expire_at[0] if expire_at else None,
+            })
+        set_job_info(
+            tag_info=tag_info,
+            jobs=jobs,
+            job_name=job_name,
+            web_url=web_url,
+            artifact_jobs=artifact_jobs
+        )
+
+        tags.append(tag_info)
+
+    if partial:
+        names = set(x.tag.name for x in tags)
+        tags.extend(
+            get_pending_tag_info(project=project, tag=x)    # type: ignore
+            for name, x in project_tags.items()
+            if name not in names
+        )
+
+    return tags
+
+
+def load_version_info_file(file_path: Path,
+                           versions_format: str = 'json'
+                           ) -> Dict[str, Dict[str, Any]]:
+    """
+    Load a previously saved version information file.
+
+    :param      file_path:        The file path
+    :type       file_path:        Path
+    :param      versions_format:  The format, one of VERSIONS_FORMATS
+    :type       versions_format:  str
+
+    :returns:   The version information by tag name, empty if the file does
+                not exist or is invalid.
+    :rtype:     Dict[str, Dict[str, Any]]
+    """
+    try:
+        content = file_path.read_bytes()
+    except OSError:
+        return {}
+
+    try:
+        if versions_format == 'ndjson':
+            records = [json.loads(x) for x in content.splitlines() if x]
+        else:
+            records = json.loads(content)
+    except ValueError as e:
+        logging.getLogger(__name__).warning(
+            'Failed to load {}: {}'.format(file_path, e)
+        )
+        return {}
+
+    return {
+        x['name']: x for x in records if isinstance(x, dict) and 'name' in x
+    }
+
+
+def fill_pending_tags(tag_list: List[TagInfo],
+                      previous: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Fill the pending tags with their previous version information.
+
+    The information is only used if the tag still points to the same commit.
+    The commit information or the last pipeline of the commit is restored if
+    it is part of the previous version information.
+
+    :param      tag_list:  The tag list
+    :type       tag_list:  List[TagInfo]
+    :param      previous:  The previous version information by tag name
+    :type       previous:  Dict[str, Dict[str, Any]]
+
+    :returns:   Number of filled tags.
+    :rtype:     int
+    """
+    filled = 0
+
+    for tag in tag_list:
+        record = previous.get(tag.tag.name)
+        if not tag.pending or record is None:
+            continue
+
+        commit_id = record.get('commit_id', record.get('commit', {}).get('id'))
+        if commit_id is not None and \
+                commit_id != tag.tag.attributes['commit']['id']:
+            continue
+
+        tag.job_id = record.get('job_id', -1)
+        tag.pages_url = record.get('pages_url', '')
+        tag.available = record.get('available')
+        tag.jobs = {
+            name: JobInfo(job_id=x['job_id'], pages_url=x['pages_url'])
+            for name, x in record.get('jobs', {}).items()
+        }
+        if 'commit_info' in record:
+            tag.commit = ProjectCommit(tag.commit.manager,
+                                       record['commit_info'])
+        elif record.get('pipeline'):
+            # the commit of the tag listing has no pipeline
+            tag.commit = ProjectCommit(
+                tag.commit.manager,
+                dict(tag.commit.attributes, last_pipeline=record['pipeline'])
+            )
+        filled += 1
+
+    return filled
 
 
 def get_artifact_url(web_url: str,
@@ -252,32 +1129,150 @@ def get_artifact_url(web_url: str,
     return url
 
 
-def save_version_info_file(tag_list: List[TagInfo], file_path: Path) -> None:
+def get_absolute_url(url: str, base_url: str) -> str:
     """
-    Save a version information file.
+    Get the absolute URL of a path relative to the output folder.
+
+    Mirrored versions are linked relative to the output folder, feeds and
+    sitemaps require absolute URLs. Available as "absolute_url" filter in
+    templates.
 
-    :param      tag_list:   The tag list
-    :type       tag_list:   List[TagInfo]
-    :param      file_path:  The file path
-    :type       file_path:  Path
+    :param      url:       The absolute URL or path relative to the output
+                           folder
+    :type       url:       str
+    :param      base_url:  The URL of the output folder
+    :type       base_url:  str
+
+    :returns:   The URL.
+    :rtype:     str
     """
-    version_info = []
+    if not url or '://' in url:
+        return url
 
-    for tag in tag_list:
-        info = dict(tag.tag.attributes)
-        info['pages_url'] = tag.pages_url
-        info['job_id'] = tag.job_id
-        info['commit_info'] = tag.commit.attributes
-        version_info.append(info)
-
-    save_file(
-        content=json.dumps(version_info, indent=4, sort_keys=True),
-        path=file_path
-    )
+    return '{}/{}'.format(base_url.rstrip('/'), url)
+
+
+def encode_json(data: Any, pretty: bool = False) -> bytes:
+    """
+    Encode data as UTF-8 JSON.
+
+    orjson is used if available, the output is identical to the fallback of
+    the standard library.
+
+    :param      data:    The data
+    :type       data:    Any
+    :param      pretty:  Flag to indent and sort the output
+    :type       pretty:  bool
+
+    :returns:   The encoded data.
+    :rtype:     bytes
+    """
+    if HAS_ORJSON:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS if pretty else 0
+        return orjson.dumps(data, option=option)
+
+    if pretty:
+        content = json.dumps(data, indent=2, sort_keys=True,
+                             ensure_ascii=False)
+    else:
+        content = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+    return content.encode('utf-8')
+
+
+def get_version_info(tag: TagInfo, fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Get the version information of a tag.
 
+    :param      tag:     The tag
+    :type       tag:     TagInfo
+    :param      fields:  The fields to include, "*" for all tag attributes
+    :type       fields:  Sequence[str]
 
-def get_template_file(file_name: str,
-                      template_folder: Optional[Path] = None) -> Template:
+    :returns:   The version information.
+    :rtype:     Dict[str, Any]
+    """
+    info: Dict[str, Any] = {}
+
+    for name in fields:
+        if name == '*':
+            info.update(tag.tag.attributes)
+        elif name == 'pages_url':
+            info[name] = tag.pages_url
+        elif name == 'job_id':
+            info[name] = tag.job_id
+        elif name == 'available':
+            info[name] = tag.available
+        elif name == 'pending':
+            info[name] = tag.pending
+        elif name == 'jobs':
+            info[name] = {
+                job_name: {'job_id': x.job_id, 'pages_url': x.pages_url}
+                for job_name, x in tag.jobs.items()
+            }
+        elif name == 'commit_info':
+            info[name] = tag.commit.attributes
+        elif name == 'commit_id':
+            info[name] = tag.tag.attributes['commit']['id']
+        elif name == 'pipeline':
+            info[name] = tag.commit.attributes.get('last_pipeline')
+        elif name == 'created_at':
+            info[name] = tag.created_at.isoformat()
+        else:
+            info[name] = tag.tag.attributes.get(name)
+
+    return info
+
+
+def save_version_info_file(
+        tag_list: List[TagInfo],
+        file_path: Path,
+        versions_format: str = 'json',
+        fields: Sequence[str] = VERSION_INFO_FIELD_PRESETS['minimal']) -> None:
+    """
+    Save a version information file.
+
+    The "ndjson" and "compact" formats are written record by record.
+
+    :param      tag_list:         The tag list
+    :type       tag_list:         List[TagInfo]
+    :param      file_path:        The file path
+    :type       file_path:        Path
+    :param      versions_format:  The format, one of VERSIONS_FORMATS
+    :type       versions_format:  str
+    :param      fields:           The fields of each version entry
+    :type       fields:           Sequence[str]
+    """
+    if versions_format not in VERSIONS_FORMATS:
+        raise ValueError(
+            "Unknown versions format '{}'".format(versions_format)
+        )
+
+    if not file_path.parent.exists():
+        create_output_directory(path=file_path.parent)
+
+    records = (get_version_info(tag=tag, fields=fields) for tag in tag_list)
+
+    with open(file_path, 'wb') as f:
+        if versions_format == 'ndjson':
+            for record in records:
+                f.write(encode_json(record))
+                f.write(b'\n')
+        elif versions_format == 'compact':
+            f.write(b'[')
+            for index, record in enumerate(records):
+                if index:
+                    f.write(b',')
+                f.write(encode_json(record))
+            f.write(b']')
+        else:
+            f.write(encode_json(list(records), pretty=True))
+
+
+def get_template_file(
+        file_name: str,
+        template_folder: Optional[Path] = None,
+        environments: Optional[Dict[Path, Environment]] = None) -> Template:
     """
     Get the Jinja2 template file.
 
@@ -285,15 +1280,27 @@ def get_template_file(file_name: str,
     :type       file_name:        str
     :param      template_folder:  The template folder
     :type       template_folder:  Path
+    :param      environments:     The environment of each template folder,
+                                  reused and extended to cache the templates
+    :type       environments:     Optional[Dict[Path, Environment]]
 
     :returns:   The template.
     :rtype:     Template
     """
     if template_folder is None:
-        template_folder = Path(__file__).parent / "templates"
+        template_folder = TEMPLATE_FOLDER
 
-    environment = Environment(loader=FileSystemLoader(template_folder))
-    template = environment.get_template(file_name)
+    if environments is None:
+        environments = {}
+    if template_folder not in environments:
+        environments[template_folder] = Environment(
+            loader=FileSystemLoader(template_folder)
+        )
+        environments[template_folder].filters['absolute_url'] = \
+            get_absolute_url
+        environments[template_folder].filters['utc'] = format_utc
+
+    template = environments[template_folder].get_template(file_name)
 
     return template
 
@@ -326,16 +1333,37 @@ def create_output_directory(path: Path) -> None:
 
 def create_html_files(tag_list: List[TagInfo],
                       path: Path,
-                      template: Optional[Path] = None) -> None:
+                      template: Optional[Path] = None,
+                      output: Optional[Path] = None,
+                      pages_base_url: str = '',
+                      site_url: str = '',
+                      project_url: str = '',
+                      environments: Optional[Dict[Path, Environment]] = None
+                      ) -> None:
     """
     Create all HTML files.
 
-    :param      tag_list:  The tag list
-    :type       tag_list:  List[TagInfo]
-    :param      path:      The path to the output folder
-    :type       path:      Path
-    :param      template:  Path to custom template file
-    :type       template:  Optional[Path]
+    The tags are linked below the project URL. Without a project URL it is
+    taken from the commit of the first tag, tags are not linked if the tag
+    list is empty.
+
+    :param      tag_list:        The tag list
+    :type       tag_list:        List[TagInfo]
+    :param      path:            The path to the output folder
+    :type       path:            Path
+    :param      template:        Path to custom template file
+    :type       template:        Optional[Path]
+    :param      output:          Output file, relative to the output folder
+    :type       output:          Optional[Path]
+    :param      pages_base_url:  The URL of the GitLab page
+    :type       pages_base_url:  str
+    :param      site_url:        The URL of the published page
+    :type       site_url:        str
+    :param      project_url:     The web URL of the GitLab project
+    :type       project_url:     str
+    :param      environments:    The cached environment of each template
+                                 folder
+    :type       environments:    Optional[Dict[Path, Environment]]
     """
     file_name = 'index.html'
     template_folder = None
@@ -345,23 +1373,142 @@ def create_html_files(tag_list: List[TagInfo],
         template_folder = template.parent
 
     index_template = get_template_file(file_name=file_name,
-                                       template_folder=template_folder)
-
-    tag_base_url = sub(
-        pattern=r'\/-\/commit\/.*',
-        repl='/-/tags/',
-        string=tag_list[0].commit.web_url
-    )
+                                       template_folder=template_folder,
+                                       environments=environments)
+
+    if not project_url and tag_list:
+        project_url = sub(pattern=r'\/-\/commit\/.*',
+                          repl='',
+                          string=tag_list[0].commit.web_url)
+    tag_base_url = '{}/-/tags/'.format(project_url) if project_url else ''
     index_content = index_template.render(
         items=tag_list,
-        tag_base_url=tag_base_url
+        tag_base_url=tag_base_url,
+        pages_base_url=pages_base_url,
+        site_url=site_url,
+        generated_at=datetime.now(timezone.utc)
     )
-    save_file(content=index_content, path=path / file_name)
+    save_file(content=index_content, path=path / (output or file_name))
+
+
+def get_output_paths(path: Path,
+                     templates: Sequence[Optional[Path]],
+                     outputs: Sequence[Optional[Path]] = ()) -> List[Path]:
+    """
+    Get the paths of the output files of all templates.
+
+    :param      path:       The path to the output folder
+    :type       path:       Path
+    :param      templates:  The template files, None for the default
+    :type       templates:  Sequence[Optional[Path]]
+    :param      outputs:    The output files
+    :type       outputs:    Sequence[Optional[Path]]
+
+    :returns:   The output paths.
+    :rtype:     List[Path]
+    """
+    return [
+        path / (
+            (outputs[index] if index < len(outputs) else None) or
+            (template.name if template is not None else 'index.html')
+        ) for index, template in enumerate(templates)
+    ]
+
+
+def get_fingerprint_config(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Get the configuration of a run affecting its output.
+
+    The content of the template files is included by its hash.
+
+    :param      args:  The parsed CLI arguments
+    :type       args:  argparse.Namespace
+
+    :returns:   The configuration.
+    :rtype:     Dict[str, Any]
+    """
+    templates = [
+        x or TEMPLATE_FOLDER / 'index.html'
+        for x in args.template_file or [None]
+    ]
+    names = (
+        'url', 'project_id', 'job_name', 'artifact_folder', 'index_file',
+        'backend', 'pages_base_url', 'site_url', 'create_version_info_file',
+        'versions_format', 'versions_fields', 'verify_artifacts',
+        'hide_unavailable', 'mirror_artifacts', 'mirror_max_size', 'dedup',
+        'output', 'detail_pages',
+    )
+    if args.detail_pages:
+        templates.append(args.detail_template or TEMPLATE_FOLDER /
+                         'version.html')
+    config = {name: getattr(args, name) for name in names}
+    config['templates'] = hash_files(paths=templates)
+
+    return config
+
+
+def create_output_files(tag_list: List[TagInfo],
+                        path: Path,
+                        templates: Sequence[Optional[Path]],
+                        outputs: Sequence[Optional[Path]] = (),
+                        pages_base_url: str = '',
+                        site_url: str = '',
+                        project_url: str = '',
+                        workers: int = 4,
+                        environments: Optional[Dict[Path, Environment]] = None
+                        ) -> None:
+    """
+    Create the output files of all templates from the same tag list.
+
+    The n-th output belongs to the n-th template, the template file name is
+    used if no output is given for a template.
+
+    :param      tag_list:        The tag list
+    :type       tag_list:        List[TagInfo]
+    :param      path:            The path to the output folder
+    :type       path:            Path
+    :param      templates:       The template files, None for the default
+    :type       templates:       Sequence[Optional[Path]]
+    :param      outputs:         The output files
+    :type       outputs:         Sequence[Optional[Path]]
+    :param      pages_base_url:  The URL of the GitLab page
+    :type       pages_base_url:  str
+    :param      site_url:        The URL of the published page
+    :type       site_url:        str
+    :param      project_url:     The web URL of the GitLab project
+    :type       project_url:     str
+    :param      workers:         The number of concurrently rendered files
+    :type       workers:         int
+    :param      environments:    The cached environment of each template
+                                 folder
+    :type       environments:    Optional[Dict[Path, Environment]]
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                create_html_files,
+                tag_list=tag_list,
+                path=path,
+                template=template,
+                output=outputs[index] if index < len(outputs) else None,
+                pages_base_url=pages_base_url,
+                site_url=site_url,
+                project_url=project_url,
+                environments=environments
+            ) for index, template in enumerate(templates)
+        ]
+
+        for future in futures:
+            future.result()
 
 
 def main() -> None:
+    # imported here as the generator is built on this module
+    from .generator import VersionedPagesGenerator
+
     # parse CLI arguments
     args = parse_arguments()
+    start = monotonic()
 
     log_levels = {
         0: logging.CRITICAL,
@@ -379,54 +1526,166 @@ def main() -> None:
     logger.setLevel(level=log_levels[min(args.verbosity,
                                      max(log_levels.keys()))])
     logger.disabled = not args.debug
+    # the loggers of all modules inherit the level of the package logger,
+    # disabling a logger is not inherited
+    package_logger = logging.getLogger(__package__)
+    package_logger.setLevel(level=logger.level
+                            if args.debug else logging.CRITICAL + 1)
 
     logger.debug(args)
-    url = args.url
-    private_token = args.private_token
-    project_id = args.project_id
-    job_name = args.job_name
     output_path = args.output_dir
-    pages_base_url = args.pages_base_url
-    create_version_info_file = args.create_version_info_file
-    template_file = args.template_file
-
-    project = get_project(
-        url=url,
-        private_token=private_token,
-        project_id=project_id
-    )
+    versions_format = args.versions_format
+    versions_file = output_path / VERSIONS_FILE_NAMES[versions_format]
+    probe_time_budget = args.probe_time_budget
+    deadline = None
+    if args.time_budget is not None:
+        deadline = start + args.time_budget
+    template_files = args.template_file or [None]
+    outputs = args.output or []
+    fingerprint_file = args.fingerprint_file or output_path / FINGERPRINT_FILE
+    fingerprint: Optional[str] = None
+    session: Optional[Session] = None
+    cache: Optional[ResponseCache] = None
+
+    if args.http_cache is not None:
+        cache = ResponseCache(
+            path=args.http_cache,
+            max_size=args.http_cache_size * 1024 * 1024,
+            ttls=args.http_cache_ttl or []
+        )
+
+    if args.record is not None:
+        session = RecordingSession()
+    elif args.replay is not None:
+        session = ReplaySession(path=args.replay, latency=args.replay_latency)
 
-    create_output_directory(path=output_path)
+    if args.backend == 'graphql':
+        fetcher = 'bulk'
+    elif args.fetch_workers > 1:
+        fetcher = 'threaded'
+    else:
+        fetcher = 'serial'
+
+    generator = VersionedPagesGenerator(
+        project_id=args.project_id,
+        url=args.url,
+        private_token=args.private_token,
+        artifact_jobs=get_artifact_jobs(
+            job_names=args.job_name,
+            folders=args.artifact_folder or [],
+            index_files=args.index_file or []
+        ),
+        pages_base_url=args.pages_base_url,
+        site_url=args.site_url,
+        # a single stalled request must not exceed the time budget
+        deadline=deadline,
+        fetcher=fetcher,
+        workers=args.fetch_workers,
+        pool_size=max(args.fetch_workers, args.mirror_workers),
+        session=session,
+        cache=cache,
+        raw=args.raw_json
+    )
 
-    if pages_base_url is None:
-        pages_base_url = 'https://{owner}.gitlab.io/-/{name}'.format(
-            owner=project.attributes['namespace']['name'],
-            name=project.attributes['name']
+    try:
+        if args.skip_unchanged:
+            fingerprint = generator.fingerprint(
+                config=get_fingerprint_config(args=args)
+            )
+            output_files = get_output_paths(
+                path=output_path,
+                templates=template_files,
+                outputs=outputs
+            )
+            if args.create_version_info_file:
+                output_files.append(versions_file)
+
+            # without a fingerprint the tag set is taken as changed
+            unchanged = fingerprint is not None and \
+                fingerprint == load_fingerprint(path=fingerprint_file)
+
+            if unchanged and all(x.is_file() for x in output_files):
+                logger.info('Tags unchanged since the last run, keeping the '
+                            'output')
+                return
+
+        create_output_directory(path=output_path)
+
+        # get all tags of the project
+        generator.refresh(
+            deadline=deadline,
+            previous=load_version_info_file(
+                file_path=versions_file,
+                versions_format=versions_format
+            ) if deadline is not None else None
         )
 
-    if pages_base_url is not None:
-        web_url = pages_base_url
-    else:
-        web_url = project.attributes['web_url']
+        if args.verify_artifacts:
+            if deadline is not None:
+                probe_time_budget = min(probe_time_budget,
+                                        max(deadline - monotonic(), 0))
 
-    # get all tags of the project
-    tag_list = get_project_tags(
-        project=project,
-        job_name=job_name,
-        web_url=web_url
-    )
+            generator.verify(
+                workers=args.probe_workers,
+                time_budget=probe_time_budget,
+                hide_unavailable=args.hide_unavailable
+            )
+
+        if args.mirror_artifacts:
+            generator.mirror(
+                path=output_path,
+                workers=args.mirror_workers,
+                max_size=args.mirror_max_size * 1024 * 1024,
+                deadline=deadline
+            )
 
-    if create_version_info_file:
-        save_version_info_file(
-            tag_list=tag_list,
-            file_path=output_path / 'versions.json'
+        versions_path = output_path / VERSIONS_FOLDER
+        if args.dedup is not None and versions_path.is_dir():
+            if deadline is not None and monotonic() > deadline:
+                # the versions are deduplicated by the next run
+                logger.warning('Time budget exceeded, skipping deduplication')
+            else:
+                deduplicate_versions(
+                    path=versions_path,
+                    mode=args.dedup,
+                    workers=args.dedup_workers
+                )
+
+        if args.detail_pages:
+            generator.render_details(
+                path=output_path,
+                template=args.detail_template,
+                workers=args.detail_workers,
+                deadline=deadline
+            )
+
+        generator.render(
+            path=output_path,
+            templates=template_files,
+            outputs=outputs,
+            workers=args.render_workers,
+            versions_format=versions_format
+            if args.create_version_info_file else None,
+            versions_fields=args.versions_fields
         )
 
-    create_html_files(
-        tag_list=tag_list,
-        path=output_path,
-        template=template_file
-    )
+        if args.skip_unchanged:
+            # repeat incomplete runs even if no tag changed, artifacts expire
+            # without any tag change
+            save_fingerprint(
+                path=fingerprint_file,
+                fingerprint=fingerprint
+                if is_complete(tag_list=generator.tag_list) and
+                not args.verify_artifacts else None
+            )
+    finally:
+        if isinstance(session, RecordingSession):
+            session.save(path=args.record)
+        if cache is not None:
+            logger.info('HTTP cache: {}'.format(cache.stats))
+
+    if generator.pending:
+        raise SystemExit(args.partial_exit_code)
 
 
 if __name__ == '__main__':
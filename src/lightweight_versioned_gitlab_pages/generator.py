@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Generate versioned pages in-process, reusing the GitLab client, its session
+and the loaded templates across multiple runs
+"""
+
+import logging
+from functools import partial
+from gitlab.v4.objects.projects import Project
+from jinja2 import Environment
+from pathlib import Path
+from requests import Session
+from typing import (Any, Callable, Dict, List, Optional, Sequence, Tuple,
+                    Union)
+
+from .generate import (ArtifactJob, TagInfo, VERSION_INFO_FIELD_PRESETS,
+                       VERSIONS_FILE_NAMES, create_output_directory,
+                       create_output_files, fill_pending_tags, get_project,
+                       get_project_tags, get_project_tags_graphql,
+                       save_version_info_file)
+from .coalesce import RequestCoalescer
+from .details import create_detail_pages
+from .fingerprint import get_fingerprint
+from .httpcache import ResponseCache, create_session
+from .mirror import mirror_artifacts
+from .probe import probe_artifacts
+
+logger = logging.getLogger(__name__)
+
+# called with the keyword arguments project, job_name, web_url, artifact_jobs,
+# deadline and coalescer
+Fetcher = Callable[..., List[TagInfo]]
+FETCH_STRATEGIES: Tuple[str, ...] = ('serial', 'threaded', 'bulk')
+
+
+def get_fetcher(fetcher: Union[str, Fetcher],
+                workers: int,
+                raw: bool = False) -> Fetcher:
+    """
+    Get the function fetching the tags of a project.
+
+    "serial" resolves the tags one by one with the REST API, "threaded" by
+    multiple workers and "bulk" fetches them with a few paged GraphQL queries.
+
+    :param      fetcher:  The fetch strategy, one of FETCH_STRATEGIES or a
+                          function
+    :type       fetcher:  Union[str, Fetcher]
+    :param      workers:  The number of concurrently resolved tags
+    :type       workers:  int
+    :param      raw:      Flag to use the REST API listings as plain JSON
+    :type       raw:      bool
+    :raise      ValueError:  The fetch strategy is unknown
+
+    :returns:   The fetch function.
+    :rtype:     Fetcher
+    """
+    if callable(fetcher):
+        return fetcher
+    if fetcher == 'serial':
+        return partial(get_project_tags, raw=True) if raw \
+            else get_project_tags
+    if fetcher == 'threaded':
+        return partial(get_project_tags, workers=workers, raw=raw)
+    if fetcher == 'bulk':
+        return partial(get_project_tags_graphql, workers=workers, raw=raw)
+
+    raise ValueError("Unknown fetch strategy '{}'".format(fetcher))
+
+
+class VersionedPagesGenerator(object):
+    """
+    Generate the versioned pages of a GitLab project.
+
+    The GitLab client with its pooled session, the sessions of the artifact
+    verification and the templates are created once and reused by all
+    subsequent calls of :meth:`refresh` and :meth:`render`.
+    """
+
+    def __init__(self,
+                 project_id: int,
+                 url: str = 'https://gitlab.com',
+                 private_token: Optional[str] = None,
+                 artifact_jobs: Optional[Sequence[ArtifactJob]] = None,
+                 pages_base_url: Optional[str] = None,
+                 site_url: Optional[str] = None,
+                 timeout: Optional[float] = None,
+                 deadline: Optional[float] = None,
+                 fetcher: Union[str, Fetcher] = 'serial',
+                 workers: int = 8,
+                 pool_size: Optional[int] = None,
+                 session: Optional[Session] = None,
+                 cache: Optional[ResponseCache] = None,
+                 raw: bool = False) -> None:
+        """
+        Initialize the generator, no request is made.
+
+        :param      project_id:      The project identifier
+        :type       project_id:      int
+        :param      url:             The GitLab URL
+        :type       url:             str
+        :param      private_token:   The private token
+        :type       private_token:   Optional[str]
+        :param      artifact_jobs:   The jobs to resolve, the first one is
+                                     used for the version links
+        :type       artifact_jobs:   Optional[Sequence[ArtifactJob]]
+        :param      pages_base_url:  The URL of the GitLab page, derived from
+                                     the project if None
+        :type       pages_base_url:  Optional[str]
+        :param      site_url:        The URL of the published page, derived
+                                     from the project if None
+        :type       site_url:        Optional[str]
+        :param      timeout:         The timeout of each API request in
+                                     seconds
+        :type       timeout:         Optional[float]
+        :param      deadline:        The deadline as monotonic time in
+                                     seconds, limits the timeout of each API
+                                     request
+        :type       deadline:        Optional[float]
+        :param      fetcher:         The fetch strategy, one of
+                                     FETCH_STRATEGIES or a function
+        :type       fetcher:         Union[str, Fetcher]
+        :param      workers:         The number of concurrently resolved
+                                     tags of the "threaded" fetch strategy
+        :type       workers:         int
+        :param      pool_size:       The number of pooled connections,
+                                     defaults to the number of workers
+        :type       pool_size:       Optional[int]
+        :param      session:         The session of all API requests, pooled
+                                     connections are added
+        :type       session:         Optional[Session]
+        :param      cache:           The cache of GET API responses, shared
+                                     by all runs
+        :type       cache:           Optional[ResponseCache]
+        :param      raw:             Flag to use the REST API listings of the
+                                     "serial" and "threaded" fetch strategy
+                                     as plain JSON
+        :type       raw:             bool
+        """
+        self.url = url
+        self.project_id = project_id
+        self.artifact_jobs = list(artifact_jobs or [ArtifactJob(name=None)])
+        self.session = create_session(pool_size=pool_size or workers,
+                                      session=session,
+                                      cache=cache)
+        self.tag_list: List[TagInfo] = []
+        self.stats: Dict[str, int] = {}
+
+        self._private_token = private_token
+        self._pages_base_url = pages_base_url
+        self._site_url = site_url
+        self._timeout = timeout
+        self._deadline = deadline
+        self._fetcher = get_fetcher(fetcher=fetcher, workers=workers, raw=raw)
+        self._project: Optional[Project] = None
+        self._probe_session: Optional[Session] = None
+        self._environments: Dict[Path, Environment] = {}
+
+    @property
+    def project(self) -> Project:
+        """
+        Get the GitLab project, fetched by the first access.
+
+        :returns:   The project.
+        :rtype:     Project
+        """
+        if self._project is None:
+            self._project = get_project(
+                url=self.url,
+                private_token=self._private_token,
+                project_id=self.project_id,
+                session=self.session,
+                timeout=self._timeout,
+                deadline=self._deadline
+            )
+
+        return self._project
+
+    @property
+    def web_url(self) -> str:
+        """
+        Get the URL of the GitLab page.
+
+        :returns:   The pages base URL.
+        :rtype:     str
+        """
+        if self._pages_base_url is None:
+            self._pages_base_url = 'https://{owner}.gitlab.io/-/{name}'.format(
+                owner=self.project.attributes['namespace']['name'],
+                name=self.project.attributes['name']
+            )
+
+        return self._pages_base_url
+
+    @property
+    def site_url(self) -> str:
+        """
+        Get the URL of the published page, used by feeds and sitemaps.
+
+        :returns:   The site URL.
+        :rtype:     str
+        """
+        if self._site_url is None:
+            self._site_url = 'https://{owner}.gitlab.io/{name}'.format(
+                owner=self.project.attributes['namespace']['name'],
+                name=self.project.attributes['name']
+            )
+
+        return self._site_url
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of pending tags of the last refresh.
+
+        :returns:   The number of pending tags.
+        :rtype:     int
+        """
+        return sum(x.pending for x in self.tag_list)
+
+    def fingerprint(self,
+                    config: Dict[str, Any],
+                    page_size: int = 20) -> Optional[str]:
+        """
+        Get the fingerprint of the latest tags and the configuration.
+
+        :param      config:     The configuration affecting the output
+        :type       config:     Dict[str, Any]
+        :param      page_size:  The number of latest tags
+        :type       page_size:  int
+
+        :returns:   The fingerprint, None if the tag set can not be compared.
+        :rtype:     Optional[str]
+        """
+        return get_fingerprint(
+            project=self.project,
+            config=config,
+            page_size=page_size
+        )
+
+    def refresh(self,
+                deadline: Optional[float] = None,
+                previous: Optional[Dict[str, Dict[str, Any]]] = None
+                ) -> List[TagInfo]:
+        """
+        Fetch all tags of the project.
+
+        Lookups of tags sharing a commit or pipeline are coalesced within a
+        refresh, their numbers are kept in the stats.
+
+        :param      deadline:  The deadline as monotonic time in seconds
+        :type       deadline:  Optional[float]
+        :param      previous:  The previous version information by tag name,
+                               used to fill tags not resolved in time
+        :type       previous:  Optional[Dict[str, Dict[str, Any]]]
+
+        :returns:   The tag list.
+        :rtype:     List[TagInfo]
+        """
+        coalescer = RequestCoalescer()
+        self.tag_list = self._fetcher(
+            project=self.project,
+            job_name=self.artifact_jobs[0].name,
+            web_url=self.web_url,
+            artifact_jobs=self.artifact_jobs,
+            deadline=deadline,
+            coalescer=coalescer
+        )
+        self.stats = coalescer.stats
+
+        if self.pending:
+            filled = fill_pending_tags(
+                tag_list=self.tag_list,
+                previous=previous or {}
+            )
+            logger.warning('{} tags not resolved in time, {} taken from '
+                           'previous version info'.format(self.pending,
+                                                          filled))
+
+        return self.tag_list
+
+    def verify(self,
+               workers: int = 8,
+               time_budget: float = 30.0,
+               hide_unavailable: bool = False) -> None:
+        """
+        Verify the artifacts of all resolved tags.
+
+        :param      workers:           The number of concurrent requests, the
+                                       session is sized by the first call
+        :type       workers:           int
+        :param      time_budget:       The time budget in seconds
+        :type       time_budget:       float
+        :param      hide_unavailable:  Flag to remove unavailable tags
+        :type       hide_unavailable:  bool
+        """
+        if self._probe_session is None:
+            self._probe_session = create_session(pool_size=workers)
+
+        probe_artifacts(
+            tag_list=[x for x in self.tag_list if not x.pending],
+            workers=workers,
+            time_budget=time_budget,
+            session=self._probe_session
+        )
+
+        if hide_unavailable:
+            self.tag_list = [
+                x for x in self.tag_list if x.available is not False
+            ]
+
+    def mirror(self,
+               path: Path,
+               workers: int = 4,
+               max_size: int = 100 * 1024 * 1024,
+               deadline: Optional[float] = None) -> Dict[str, int]:
+        """
+        Mirror the artifacts of the first job of all tags.
+
+        :param      path:      The path to the output folder
+        :type       path:      Path
+        :param      workers:   The number of concurrent downloads
+        :type       workers:   int
+        :param      max_size:  The maximum artifacts size per tag in bytes
+        :type       max_size:  int
+        :param      deadline:  The deadline as monotonic time in seconds, no
+                               download is started afterwards
+        :type       deadline:  Optional[float]
+
+        :returns:   Number of mirrored, skipped, failed, deferred and pruned
+                    versions.
+        :rtype:     Dict[str, int]
+        """
+        return mirror_artifacts(
+            project=self.project,
+            tag_list=self.tag_list,
+            path=path,
+            folder=self.artifact_jobs[0].folder,
+            index_file=self.artifact_jobs[0].index_file,
+            workers=workers,
+            max_size=max_size,
+            deadline=deadline
+        )
+
+    def render_details(self,
+                       path: Path,
+                       template: Optional[Path] = None,
+                       workers: int = 4,
+                       deadline: Optional[float] = None) -> Dict[str, int]:
+        """
+        Render the detail pages of all changed tags, the index files link to
+        them if rendered before.
+
+        :param      path:      The path to the output folder
+        :type       path:      Path
+        :param      template:  Path to custom template file
+        :type       template:  Optional[Path]
+        :param      workers:   The number of render processes
+        :type       workers:   int
+        :param      deadline:  The deadline as monotonic time in seconds, no
+                               page is rendered afterwards
+        :type       deadline:  Optional[float]
+
+        :returns:   Number of rendered, unchanged, deferred and removed pages.
+        :rtype:     Dict[str, int]
+        """
+        return create_detail_pages(
+            tag_list=self.tag_list,
+            path=path,
+            template=template,
+            workers=workers,
+            deadline=deadline
+        )
+
+    def render(self,
+               path: Path,
+               templates: Sequence[Optional[Path]] = (None, ),
+               outputs: Sequence[Optional[Path]] = (),
+               workers: int = 4,
+               versions_format: Optional[str] = None,
+               versions_fields: Sequence[str] =
+               VERSION_INFO_FIELD_PRESETS['minimal']) -> None:
+        """
+        Render all templates and the version info file of the tag list.
+
+        :param      path:             The path to the output folder
+        :type       path:             Path
+        :param      templates:        The template files, None for the default
+        :type       templates:        Sequence[Optional[Path]]
+        :param      outputs:          The output file of each template
+        :type       outputs:          Sequence[Optional[Path]]
+        :param      workers:          The number of concurrently rendered
+                                      files
+        :type       workers:          int
+        :param      versions_format:  The format of the version info file,
+                                      no file is created if None
+        :type       versions_format:  Optional[str]
+        :param      versions_fields:  The fields of each version entry
+        :type       versions_fields:  Sequence[str]
+        """
+        create_output_directory(path=path)
+
+        if versions_format is not None:
+            save_version_info_file(
+                tag_list=self.tag_list,
+                file_path=path / VERSIONS_FILE_NAMES[versions_format],
+                versions_format=versions_format,
+                fields=versions_fields
+            )
+
+        create_output_files(
+            tag_list=self.tag_list,
+            path=path,
+            templates=templates,
+            outputs=outputs,
+            pages_base_url=self.web_url,
+            site_url=self.site_url,
+            project_url=self.project.attributes.get('web_url', ''),
+            workers=workers,
+            environments=self._environments
+        )
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Fetch the pipelines of all project tags with their commit and jobs in bulk
+via the GitLab GraphQL API
+"""
+
+from gitlab import Gitlab
+from typing import Any, Collection, Dict, Iterator, List, Optional
+
+FRAGMENTS = """
+fragment PipelineFields on Pipeline {
+  id iid ref sha status source createdAt updatedAt path
+}
+fragment JobFields on CiJob {
+  id name status
+  artifacts { nodes { fileType expireAt } }
+}
+"""
+
+# the last pipeline of the commit of each tag pipeline is the one used by the
+# REST API, usually it is the tag pipeline itself
+TAG_PIPELINES_QUERY = """
+query TagPipelines($fullPath: ID!, $first: Int!, $jobsFirst: Int!,
+                   $after: String) {
+  project(fullPath: $fullPath) {
+    pipelines(scope: TAGS, first: $first, after: $after) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        ...PipelineFields
+        commit {
+          pipelines(first: 1) { nodes { ...PipelineFields } }
+        }
+        jobs(first: $jobsFirst) {
+          pageInfo { hasNextPage endCursor }
+          nodes { ...JobFields }
+        }
+      }
+    }
+  }
+}
+""" + FRAGMENTS
+
+PIPELINE_JOBS_QUERY = """
+query PipelineJobs($fullPath: ID!, $iid: ID!, $first: Int!, $after: String) {
+  project(fullPath: $fullPath) {
+    pipeline(iid: $iid) {
+      jobs(first: $first, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes { ...JobFields }
+      }
+    }
+  }
+}
+""" + FRAGMENTS
+
+# maximum page size of the GitLab GraphQL API
+JOB_PAGE_SIZE = 100
+
+
+class GraphQLError(Exception):
+    """Raised if the GraphQL API returned errors or no data"""
+    pass
+
+
+def parse_global_id(gid: str) -> int:
+    """
+    Get the numeric ID of a GraphQL global ID.
+
+    :param      gid:  The global ID, e.g. "gid://gitlab/Ci::Build/1234"
+    :type       gid:  str
+
+    :returns:   The numeric ID.
+    :rtype:     int
+    """
+    return int(gid.rsplit('/', 1)[-1])
+
+
+def execute_query(gl: Gitlab,
+                  query: str,
+                  variables: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute a GraphQL query with the session of the GitLab client.
+
+    :param      gl:         The GitLab client
+    :type       gl:         Gitlab
+    :param      query:      The query
+    :type       query:      str
+    :param      variables:  The query variables
+    :type       variables:  Dict[str, Any]
+    :raise      GraphQLError:  The response contains errors or no data
+
+    :returns:   The data of the response.
+    :rtype:     Dict[str, Any]
+    """
+    result = gl.http_post(
+        '{}/api/graphql'.format(gl.url),
+        post_data={'query': query, 'variables': variables}
+    )
+
+    if not isinstance(result, dict):
+        raise GraphQLError('Unexpected GraphQL response')
+    if result.get('errors'):
+        raise GraphQLError('; '.join(
+            str(error.get('message', error)) for error in result['errors']
+        ))
+    if not result.get('data') or not result['data'].get('project'):
+        raise GraphQLError('GraphQL response contains no project data')
+
+    data: Dict[str, Any] = result['data']['project']
+
+    return data
+
+
+def get_pipeline_jobs(gl: Gitlab,
+                      full_path: str,
+                      pipeline: Dict[str, Any],
+                      page_size: int) -> List[Dict[str, Any]]:
+    """
+    Get all jobs of a pipeline node, fetch the remaining pages if needed.
+
+    :param      gl:         The GitLab client
+    :type       gl:         Gitlab
+    :param      full_path:  The full path of the project
+    :type       full_path:  str
+    :param      pipeline:   The pipeline node of a TagPipelines query, all
+                            pages are fetched if it has no jobs connection
+    :type       pipeline:   Dict[str, Any]
+    :param      page_size:  The number of jobs per query
+    :type       page_size:  int
+
+    :returns:   The job nodes.
+    :rtype:     List[Dict[str, Any]]
+    """
+    jobs: List[Dict[str, Any]] = []
+    page_info: Dict[str, Any] = {'hasNextPage': True, 'endCursor': None}
+
+    if 'jobs' in pipeline:
+        jobs.extend(pipeline['jobs']['nodes'])
+        page_info = pipeline['jobs']['pageInfo']
+
+    while page_info['hasNextPage']:
+        data = execute_query(
+            gl=gl,
+            query=PIPELINE_JOBS_QUERY,
+            variables={
+                'fullPath': full_path,
+                'iid': pipeline['iid'],
+                'first': page_size,
+                'after': page_info['endCursor'],
+            }
+        )
+        connection = data['pipeline']['jobs']
+        jobs.extend(connection['nodes'])
+        page_info = connection['pageInfo']
+
+    return jobs
+
+
+def get_tag_pipelines(gl: Gitlab,
+                      full_path: str,
+                      page_size: int = 20,
+                      job_page_size: int = JOB_PAGE_SIZE,
+                      refs: Optional[Collection[str]] = None
+                      ) -> Iterator[Dict[str, Any]]:
+    """
+    Get the last pipeline of the commit of each tag with all jobs.
+
+    The tag pipelines are listed newest first, older pipelines of an already
+    returned tag are skipped. Like the REST API, the last pipeline of the
+    commit of the tag is returned, its jobs are fetched separately if it is
+    not the tag pipeline. The "tag" of each pipeline is the name of the tag,
+    the "jobs" are a list of all job nodes.
+
+    Pipelines of deleted tags are kept by GitLab, if the existing tags are
+    given only their pipelines are returned and no further pages are fetched
+    once all of them are found.
+
+    :param      gl:             The GitLab client
+    :type       gl:             Gitlab
+    :param      full_path:      The full path of the project
+    :type       full_path:      str
+    :param      page_size:      The number of pipelines per query
+    :type       page_size:      int
+    :param      job_page_size:  The number of jobs per pipeline and query
+    :type       job_page_size:  int
+    :param      refs:           The names of the existing tags, all if None
+    :type       refs:           Optional[Collection[str]]
+
+    :returns:   The pipeline nodes.
+    :rtype:     Iterator[Dict[str, Any]]
+    """
+    seen_refs = set()
+    after: Optional[str] = None
+
+    while True:
+        data = execute_query(
+            gl=gl,
+            query=TAG_PIPELINES_QUERY,
+            variables={'fullPath': full_path, 'first': page_size,
+                       'jobsFirst': job_page_size, 'after': after}
+        )
+        connection = data['pipelines']
+
+        for pipeline in connection['nodes']:
+            if pipeline['ref'] in seen_refs:
+                continue
+            if refs is not None and pipeline['ref'] not in refs:
+                continue
+            seen_refs.add(pipeline['ref'])
+
+            commit = pipeline.get('commit') or {}
+            last_pipeline = (commit.get('pipelines', {}).get('nodes') or
+                             [pipeline])[0]
+            if last_pipeline['id'] == pipeline['id']:
+                last_pipeline = pipeline
+
+            last_pipeline = dict(last_pipeline, tag=pipeline['ref'])
+            last_pipeline['jobs'] = get_pipeline_jobs(
+                gl=gl,
+                full_path=full_path,
+                pipeline=last_pipeline,
+                page_size=job_page_size
+            )
+            yield last_pipeline
+
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        if refs is not None and len(seen_refs) >= len(refs):
+            break
+        after = connection['pageInfo']['endCursor']
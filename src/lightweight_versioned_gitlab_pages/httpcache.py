@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Cache GitLab API responses on disk and revalidate them with conditional
+requests
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from fnmatch import fnmatch
+from pathlib import Path
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from threading import Lock
+from time import time
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from .cassette import build_response, dump_response
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+# request headers of the credentials, only their hash is part of the key
+AUTH_HEADERS = ('PRIVATE-TOKEN', 'JOB-TOKEN', 'Authorization')
+
+
+def get_cache_key(request: PreparedRequest) -> str:
+    """
+    Get the key of a request in the cache.
+
+    Responses depend on the permissions of the user, requests with different
+    credentials do not share a cache entry.
+
+    :param      request:  The request
+    :type       request:  PreparedRequest
+
+    :returns:   The hex digest of the URL and the credentials.
+    :rtype:     str
+    """
+    content = json.dumps([
+        request.url,
+        [request.headers.get(x, '') for x in AUTH_HEADERS]
+    ])
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(object):
+    """
+    Size bounded disk cache of responses by request key.
+
+    Each response is stored in its own file. The least recently used files
+    are removed once the total size exceeds the maximum size. The size and
+    use order of the files are scanned once and kept in memory afterwards.
+    """
+
+    def __init__(self,
+                 path: Path,
+                 max_size: int = 100 * 1024 * 1024,
+                 ttls: Sequence[Tuple[str, float]] = ()) -> None:
+        """
+        Initialize the cache, the folder is created by the first response.
+
+        :param      path:      The path to the cache folder
+        :type       path:      Path
+        :param      max_size:  The maximum total size in bytes
+        :type       max_size:  int
+        :param      ttls:      The URL path pattern and the time in seconds
+                               a response is used without revalidation, the
+                               first matching pattern applies
+        :type       ttls:      Sequence[Tuple[str, float]]
+        """
+        self.path = path
+        self.max_size = max_size
+        self.ttls = list(ttls)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self._lock = Lock()
+        # size of each entry by key, least recently used first
+        self._index: Optional['OrderedDict[str, int]'] = None
+        self._total = 0
+
+    def get_ttl(self, url: str) -> float:
+        """
+        Get the time to live of the response of a URL.
+
+        :param      url:  The url
+        :type       url:  str
+
+        :returns:   The time to live in seconds, 0 if none matches.
+        :rtype:     float
+        """
+        path = urlsplit(url).path
+
+        for pattern, ttl in self.ttls:
+            if fnmatch(path, pattern):
+                return ttl
+
+        return 0.0
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cache entry and mark it as recently used.
+
+        :param      key:  The request key
+        :type       key:  str
+
+        :returns:   The cache entry, None if there is no valid one.
+        :rtype:     Optional[Dict[str, Any]]
+        """
+        file_path = self.path / (key + '.json')
+
+        try:
+            entry: Dict[str, Any] = json.loads(file_path.read_text())
+            os.utime(file_path)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('version') != CACHE_VERSION:
+            return None
+
+        with self._lock:
+            if self._index is not None and key in self._index:
+                self._index.move_to_end(key)
+
+        return entry
+
+    def store(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Store a cache entry and evict the least recently used ones.
+
+        :param      key:    The request key
+        :type       key:    str
+        :param      entry:  The cache entry
+        :type       entry:  Dict[str, Any]
+        """
+        file_path = self.path / (key + '.json')
+        tmp_path = file_path.with_suffix('.tmp')
+        content = json.dumps(dict(entry, version=CACHE_VERSION)).encode()
+
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(content)
+            tmp_path.replace(file_path)
+        except OSError as e:
+            logger.warning('Failed to cache {}: {}'.format(entry['url'], e))
+            return
+
+        with self._lock:
+            index = self._get_index()
+            self._total += len(content) - index.pop(key, 0)
+            index[key] = len(content)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries exceeding the maximum size"""
+        with self._lock:
+            index = self._get_index()
+
+            while index and self._total > self.max_size:
+                key, size = index.popitem(last=False)
+                self._total -= size
+
+                try:
+                    (self.path / (key + '.json')).unlink()
+                except OSError:
+                    continue
+
+                self.evicted += 1
+
+    def _get_index(self) -> 'OrderedDict[str, int]':
+        """
+        Get the size of each entry, the files are scanned by the first call.
+
+        The lock has to be held by the caller.
+
+        :returns:   The size by key, least recently used first.
+        :rtype:     OrderedDict[str, int]
+        """
+        if self._index is None:
+            files = []
+            for file_path in self.path.glob('*.json'):
+                try:
+                    files.append((file_path, file_path.stat()))
+                except OSError:
+                    continue
+
+            self._index = OrderedDict(
+                (file_path.stem, stat.st_size) for file_path, stat in
+                sorted(files, key=lambda x: x[1].st_mtime)
+            )
+            self._total = sum(self._index.values())
+
+        return self._index
+
+    def count(self, name: str) -> None:
+        """
+        Increment a statistics counter.
+
+        :param      name:  The counter, one of hits, revalidated or misses
+        :type       name:  str
+        """
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of cached, revalidated and fetched responses.
+
+        :returns:   Number of hits, revalidated, misses and evicted entries.
+        :rtype:     Dict[str, int]
+        """
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'evicted': self.evicted,
+        }
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter serving GET requests from a response cache.
+
+    A cached response is used as is within its time to live, afterwards it is
+    revalidated by its ETag or Last-Modified header. A "304 Not Modified"
+    response has no payload, the cached one is returned instead. Streamed
+    requests, like artifact downloads, are never cached.
+    """
+
+    def __init__(self, cache: ResponseCache, **kwargs: Any) -> None:
+        """
+        Initialize the adapter.
+
+        :param      cache:   The response cache
+        :type       cache:   ResponseCache
+        :param      kwargs:  The arguments of the HTTPAdapter
+        :type       kwargs:  Any
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self,
+             request: PreparedRequest,
+             stream: bool = False,
+             timeout: Union[None, float, Tuple[float, float],
+                            Tuple[float, None]] = None,
+             verify: Union[bool, str] = True,
+             cert: Union[None, bytes, str, Tuple[Union[bytes, str],
+                                                 Union[bytes, str]]] = None,
+             proxies: Optional[Mapping[str, str]] = None) -> Response:
+        kwargs: Dict[str, Any] = dict(stream=stream, timeout=timeout,
+                                      verify=verify, cert=cert,
+                                      proxies=proxies)
+
+        if request.method != 'GET' or stream:
+            return super().send(request, **kwargs)
+
+        url = request.url or ''
+        key = get_cache_key(request=request)
+        entry = self.cache.load(key=key)
+        conditional = request
+
+        if entry is not None:
+            if time() - entry['stored_at'] < self.cache.get_ttl(url=url):
+                self.cache.count('hits')
+                return build_response(request=request, data=entry['response'])
+
+            conditional = request.copy()
+            headers = CaseInsensitiveDict(entry['response']['headers'])
+            if 'ETag' in headers:
+                conditional.headers['If-None-Match'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                conditional.headers['If-Modified-Since'] = \
+                    headers['Last-Modified']
+
+        response = super().send(conditional, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            response.close()
+            for name in ('ETag', 'Last-Modified'):
+                if name in response.headers:
+                    headers[name] = response.headers[name]
+            entry['response']['headers'] = dict(headers)
+            entry['stored_at'] = time()
+            self.cache.store(key=key, entry=entry)
+            self.cache.count('revalidated')
+
+            return build_response(request=request, data=entry['response'])
+
+        self.cache.count('misses')
+        validated = 'ETag' in response.headers or \
+            'Last-Modified' in response.headers
+
+        if response.status_code == 200 and \
+                (validated or self.cache.get_ttl(url=url) > 0):
+            self.cache.store(key=key, entry={
+                'url': url,
+                'stored_at': time(),
+                'response': dump_response(response=response),
+            })
+
+        return response
+
+
+def create_session(pool_size: int,
+                   session: Optional[Session] = None,
+                   cache: Optional[ResponseCache] = None) -> Session:
+    """
+    Create a HTTP session with a connection pool sized for all workers.
+
+    :param      pool_size:  The number of pooled connections per host
+    :type       pool_size:  int
+    :param      session:    The session to configure, a new one if None
+    :type       session:    Optional[Session]
+    :param      cache:      The cache of GET responses, none if None
+    :type       cache:      Optional[ResponseCache]
+
+    :returns:   The session.
+    :rtype:     Session
+    """
+    if session is None:
+        session = Session()
+
+    adapter: HTTPAdapter
+    if cache is None:
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+    else:
+        adapter = CachingAdapter(cache=cache,
+                                 pool_connections=pool_size,
+                                 pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Mirror the job artifacts of all tags into the output folder
+"""
+
+import logging
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from gitlab.exceptions import GitlabError
+from gitlab.v4.objects.projects import Project
+from pathlib import Path, PurePosixPath
+from requests import Response
+from tempfile import TemporaryFile, mkdtemp
+from time import monotonic
+from typing import BinaryIO, Dict, List, Optional, TYPE_CHECKING
+from urllib.parse import quote
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .generate import TagInfo
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_FOLDER = 'versions'
+# content-addressed store of deduplicated files, never pruned
+STORE_FOLDER = '_store'
+MARKER_FILE = '.job_id'
+CHUNK_SIZE = 1024 * 1024
+
+
+class MirrorError(Exception):
+    """Raised if an artifact archive can not be mirrored"""
+    pass
+
+
+def get_version_folder_name(tag_name: str) -> str:
+    """
+    Get the name of the folder of a mirrored version.
+
+    :param      tag_name:  The tag name
+    :type       tag_name:  str
+
+    :returns:   The folder name.
+    :rtype:     str
+    """
+    return tag_name.replace('/', '_').replace('\\', '_')
+
+
+def download_artifacts(project: Project,
+                       job_id: int,
+                       file: BinaryIO,
+                       max_size: int) -> None:
+    """
+    Download the artifacts archive of a job in chunks.
+
+    :param      project:   The project
+    :type       project:   Project
+    :param      job_id:    The job identifier
+    :type       job_id:    int
+    :param      file:      The file to write the archive to
+    :type       file:      BinaryIO
+    :param      max_size:  The maximum archive size in bytes
+    :type       max_size:  int
+    :raise      MirrorError:  The archive exceeds the maximum size
+    """
+    response = project.manager.gitlab.http_get(
+        '/projects/{}/jobs/{}/artifacts'.format(project.id, job_id),
+        streamed=True,
+        raw=True
+    )
+    if not isinstance(response, Response):
+        raise MirrorError('Unexpected response for job {}'.format(job_id))
+
+    size = 0
+
+    try:
+        if int(response.headers.get('Content-Length', 0)) > max_size:
+            raise MirrorError('Artifacts of job {} exceed {} bytes'.format(
+                job_id, max_size
+            ))
+
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise MirrorError('Artifacts of job {} exceed {} bytes'.format(
+                    job_id, max_size
+                ))
+            file.write(chunk)
+    finally:
+        response.close()
+
+
+def extract_artifacts(file: BinaryIO,
+                      folder: str,
+                      target: Path,
+                      max_size: int) -> None:
+    """
+    Extract the content of a folder of an artifacts archive.
+
+    :param      file:      The artifacts archive
+    :type       file:      BinaryIO
+    :param      folder:    The folder inside the archive to extract
+    :type       folder:    str
+    :param      target:    The target folder
+    :type       target:    Path
+    :param      max_size:  The maximum extracted size in bytes
+    :type       max_size:  int
+    :raise      MirrorError:  The content is too large or has invalid paths
+    """
+    prefix = folder.strip('/') + '/'
+
+    with zipfile.ZipFile(file) as archive:
+        members = [
+            x for x in archive.infolist()
+            if x.filename.startswith(prefix) and not x.is_dir()
+        ]
+
+        if sum(x.file_size for x in members) > max_size:
+            raise MirrorError('Extracted artifacts exceed {} bytes'.format(
+                max_size
+            ))
+
+        for member in members:
+            relative = PurePosixPath(member.filename[len(prefix):])
+            if relative.is_absolute() or '..' in relative.parts:
+                raise MirrorError('Invalid artifact path {}'.format(
+                    member.filename
+                ))
+
+            destination = target.joinpath(*relative.parts)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with archive.open(member) as src, open(destination, 'wb') as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+
+def is_mirrored(tag: 'TagInfo', path: Path) -> bool:
+    """
+    Determine whether the job of a tag is already mirrored.
+
+    :param      tag:   The tag
+    :type       tag:   TagInfo
+    :param      path:  The versions folder
+    :type       path:  Path
+
+    :returns:   True if mirrored, False otherwise.
+    :rtype:     bool
+    """
+    marker = path / get_version_folder_name(tag_name=tag.tag.name) / \
+        MARKER_FILE
+
+    return marker.is_file() and marker.read_text().strip() == str(tag.job_id)
+
+
+def mirror_tag(project: Project,
+               tag: 'TagInfo',
+               path: Path,
+               folder: str,
+               max_size: int) -> bool:
+    """
+    Mirror the artifacts of a tag, unless the job is already mirrored.
+
+    :param      project:   The project
+    :type       project:   Project
+    :param      tag:       The tag
+    :type       tag:       TagInfo
+    :param      path:      The versions folder
+    :type       path:      Path
+    :param      folder:    The artifact folder to mirror
+    :type       folder:    str
+    :param      max_size:  The maximum archive and extracted size in bytes
+    :type       max_size:  int
+
+    :returns:   Flag whether the artifacts have been downloaded.
+    :rtype:     bool
+    """
+    name = get_version_folder_name(tag_name=tag.tag.name)
+    version_path = path / name
+
+    if is_mirrored(tag=tag, path=path):
+        return False
+
+    tmp_path = Path(mkdtemp(dir=path, prefix='.{}.'.format(name)))
+
+    try:
+        with TemporaryFile() as archive:
+            download_artifacts(
+                project=project,
+                job_id=tag.job_id,
+                file=archive,
+                max_size=max_size
+            )
+            archive.seek(0)
+            extract_artifacts(
+                file=archive,
+                folder=folder,
+                target=tmp_path,
+                max_size=max_size
+            )
+        (tmp_path / MARKER_FILE).write_text(str(tag.job_id))
+
+        if version_path.exists():
+            shutil.rmtree(version_path)
+        tmp_path.rename(version_path)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return True
+
+
+def prune_versions(path: Path, names: List[str]) -> int:
+    """
+    Remove all mirrored versions and leftovers not in the list of names.
+
+    The detail pages "<name>.html" of the current versions are kept.
+
+    :param      path:   The versions folder
+    :type       path:   Path
+    :param      names:  The folder names of all current versions
+    :type       names:  List[str]
+
+    :returns:   Number of removed versions.
+    :rtype:     int
+    """
+    pruned = 0
+
+    for version_path in path.iterdir():
+        if version_path.name in names or version_path.name == STORE_FOLDER:
+            continue
+        if version_path.suffix == '.html' and version_path.stem in names:
+            continue
+
+        if version_path.is_dir():
+            shutil.rmtree(version_path)
+        else:
+            version_path.unlink()
+
+        if not version_path.name.startswith('.'):
+            pruned += 1
+
+    return pruned
+
+
+def mirror_artifacts(project: Project,
+                     tag_list: List['TagInfo'],
+                     path: Path,
+                     folder: str = 'public',
+                     index_file: str = 'index.html',
+                     workers: int = 4,
+                     max_size: int = 100 * 1024 * 1024,
+                     deadline: Optional[float] = None) -> Dict[str, int]:
+    """
+    Mirror the artifacts of all tags and link to the mirrored versions.
+
+    The artifacts are extracted to "versions/<tag>" of the output folder.
+    Already mirrored jobs are not downloaded again, pending tags are skipped
+    and versions of no longer existing tags are removed. The pages URL of each
+    successfully mirrored tag is replaced by the relative path to the index
+    file of the version. After the deadline no further download is started,
+    the deferred tags keep linking to their artifacts.
+
+    :param      project:     The project
+    :type       project:     Project
+    :param      tag_list:    The tag list
+    :type       tag_list:    List[TagInfo]
+    :param      path:        The path to the output folder
+    :type       path:        Path
+    :param      folder:      The artifact folder to mirror
+    :type       folder:      str
+    :param      index_file:  The index file in the artifact folder
+    :type       index_file:  str
+    :param      workers:     The number of concurrent downloads
+    :type       workers:     int
+    :param      max_size:    The maximum archive and extracted size per tag
+    :type       max_size:    int
+    :param      deadline:    The deadline as monotonic time in seconds
+    :type       deadline:    Optional[float]
+
+    :returns:   Number of mirrored, skipped, failed, deferred and pruned
+                versions.
+    :rtype:     Dict[str, int]
+    """
+    versions_path = path / VERSIONS_FOLDER
+    versions_path.mkdir(parents=True, exist_ok=True)
+    result = {
+        'mirrored': 0, 'skipped': 0, 'failed': 0, 'deferred': 0, 'pruned': 0
+    }
+    tags = [
+        x for x in tag_list
+        if x.job_id != -1 and x.available is not False and not x.pending
+    ]
+
+    def mirror(tag: 'TagInfo') -> str:
+        if deadline is not None and monotonic() > deadline and \
+                not is_mirrored(tag=tag, path=versions_path):
+            return 'deferred'
+
+        try:
+            downloaded = mirror_tag(
+                project=project,
+                tag=tag,
+                path=versions_path,
+                folder=folder,
+                max_size=max_size
+            )
+        except (MirrorError, GitlabError, OSError, zipfile.BadZipFile) as e:
+            logger.warning('Failed to mirror {}: {}'.format(tag.tag.name, e))
+            return 'failed'
+
+        pages_url = '{}/{}/{}'.format(
+            VERSIONS_FOLDER,
+            quote(get_version_folder_name(tag_name=tag.tag.name)),
+            index_file
+        )
+        for job in tag.jobs.values():
+            if job.job_id == tag.job_id and job.pages_url == tag.pages_url:
+                job.pages_url = pages_url
+        tag.pages_url = pages_url
+
+        return 'mirrored' if downloaded else 'skipped'
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for status in executor.map(mirror, tags):
+            result[status] += 1
+
+    result['pruned'] = prune_versions(
+        path=versions_path,
+        names=[get_version_folder_name(tag_name=x.tag.name) for x in tag_list]
+    )
+    logger.info('Mirrored artifacts: {}'.format(result))
+
+    return result
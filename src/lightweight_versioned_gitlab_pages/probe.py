@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Verify the availability of the job artifacts linked on the index page
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from requests import Session
+from requests.exceptions import RequestException
+from time import monotonic
+from typing import Dict, List, Optional, TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
+
+from .httpcache import create_session
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .generate import TagInfo
+
+logger = logging.getLogger(__name__)
+
+# path of the GitLab sign in page, private artifacts redirect to it
+SIGN_IN_PATH = '/users/sign_in'
+
+
+def is_url_available(session: Session,
+                     url: str,
+                     timeout: float) -> Optional[bool]:
+    """
+    Determine whether a URL is available by a HEAD request.
+
+    Redirects are not followed. A redirect to another host, e.g. the OAuth
+    page of GitLab Pages access control, or to the sign in page means the
+    artifact is not publicly available.
+
+    :param      session:  The session
+    :type       session:  Session
+    :param      url:      The url
+    :type       url:      str
+    :param      timeout:  The request timeout in seconds
+    :type       timeout:  float
+
+    :returns:   Availability of the URL, None if the request failed.
+    :rtype:     Optional[bool]
+    """
+    try:
+        response = session.head(url, allow_redirects=False, timeout=timeout)
+    except RequestException as e:
+        logger.warning('Failed to verify {}: {}'.format(url, e))
+        return None
+
+    if 300 <= response.status_code < 400:
+        location = urlsplit(urljoin(url, response.headers.get('Location', '')))
+
+        return location.netloc == urlsplit(url).netloc and \
+            not location.path.rstrip('/').endswith(SIGN_IN_PATH)
+
+    return response.status_code < 400
+
+
+def probe_artifacts(tag_list: List['TagInfo'],
+                    workers: int = 8,
+                    time_budget: float = 30.0,
+                    session: Optional[Session] = None) -> None:
+    """
+    Verify the artifacts of all tags and set the availability of the tags.
+
+    The artifacts expiration date of the job is used if it is known, a HEAD
+    request to the pages URL is made otherwise. Tags which could not be
+    verified within the time budget keep an availability of None.
+
+    :param      tag_list:     The tag list
+    :type       tag_list:     List[TagInfo]
+    :param      workers:      The number of concurrent requests
+    :type       workers:      int
+    :param      time_budget:  The time budget of all requests in seconds
+    :type       time_budget:  float
+    :param      session:      The session used for the requests
+    :type       session:      Optional[Session]
+    """
+    now = datetime.now(timezone.utc)
+    pending: List['TagInfo'] = []
+
+    for tag in tag_list:
+        if tag.job_id == -1:
+            continue
+
+        if tag.artifacts_expire_at is not None:
+            tag.available = tag.artifacts_expire_at > now
+        else:
+            pending.append(tag)
+
+    if not pending:
+        return
+
+    probe_session = session or create_session(pool_size=workers)
+    deadline = monotonic() + time_budget
+
+    def probe(url: str) -> Optional[bool]:
+        return is_url_available(
+            session=probe_session,
+            url=url,
+            timeout=max(deadline - monotonic(), 0.1)
+        )
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures: Dict['Future[Optional[bool]]', 'TagInfo'] = {
+        executor.submit(probe, tag.pages_url): tag for tag in pending
+    }
+
+    done, not_done = wait(futures, timeout=time_budget)
+
+    for future in not_done:
+        future.cancel()
+    executor.shutdown(wait=False)
+
+    for future in done:
+        futures[future].available = future.result()
+
+    if not_done:
+        logger.warning('Time budget exceeded, {} of {} artifacts not verified'.
+                       format(len(not_done), len(futures)))
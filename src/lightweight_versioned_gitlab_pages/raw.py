@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Fetch GitLab API listings as plain JSON without creating python-gitlab objects
+"""
+
+from gitlab.v4.objects.projects import Project
+from typing import Any, Dict, Iterator, List, cast
+
+# maximum page size of the GitLab API
+PER_PAGE = 100
+
+
+def iterate_data(project: Project,
+                 path: str,
+                 per_page: int = PER_PAGE) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over all items of a paginated API listing.
+
+    The pages are requested lazily with the client of the project, the items
+    are the decoded JSON objects of the response.
+
+    :param      project:   The project
+    :type       project:   Project
+    :param      path:      The API path, e.g. "/projects/1/repository/tags"
+    :type       path:      str
+    :param      per_page:  The number of items per page
+    :type       per_page:  int
+
+    :returns:   The items of all pages.
+    :rtype:     Iterator[Dict[str, Any]]
+    """
+    # "iterator" replaces "as_list" only since python-gitlab 3.6
+    return iter(project.manager.gitlab.http_list(path,
+                                                 as_list=False,
+                                                 per_page=per_page))
+
+
+def list_tag_data(project: Project) -> List[Dict[str, Any]]:
+    """
+    Get all tags of the project.
+
+    :param      project:  The project
+    :type       project:  Project
+
+    :returns:   The tag data.
+    :rtype:     List[Dict[str, Any]]
+    """
+    return list(iterate_data(project=project,
+                             path=cast(str, project.tags.path)))
+
+
+def list_pipeline_job_data(project: Project,
+                           pipeline_id: int) -> List[Dict[str, Any]]:
+    """
+    Get all jobs of a pipeline, without requesting the pipeline itself.
+
+    :param      project:      The project
+    :type       project:      Project
+    :param      pipeline_id:  The pipeline identifier
+    :type       pipeline_id:  int
+
+    :returns:   The job data.
+    :rtype:     List[Dict[str, Any]]
+    """
+    return list(iterate_data(
+        project=project,
+        path='{}/{}/jobs'.format(project.pipelines.path, pipeline_id)
+    ))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Shared factories of the unittests"""
+
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import MagicMock
+
+from lightweight_versioned_gitlab_pages import generate
+
+WEB_URL = 'https://gitlab.com/brainelectronics/asdf'
+
+
+def create_tag_info(name: str = '0.1.0',
+                    job_id: int = 1,
+                    **kwargs: Any) -> generate.TagInfo:
+    """
+    Create the information of a tag with a mocked GitLab tag and commit.
+
+    The tag points to the commit "bcf01494<job_id>" whose last pipeline
+    succeeded, the "docs" job is the only artifact job. Further TagInfo
+    fields are set by the keyword arguments.
+
+    :param      name:    The tag name
+    :type       name:    str
+    :param      job_id:  The job identifier, -1 for none
+    :type       job_id:  int
+
+    :returns:   The tag information.
+    :rtype:     TagInfo
+    """
+    sha = 'bcf01494{}'.format(job_id)
+    commit_attributes = {
+        'id': sha,
+        'short_id': sha[:8],
+        'title': 'Release {}'.format(name),
+        'author_name': 'brainelectronics',
+        'web_url': '{}/-/commit/{}'.format(WEB_URL, sha),
+        'last_pipeline': {
+            'id': 100 + job_id,
+            'status': 'success',
+            'ref': name,
+            'web_url': '{}/-/pipelines/{}'.format(WEB_URL, 100 + job_id),
+        },
+    }
+    tag = MagicMock()
+    tag.name = name
+    tag.attributes = {'name': name, 'message': '', 'commit': {'id': sha}}
+    pages_url = 'https://asdf/-/jobs/{}/artifacts/public/index.html'.format(
+        job_id
+    )
+    values = {
+        'created_at': datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc),
+        'pages_url': pages_url,
+        'jobs': {'docs': generate.JobInfo(job_id=job_id, pages_url=pages_url)},
+    }
+    values.update(kwargs)
+
+    return generate.TagInfo(
+        tag=tag,
+        commit=MagicMock(attributes=commit_attributes, **commit_attributes),
+        job_id=job_id,
+        **values
+    )
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the record and replay of GitLab API traffic"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from typing import Any, Dict, List
+import unittest
+
+from lightweight_versioned_gitlab_pages import cassette, generate
+
+SHA = 'bcf01494ee7d7a9ebb5d95e77bcd7462d39d1aa4'
+
+
+class GitLabStandIn(BaseHTTPRequestHandler):
+    """Serve a project with a single tag, its commit, pipeline and jobs"""
+    paths: List[str] = []
+    responses: Dict[str, Any] = {
+        '/api/v4/projects/1234': {
+            'id': 1234,
+            'name': 'asdf',
+            'web_url': 'http://gitlab/asdf',
+            'namespace': {'name': 'qwertz'},
+        },
+        '/api/v4/projects/1234/repository/tags': [{
+            'name': '0.1.0',
+            'commit': {'id': SHA, 'created_at': '2023-02-03T15:04:40.000Z'},
+        }],
+        '/api/v4/projects/1234/repository/commits/{}'.format(SHA): {
+            'id': SHA,
+            'last_pipeline': {'id': 42},
+        },
+        '/api/v4/projects/1234/pipelines/42': {'id': 42},
+        '/api/v4/projects/1234/pipelines/42/jobs': [
+            {'id': 7, 'name': 'test', 'status': 'success'},
+            {'id': 8, 'name': 'docs', 'status': 'success'},
+        ],
+    }
+
+    def do_GET(self) -> None:
+        path = self.path.split('?')[0]
+        self.paths.append(path)
+        content = json.dumps(self.responses[path]).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Set-Cookie', 'session=secret')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        GitLabStandIn.paths = []
+        self._server = HTTPServer(('127.0.0.1', 0), GitLabStandIn)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._url = 'http://127.0.0.1:{}'.format(self._server.server_port)
+
+        self._tmp_dir = TemporaryDirectory()
+        self._cassette = Path(self._tmp_dir.name) / 'run.json'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._tmp_dir.cleanup()
+
+    def _run(self,
+             session: cassette.Session,
+             raw: bool = False) -> List[generate.TagInfo]:
+        project = generate.get_project(
+            url=self._url,
+            private_token='qwertz1234',
+            project_id=1234,
+            session=session
+        )
+
+        return generate.get_project_tags(
+            project=project,
+            job_name='docs',
+            web_url='http://pages',
+            raw=raw
+        )
+
+    def test_encode_body(self):
+        for body in (None, 'asdf', b'asdf', b'\x89PNG\xff'):
+            data = cassette.encode_body(body=body)
+            expectation = body.encode() if isinstance(body, str) else body
+            self.assertEqual(cassette.decode_body(data=data),
+                             expectation or b'')
+
+        self.assertEqual(cassette.encode_body(body=b'\xff')['encoding'],
+                         'base64')
+
+    def test_record_replay(self):
+        session = cassette.RecordingSession()
+        recorded = self._run(session=session)
+        session.save(path=self._cassette)
+
+        self.assertEqual(len(GitLabStandIn.paths), 5)
+        content = self._cassette.read_text()
+        self.assertNotIn('qwertz1234', content)
+        self.assertNotIn('session=secret', content)
+
+        # replay without the server
+        self._server.shutdown()
+        session = cassette.ReplaySession(path=self._cassette, latency=0.01)
+        start = perf_counter()
+        replayed = self._run(session=session)
+
+        self.assertGreaterEqual(perf_counter() - start, 5 * 0.01)
+        self.assertEqual(len(GitLabStandIn.paths), 5)
+        self.assertEqual(len(replayed), 1)
+        self.assertEqual(replayed[0].tag.name, recorded[0].tag.name)
+        self.assertEqual(replayed[0].created_at, recorded[0].created_at)
+        self.assertEqual(replayed[0].job_id, 8)
+        self.assertEqual(replayed[0].pages_url, recorded[0].pages_url)
+        self.assertEqual(replayed[0].job_ids, [{'test': 7}, {'docs': 8}])
+
+        # each recorded response is served once
+        with self.assertRaises(cassette.CassetteError):
+            self._run(session=session)
+
+    def test_get_project_tags_raw(self):
+        expectation = self._run(session=cassette.Session())
+        GitLabStandIn.paths = []
+        result = self._run(session=cassette.Session(), raw=True)
+
+        # the jobs are listed without requesting the pipeline
+        self.assertNotIn('/api/v4/projects/1234/pipelines/42',
+                         GitLabStandIn.paths)
+        self.assertEqual(len(GitLabStandIn.paths), 4)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].tag.attributes,
+                         expectation[0].tag.attributes)
+        self.assertEqual(result[0].commit.attributes,
+                         expectation[0].commit.attributes)
+        for name in ('created_at', 'job_id', 'pages_url', 'job_ids',
+                     'job_statuses', 'jobs'):
+            self.assertEqual(getattr(result[0], name),
+                             getattr(expectation[0], name))
+
+    def test_replay_unsupported_version(self):
+        self._cassette.write_text(json.dumps({'version': 0}))
+
+        with self.assertRaises(cassette.CassetteError):
+            cassette.ReplaySession(path=self._cassette)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the coalescing of identical API requests"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import unittest
+from unittest.mock import MagicMock
+
+from lightweight_versioned_gitlab_pages import coalesce
+
+
+class TestCoalesce(unittest.TestCase):
+
+    def test_single_flight(self):
+        single_flight = coalesce.SingleFlight()
+        started = Event()
+        release = Event()
+        calls = []
+
+        def function() -> int:
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(single_flight.do, 'key', function)
+            started.wait(timeout=5)
+            others = [
+                executor.submit(single_flight.do, 'key', function)
+                for _ in range(3)
+            ]
+            release.set()
+
+            results = [x.result() for x in [first] + others]
+
+        self.assertEqual(results, [42, 42, 42, 42])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(single_flight.calls, 1)
+        self.assertEqual(single_flight.coalesced, 3)
+
+        # results are kept
+        self.assertEqual(single_flight.do('key', lambda: 0), 42)
+        self.assertEqual(single_flight.do('other', lambda: 0), 0)
+
+    def test_single_flight_error(self):
+        single_flight = coalesce.SingleFlight()
+
+        def function() -> int:
+            raise ValueError('asdf')
+
+        with self.assertRaises(ValueError):
+            single_flight.do('key', function)
+
+        # failed calls are retried
+        self.assertEqual(single_flight.do('key', lambda: 1), 1)
+        self.assertEqual(single_flight.calls, 2)
+
+    def test_request_coalescer(self):
+        project = MagicMock()
+        project.pipelines.get.return_value.jobs.list.return_value = iter(
+            ['job']
+        )
+        coalescer = coalesce.RequestCoalescer()
+
+        for _ in range(3):
+            commit = coalescer.get_commit(project=project, sha='bcf01494')
+            jobs = coalescer.get_pipeline_jobs(project=project,
+                                               pipeline_id=42)
+
+            self.assertIs(commit, project.commits.get.return_value)
+            self.assertEqual(jobs, ['job'])
+
+        project.commits.get.assert_called_once_with('bcf01494')
+        project.pipelines.get.assert_called_once_with(42)
+        self.assertEqual(coalescer.stats,
+                         {'commits': 1, 'pipelines': 1, 'coalesced': 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
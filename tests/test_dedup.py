@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the deduplication of mirrored versions"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+from lightweight_versioned_gitlab_pages import dedup, mirror
+
+INDEX = b'<link href="_static/theme.css">' \
+    b'<script src="_static/app.js"></script>'
+THEME = b'body { background: url("../img/logo.png"); }'
+APP = b'console.log("app");' * 100
+LOGO = b'\x89PNG' * 100
+PAGE = b'<picture><source srcset="img/logo.png 1x, img/big.png 2x">' \
+    b'<img srcset="img/big.png 640w,img/logo.png" src="img/logo.png">' \
+    b'</picture><video poster="img/poster.png"></video>'
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        self._tmp_dir = TemporaryDirectory()
+        self._path = Path(self._tmp_dir.name).resolve()
+
+        for version in ('0.1.0', '0.2.0'):
+            self._write(version, 'index.html', INDEX)
+            self._write(version, '_static/theme.css', THEME)
+            self._write(version, '_static/app.js', APP)
+            self._write(version, 'img/logo.png', LOGO)
+        self._write('0.2.0', 'img/new.png', b'new')
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _write(self, version: str, name: str, content: bytes) -> None:
+        path = self._path / version / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+    def test_get_file_hashes(self):
+        files = [self._path / '0.1.0' / 'index.html',
+                 self._path / '0.2.0' / 'index.html',
+                 self._path / '0.2.0' / 'img' / 'new.png']
+
+        result = dedup.get_file_hashes(paths=files, workers=2)
+
+        self.assertEqual(result[files[0]], result[files[1]])
+        self.assertNotEqual(result[files[0]], result[files[2]])
+        self.assertEqual(result[files[2]], dedup.hash_file(files[2]))
+
+    def test_deduplicate_versions_hardlink(self):
+        result = dedup.deduplicate_versions(path=self._path, workers=2)
+
+        self.assertEqual(result['files'], 9)
+        self.assertEqual(result['contents'], 5)
+        self.assertEqual(result['bytes_saved'],
+                         len(INDEX) + len(THEME) + len(APP) + len(LOGO))
+
+        for name in ('index.html', '_static/app.js', 'img/logo.png'):
+            first = self._path / '0.1.0' / name
+            second = self._path / '0.2.0' / name
+            self.assertTrue(first.samefile(second))
+            self.assertEqual(first.stat().st_nlink, 3)
+
+        store = self._path / mirror.STORE_FOLDER
+        self.assertEqual(len(list(store.glob('*/*'))), 4)
+
+        # nothing left to save, content is kept while linked by any version
+        result = dedup.deduplicate_versions(path=self._path, workers=2)
+        self.assertEqual(result['bytes_saved'], 0)
+
+        mirror.prune_versions(path=self._path, names=['0.2.0'])
+        dedup.deduplicate_versions(path=self._path, workers=2)
+        self.assertEqual(len(list(store.glob('*/*'))), 4)
+
+        mirror.prune_versions(path=self._path, names=[])
+        dedup.deduplicate_versions(path=self._path, workers=2)
+        self.assertEqual(len(list(store.glob('*/*'))), 0)
+
+    def test_deduplicate_versions_rewrite(self):
+        result = dedup.deduplicate_versions(path=self._path, mode='rewrite')
+
+        self.assertEqual(result['bytes_saved'], 2 * len(APP) + 2 * len(LOGO))
+
+        for version in ('0.1.0', '0.2.0'):
+            folder = self._path / version
+            self.assertFalse((folder / '_static' / 'app.js').exists())
+            self.assertFalse((folder / 'img' / 'logo.png').exists())
+            self.assertTrue((folder / '_static' / 'theme.css').exists())
+
+            index = (folder / 'index.html').read_text()
+            self.assertIn('href="_static/theme.css"', index)
+            script = index.split('src="')[1].split('"')[0]
+            self.assertTrue(script.startswith('../_store/'))
+            self.assertEqual((folder / script).read_bytes(), APP)
+
+            theme = (folder / '_static' / 'theme.css').read_text()
+            logo = theme.split('url("')[1].split('"')[0]
+            self.assertTrue(logo.startswith('../../_store/'))
+            self.assertEqual((folder / '_static' / logo).read_bytes(), LOGO)
+
+        self.assertTrue((self._path / '0.2.0' / 'img' / 'new.png').exists())
+
+        mirror.prune_versions(path=self._path, names=['0.2.0'])
+        self._write('0.3.0', 'index.html', INDEX)
+        self._write('0.3.0', '_static/app.js', APP)
+        result = dedup.deduplicate_versions(path=self._path, mode='rewrite')
+
+        self.assertEqual(result['bytes_saved'], len(APP))
+        store = self._path / mirror.STORE_FOLDER
+        self.assertEqual(len(list(store.glob('*/*'))), 2)
+
+    def test_deduplicate_versions_rewrite_srcset(self):
+        for version in ('0.1.0', '0.2.0'):
+            self._write(version, 'page.html', PAGE)
+            self._write(version, 'img/big.png', LOGO * 2)
+            self._write(version, 'img/poster.png', b'poster' * 100)
+
+        dedup.deduplicate_versions(path=self._path, mode='rewrite')
+
+        for version in ('0.1.0', '0.2.0'):
+            folder = self._path / version
+            page = (folder / 'page.html').read_text()
+
+            self.assertNotIn('img/logo.png', page)
+            self.assertNotIn('img/big.png', page)
+            self.assertFalse((folder / 'img' / 'logo.png').exists())
+            self.assertFalse((folder / 'img' / 'big.png').exists())
+            for candidate in page.split('srcset="')[1].split('"')[0].split(
+                    ','):
+                url, descriptor = candidate.split()
+                self.assertTrue(url.startswith('../_store/'))
+                self.assertTrue((folder / url).is_file())
+                self.assertIn(descriptor, ('1x', '2x'))
+
+            # references of unknown attributes keep the duplicate
+            self.assertIn('poster="img/poster.png"', page)
+            self.assertTrue((folder / 'img' / 'poster.png').exists())
+
+    def test_deduplicate_versions_rewrite_unknown_reference(self):
+        self._write('0.1.0', 'object.html',
+                    b'<object data="./img/logo.png"></object>')
+
+        dedup.deduplicate_versions(path=self._path, mode='rewrite')
+
+        # the logo of the other version is still moved to the store
+        folder = self._path / '0.1.0'
+        self.assertTrue((folder / 'img' / 'logo.png').exists())
+        self.assertFalse((folder / '_static' / 'app.js').exists())
+        self.assertFalse((self._path / '0.2.0' / 'img' / 'logo.png').exists())
+
+    def test_deduplicate_versions_rewrite_hardlinked(self):
+        # same content at another depth, its references are not duplicates
+        self._write('0.2.0', 'docs/index.html', INDEX)
+        dedup.deduplicate_versions(path=self._path)
+        nested = self._path / '0.2.0' / 'docs' / 'index.html'
+        self.assertTrue(nested.samefile(self._path / '0.1.0' / 'index.html'))
+
+        dedup.deduplicate_versions(path=self._path, mode='rewrite')
+
+        self.assertEqual(nested.read_bytes(), INDEX)
+        for version in ('0.1.0', '0.2.0'):
+            index = self._path / version / 'index.html'
+            self.assertFalse(index.samefile(nested))
+            self.assertIn(b'src="../_store/', index.read_bytes())
+
+    def test_deduplicate_versions_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            dedup.deduplicate_versions(path=self._path, mode='copy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the detail pages of the tags"""
+
+from nose2.tools import params
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import monotonic
+import unittest
+
+from lightweight_versioned_gitlab_pages import details, generate
+from tests.helpers import WEB_URL, create_tag_info
+
+
+class TestDetails(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        self._tmp_dir = TemporaryDirectory()
+        self._path = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _create_tag_info(self, name: str, job_id: int) -> generate.TagInfo:
+        return create_tag_info(
+            name=name,
+            job_id=job_id,
+            job_ids=[{'docs': job_id}, {'test': job_id + 1}],
+            job_statuses={job_id: 'success', job_id + 1: 'failed'}
+        )
+
+    @params(
+        ('', ''),
+        ('https://asdf/index.html', 'https://asdf/index.html'),
+        ('versions/0.1.0/index.html', '../versions/0.1.0/index.html'),
+    )
+    def test_get_relative_url(self, url: str, expectation: str):
+        self.assertEqual(details.get_relative_url(url=url), expectation)
+
+    def test_get_detail_context(self):
+        tag = self._create_tag_info(name='feature/0.1.0', job_id=10)
+        tag.pages_url = tag.jobs['docs'].pages_url = \
+            'versions/feature_0.1.0/index.html'
+
+        context = details.get_detail_context(tag=tag, project_url=WEB_URL)
+
+        self.assertEqual(details.get_detail_page_name(tag_name=tag.tag.name),
+                         'feature_0.1.0.html')
+        self.assertEqual(context['tag_url'],
+                         '{}/-/tags/feature%2F0.1.0'.format(WEB_URL))
+        self.assertEqual(context['pages_url'],
+                         '../versions/feature_0.1.0/index.html')
+        self.assertEqual(context['pipeline']['id'], 110)
+        self.assertEqual(context['jobs'], [
+            {
+                'id': 10,
+                'name': 'docs',
+                'status': 'success',
+                'web_url': '{}/-/jobs/10'.format(WEB_URL),
+                'artifacts_url': '{}/-/jobs/10/artifacts/browse'.format(
+                    WEB_URL),
+                'pages_url': '../versions/feature_0.1.0/index.html',
+            },
+            {
+                'id': 11,
+                'name': 'test',
+                'status': 'failed',
+                'web_url': '{}/-/jobs/11'.format(WEB_URL),
+                'artifacts_url': '{}/-/jobs/11/artifacts/browse'.format(
+                    WEB_URL),
+                'pages_url': '',
+            },
+        ])
+
+    @params(1, 2)
+    def test_create_detail_pages(self, workers: int):
+        versions = self._path / 'versions'
+        tag_list = [
+            self._create_tag_info(name='0.{}.0'.format(x), job_id=x * 10)
+            for x in range(1, 4)
+        ]
+
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=workers)
+
+        self.assertEqual(result, {'rendered': 3, 'unchanged': 0, 'deferred': 0,
+                                  'removed': 0})
+        self.assertEqual(sorted(x.name for x in versions.iterdir()),
+                         ['0.1.0.html', '0.2.0.html', '0.3.0.html'])
+        self.assertEqual(tag_list[0].details_url, 'versions/0.1.0.html')
+        content = (versions / '0.1.0.html').read_text()
+        self.assertIn('{}/-/jobs/11'.format(WEB_URL), content)
+        self.assertIn('failed', content)
+
+        # only the changed tag is rendered again, removed tags are removed
+        tag_list[1].job_statuses[21] = 'success'
+        tag_list[2].pending = True
+        tag_list.append(self._create_tag_info(name='0.4.0', job_id=40))
+        del tag_list[0]
+
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=workers)
+
+        self.assertEqual(result, {'rendered': 2, 'unchanged': 0, 'deferred': 0,
+                                  'removed': 1})
+        self.assertEqual(sorted(x.name for x in versions.iterdir()),
+                         ['0.2.0.html', '0.3.0.html', '0.4.0.html'])
+        self.assertEqual(tag_list[1].details_url, 'versions/0.3.0.html')
+
+        tag_list[1].pending = False
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=workers)
+
+        self.assertEqual(result, {'rendered': 0, 'unchanged': 3, 'deferred': 0,
+                                  'removed': 0})
+
+        # a lost page is rendered again
+        (versions / '0.4.0.html').unlink()
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=workers)
+
+        self.assertEqual(result['rendered'], 1)
+
+    def test_create_detail_pages_deadline(self):
+        versions = self._path / 'versions'
+        tag_list = [
+            self._create_tag_info(name='0.{}.0'.format(x), job_id=x * 10)
+            for x in range(1, 3)
+        ]
+        details.create_detail_pages(tag_list=tag_list[:1],
+                                    path=self._path,
+                                    workers=1)
+        tag_list[0].job_statuses[11] = 'success'
+
+        # changed tags keep the page of the last run, new tags have none
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=1,
+                                             deadline=monotonic() - 1)
+
+        self.assertEqual(result, {'rendered': 0, 'unchanged': 0, 'deferred': 2,
+                                  'removed': 0})
+        self.assertEqual(sorted(x.name for x in versions.iterdir()),
+                         ['0.1.0.html'])
+        self.assertIn('failed', (versions / '0.1.0.html').read_text())
+        self.assertEqual(tag_list[0].details_url, 'versions/0.1.0.html')
+        self.assertEqual(tag_list[1].details_url, '')
+
+        # the deferred pages are rendered by the next run
+        result = details.create_detail_pages(tag_list=tag_list,
+                                             path=self._path,
+                                             workers=1)
+
+        self.assertEqual(result['rendered'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the fingerprint of unchanged runs"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Optional, Tuple
+import unittest
+from unittest.mock import MagicMock
+
+from lightweight_versioned_gitlab_pages import fingerprint, generate
+from tests.helpers import create_tag_info
+
+
+class TagList(list):
+    """Tag list with the total number of tags of the X-Total header"""
+    total: Optional[int] = None
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def _create_project(self,
+                        tags: List[Tuple[str, str]],
+                        total: Optional[int]) -> MagicMock:
+        tag_list = TagList()
+        tag_list.total = total
+
+        for name, sha in tags:
+            tag = MagicMock()
+            tag.name = name
+            tag.attributes = {'name': name, 'commit': {'id': sha}}
+            tag_list.append(tag)
+
+        project = MagicMock()
+        project.tags.list.return_value = tag_list
+
+        return project
+
+    def test_get_fingerprint(self):
+        tags = [('0.2.0', 'bcf01494'), ('0.1.0', '23fb4d72')]
+        config = {'job_name': ['docs']}
+        project = self._create_project(tags=tags, total=2)
+
+        result = fingerprint.get_fingerprint(project=project, config=config)
+
+        project.tags.list.assert_called_once_with(
+            as_list=False, per_page=20, order_by='updated', sort='desc'
+        )
+        self.assertEqual(
+            result,
+            fingerprint.get_fingerprint(
+                project=self._create_project(tags=tags, total=2),
+                config=config
+            )
+        )
+
+        for other_project, other_config in (
+            (self._create_project(tags=tags, total=3), config),
+            (self._create_project(tags=tags[:1], total=2), config),
+            (self._create_project(tags=[('0.2.0', 'asdf'), tags[1]],
+                                  total=2), config),
+            (self._create_project(tags=tags, total=2), {'job_name': []}),
+        ):
+            self.assertNotEqual(
+                result,
+                fingerprint.get_fingerprint(project=other_project,
+                                            config=other_config)
+            )
+
+        # only the first page is used
+        self.assertEqual(
+            fingerprint.get_fingerprint(project=project, config=config,
+                                        page_size=1),
+            fingerprint.get_fingerprint(
+                project=self._create_project(tags=tags[:1], total=2),
+                config=config,
+                page_size=1
+            )
+        )
+
+    def test_get_fingerprint_unknown_total(self):
+        project = self._create_project(tags=[('0.1.0', '23fb4d72')],
+                                       total=None)
+
+        self.assertIsNone(fingerprint.get_fingerprint(project=project,
+                                                      config={}))
+
+    def test_load_save_fingerprint(self):
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'cache' / fingerprint.FINGERPRINT_FILE
+
+            self.assertIsNone(fingerprint.load_fingerprint(path=path))
+            fingerprint.save_fingerprint(path=path, fingerprint='asdf')
+            self.assertEqual(fingerprint.load_fingerprint(path=path), 'asdf')
+
+            fingerprint.save_fingerprint(path=path, fingerprint=None)
+            self.assertFalse(path.exists())
+            fingerprint.save_fingerprint(path=path, fingerprint=None)
+
+    def _create_tag_list(self, *statuses: str) -> List[generate.TagInfo]:
+        tag_list = [
+            create_tag_info(name='0.{}.0'.format(x), job_id=x)
+            for x in range(len(statuses), 0, -1)
+        ]
+        for tag, status in zip(tag_list, statuses):
+            tag.commit.attributes['last_pipeline']['status'] = status
+
+        return tag_list
+
+    def test_is_complete(self):
+        self.assertTrue(fingerprint.is_complete(tag_list=[]))
+        self.assertTrue(fingerprint.is_complete(
+            tag_list=self._create_tag_list('failed', 'manual', 'success')
+        ))
+        # pipeline of the newest tag not yet finished
+        self.assertFalse(fingerprint.is_complete(
+            tag_list=self._create_tag_list('running', 'success')
+        ))
+        # retried pipeline of an older tag
+        self.assertFalse(fingerprint.is_complete(
+            tag_list=self._create_tag_list('success', 'pending')
+        ))
+
+        tag_list = self._create_tag_list('success', 'success')
+        tag_list[1].pending = True
+        self.assertFalse(fingerprint.is_complete(tag_list=tag_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
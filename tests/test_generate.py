@@ -3,18 +3,25 @@
 """Unittest for testing the documentation index page"""
 
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import gitlab
 import jinja2
+import json
 import logging
+import logging.handlers
 from nose2.tools import params
 from pathlib import Path
 from sys import stdout
-from typing import Optional
+from tempfile import TemporaryDirectory
+from time import monotonic
+from typing import List, Optional, Tuple
 import unittest
 from unittest.mock import patch, MagicMock
+from xml.etree import ElementTree
 
-from lightweight_versioned_gitlab_pages import generate
+from lightweight_versioned_gitlab_pages import (cassette, coalesce, generate,
+                                                generator)
+from tests.helpers import create_tag_info
 
 
 class TestGenerate(unittest.TestCase):
@@ -52,12 +59,45 @@ class TestGenerate(unittest.TestCase):
             'url': 'https://gitlab.com',
             'private_token': None,
             'project_id': '1234',
-            'job_name': 'carl',
+            'job_name': ['carl'],
+            'artifact_folder': None,
+            'index_file': None,
             'output_dir':
                 Path(__file__).parent.parent.expanduser().resolve() / 'public',
             'pages_base_url': None,
+            'site_url': None,
             'create_version_info_file': False,
             'template_file': None,
+            'output': None,
+            'render_workers': 4,
+            'versions_format': 'json',
+            'versions_fields':
+                generate.VERSION_INFO_FIELD_PRESETS['minimal'],
+            'backend': 'rest',
+            'verify_artifacts': False,
+            'probe_workers': 8,
+            'probe_time_budget': 30.0,
+            'hide_unavailable': False,
+            'mirror_artifacts': False,
+            'mirror_workers': 4,
+            'mirror_max_size': 100,
+            'dedup': None,
+            'dedup_workers': 4,
+            'record': None,
+            'replay': None,
+            'replay_latency': 0.0,
+            'time_budget': None,
+            'partial_exit_code': 3,
+            'fetch_workers': 1,
+            'raw_json': False,
+            'http_cache': None,
+            'http_cache_size': 100,
+            'http_cache_ttl': None,
+            'detail_pages': False,
+            'detail_template': None,
+            'detail_workers': 4,
+            'skip_unchanged': False,
+            'fingerprint_file': None,
         }
         args = generate.parse_arguments()
         self.test_logger.debug(args)
@@ -72,7 +112,19 @@ class TestGenerate(unittest.TestCase):
             '--url', 'http://git.my-url.com',
             '--private-token', 'qwertz1234',
             '--output-dir', 'one/dir',
+            '--job-name', 'coverage',
+            '--artifact-folder', 'docs',
+            '--artifact-folder', 'reports/coverage',
+            '--index-file', 'start.html',
             '--template-file', 'tests/data/index.txt',
+            '--output', 'index.html',
+            '--template-file', 'atom.xml',
+            '--output', 'feed/atom.xml',
+            '--render-workers', '2',
+            '--versions-format', 'ndjson',
+            '--versions-fields', 'name, pages_url',
+            '--replay', 'tests/data/cassettes/get_project.json',
+            '--replay-latency', '0.1',
             '--debug', '-vvvv'
         ]
     )
@@ -83,11 +135,25 @@ class TestGenerate(unittest.TestCase):
             'url': 'http://git.my-url.com',
             'private_token': 'qwertz1234',
             'project_id': '1234',
-            'job_name': 'carl',
+            'job_name': ['carl', 'coverage'],
+            'artifact_folder': ['docs', 'reports/coverage'],
+            'index_file': ['start.html'],
             'output_dir': Path('one/dir'),
             'pages_base_url': None,
             'create_version_info_file': False,
-            'template_file': Path(__file__).parent / 'data' / 'index.txt',
+            'template_file': [
+                Path(__file__).parent / 'data' / 'index.txt',
+                generate.TEMPLATE_FOLDER / 'atom.xml',
+            ],
+            'output': [Path('index.html'), Path('feed/atom.xml')],
+            'render_workers': 2,
+            'versions_format': 'ndjson',
+            'versions_fields': ('name', 'pages_url'),
+            'record': None,
+            'replay':
+                Path(__file__).parent / 'data' / 'cassettes' /
+                'get_project.json',
+            'replay_latency': 0.1,
         }
         args = generate.parse_arguments()
         self.test_logger.debug(args)
@@ -103,6 +169,52 @@ class TestGenerate(unittest.TestCase):
         result = generate.parser_valid_file(parser=parser, arg=file_path)
         self.assertEqual(result, Path(file_path).resolve())
 
+    @patch('sys.argv', ['main', '--project-id', '1234', '--job-name', 'carl',
+                        '--output', 'a.html', '--output', 'b.html'])
+    def test_parse_arguments_too_many_outputs(self):
+        with self.assertRaises(SystemExit) as context:
+            generate.parse_arguments()
+
+        self.assertEqual('2', str(context.exception))
+
+    @params(
+        (['--template-file', 'index.html', '--template-file', 'atom.xml',
+          '--output', 'feed.xml', '--template-file', 'sitemap.xml'],
+         [None, Path('feed.xml')]),
+        (['--output', 'start.html'], [Path('start.html')]),
+        (['--template-file', 'atom.xml', '--output', 'feed.xml',
+          '--template-file', 'sitemap.xml', '--output', 'map.xml'],
+         [Path('feed.xml'), Path('map.xml')]),
+        (['--output', 'start.html', '--template-file', 'atom.xml'], None),
+        (['--template-file', 'atom.xml', '--output', 'a.xml',
+          '--output', 'b.xml'], None),
+    )
+    def test_parse_arguments_output(self,
+                                    arguments: List[str],
+                                    expectation: Optional[List[Path]]):
+        argv = ['main', '--project-id', '1234', '--job-name', 'carl']
+
+        with patch('sys.argv', argv + arguments):
+            if expectation is None:
+                with self.assertRaises(SystemExit):
+                    generate.parse_arguments()
+            else:
+                args = generate.parse_arguments()
+                self.assertEqual(args.output, expectation)
+
+    def test_parser_template_file(self):
+        parser = argparse.ArgumentParser()
+
+        result = generate.parser_template_file(parser=parser, arg=__file__)
+        self.assertEqual(result, Path(__file__).resolve())
+
+        result = generate.parser_template_file(parser=parser,
+                                               arg='sitemap.xml')
+        self.assertEqual(result, generate.TEMPLATE_FOLDER / 'sitemap.xml')
+
+        with self.assertRaises(SystemExit):
+            generate.parser_template_file(parser=parser, arg='asdf.qwertz')
+
     def test_parser_invalid_file(self):
         parser = argparse.ArgumentParser()
         file_path = 'asdf.qwertz'
@@ -117,14 +229,40 @@ class TestGenerate(unittest.TestCase):
         token = None
         project_id = 43170198
 
+        session = cassette.ReplaySession(
+            path=Path(__file__).parent / 'data' / 'cassettes' /
+            'get_project.json'
+        )
+
         project = generate.get_project(
             url=url,
             private_token=token,
-            project_id=project_id
+            project_id=project_id,
+            session=session,
+            timeout=5.0
         )
 
         self.assertIsInstance(project, gitlab.v4.objects.projects.Project)
         self.assertEqual(project.id, project_id)
+        self.assertEqual(project.manager.gitlab.timeout, 5.0)
+
+    def test_deadline_gitlab(self):
+        gl = generate.DeadlineGitlab(url='https://gitlab.com', timeout=5.0)
+        self.assertEqual(gl.timeout, 5.0)
+
+        # the timeout shrinks with the time left until the deadline
+        gl.deadline = monotonic() + 3.0
+        self.assertGreater(gl.timeout, 2.0)
+        self.assertLessEqual(gl.timeout, 3.0)
+
+        gl.deadline = monotonic() - 1.0
+        self.assertEqual(gl.timeout, generate.MIN_TIMEOUT)
+        self.assertEqual(gl._get_session_opts()['timeout'],
+                         generate.MIN_TIMEOUT)
+
+        gl.timeout = None
+        gl.deadline = monotonic() + 3.0
+        self.assertLessEqual(gl.timeout, 3.0)
 
     def test_get_project_tags(self):
         project = MagicMock()
@@ -161,9 +299,341 @@ class TestGenerate(unittest.TestCase):
             self.assertIsInstance(tag.created_at, datetime)
             self.test_logger.debug(tag)
 
-    @unittest.skip("Not yet implemented")
-    def test_get_pipeline_job(self):
-        pass
+    def test_get_project_tags_coalesced(self):
+        project = MagicMock()
+        project_tags = []
+
+        for name in ('latest', '1.2.0', '1.2.0-rc1'):
+            tag = MagicMock()
+            tag.attributes = {'commit': {'id': 'bcf01494'}}
+            tag.commit = {'created_at': '2023-02-03T15:04:40.000+00:00'}
+            project_tags.append(tag)
+        project.tags.list = MagicMock(return_value=project_tags)
+        project.commits.get.return_value.last_pipeline = {'id': 42}
+        project.pipelines.get.return_value.jobs.list.return_value = [
+            self._create_job(name='docs', job_id=10, status='success'),
+        ]
+        coalescer = coalesce.RequestCoalescer()
+
+        tags = generate.get_project_tags(
+            project=project,
+            job_name='docs',
+            web_url='asdf',
+            workers=3,
+            coalescer=coalescer
+        )
+
+        self.assertEqual([x.job_id for x in tags], [10, 10, 10])
+        project.commits.get.assert_called_once_with('bcf01494')
+        project.pipelines.get.assert_called_once_with(42)
+        self.assertEqual(coalescer.stats,
+                         {'commits': 1, 'pipelines': 1, 'coalesced': 4})
+
+    def test_get_project_tags_deadline(self):
+        project = MagicMock()
+        project_tags = []
+
+        for name, created_at in (('0.1.0', '2023-02-01T10:00:00Z'),
+                                 ('0.3.0', '2023-02-03T10:00:00Z'),
+                                 ('0.2.0', '2023-02-02T10:00:00Z')):
+            tag = MagicMock()
+            tag.name = name
+            tag.attributes = {
+                'name': name,
+                'commit': {'id': name, 'created_at': created_at},
+            }
+            tag.commit = tag.attributes['commit']
+            project_tags.append(tag)
+        project.tags.list = MagicMock(return_value=project_tags)
+
+        with patch.object(generate, 'get_pipeline_job',
+                          return_value=None) as mock:
+            tags = generate.get_project_tags(
+                project=project,
+                job_name='carl',
+                web_url='asdf',
+                deadline=0.0
+            )
+
+        self.assertEqual([x.tag.name for x in tags],
+                         ['0.1.0', '0.3.0', '0.2.0'])
+        self.assertEqual([x.pending for x in tags], [True, False, True])
+        project.commits.get.assert_called_once_with('0.3.0')
+        mock.assert_called_once()
+        self.assertEqual(tags[0].commit.id, '0.1.0')
+        self.assertEqual(tags[0].created_at,
+                         datetime(2023, 2, 1, 10, tzinfo=timezone.utc))
+
+    @params(
+        ('json', ),
+        ('ndjson', ),
+    )
+    def test_fill_pending_tags(self, versions_format: str):
+        previous_list = [
+            create_tag_info(name='0.2.0', job_id=2),
+            create_tag_info(name='0.1.0', job_id=1),
+        ]
+        tag_list = [
+            create_tag_info(name='0.3.0', job_id=-1),
+            create_tag_info(name='0.2.0', job_id=-1),
+            create_tag_info(name='0.1.0', job_id=-1),
+        ]
+        for tag in tag_list:
+            tag.pending = True
+        tag_list[1].tag.attributes['commit']['id'] = 'bcf014942'
+        # tag moved to another commit since the previous run
+        tag_list[2].tag.attributes['commit']['id'] = 'asdf'
+
+        with TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'versions.json'
+            self.assertEqual(
+                generate.load_version_info_file(file_path=file_path), {}
+            )
+            generate.save_version_info_file(
+                tag_list=previous_list,
+                file_path=file_path,
+                versions_format=versions_format
+            )
+            previous = generate.load_version_info_file(
+                file_path=file_path,
+                versions_format=versions_format
+            )
+
+            file_path.write_text('[{"name": ')
+            self.assertEqual(
+                generate.load_version_info_file(file_path=file_path), {}
+            )
+
+        self.assertEqual(sorted(previous), ['0.1.0', '0.2.0'])
+        self.assertFalse(previous['0.2.0']['pending'])
+
+        filled = generate.fill_pending_tags(
+            tag_list=tag_list,
+            previous=previous
+        )
+
+        self.assertEqual(filled, 1)
+        self.assertEqual([x.job_id for x in tag_list], [-1, 2, -1])
+        self.assertEqual(tag_list[1].pages_url,
+                         'https://asdf/-/jobs/2/artifacts/public/index.html')
+        # the jobs are part of the default fields
+        self.assertEqual(tag_list[1].jobs, previous_list[0].jobs)
+        self.assertTrue(tag_list[1].pending)
+
+    def test_fill_pending_tags_template(self):
+        pipeline = {
+            'id': 771137001,
+            'status': 'success',
+            'web_url': 'https://gitlab.com/asdf/-/pipelines/771137001',
+        }
+        resolved = create_tag_info(name='0.1.0', job_id=1)
+        resolved.commit.attributes['last_pipeline'] = pipeline
+        # the commit of a pending tag is created from the tag listing
+        pending = create_tag_info(name='0.1.0', job_id=-1)
+        pending.tag.attributes['commit']['id'] = 'bcf014941'
+        pending.commit = gitlab.v4.objects.commits.ProjectCommit(
+            MagicMock(),
+            {
+                'id': 'bcf014941',
+                'short_id': 'bcf01494',
+                'web_url': 'https://gitlab.com/asdf/-/commit/bcf014941',
+            }
+        )
+        pending.pending = True
+
+        with TemporaryDirectory() as tmp_dir:
+            generate.save_version_info_file(
+                tag_list=[resolved],
+                file_path=Path(tmp_dir) / 'versions.json'
+            )
+            previous = generate.load_version_info_file(
+                file_path=Path(tmp_dir) / 'versions.json'
+            )
+            filled = generate.fill_pending_tags(
+                tag_list=[pending],
+                previous=previous
+            )
+            generate.create_html_files(
+                tag_list=[pending],
+                path=Path(tmp_dir),
+                template=Path(__file__).parent / 'data' / 'index.txt'
+            )
+            content = (Path(tmp_dir) / 'index.txt').read_text()
+
+        self.assertEqual(filled, 1)
+        self.assertEqual(pending.commit.last_pipeline, pipeline)
+        self.assertIn(
+            '<a href="{}">771137001</a>'.format(pipeline['web_url']),
+            content
+        )
+
+    @params(
+        ('2023-02-03T15:04:40.000+00:00',
+         datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc)),
+        ('2023-02-03T15:04:40.123Z',
+         datetime(2023, 2, 3, 15, 4, 40, 123000, tzinfo=timezone.utc)),
+        ('2023-02-03T16:04:40.000+01:00',
+         datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc)),
+        ('2023-02-03T10:34:40-0430',
+         datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc)),
+        ('2023-02-03T15:04:40',
+         datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc)),
+        ('2023-02-03T16:04:40.12+01:00',
+         datetime(2023, 2, 3, 15, 4, 40, 120000, tzinfo=timezone.utc)),
+    )
+    def test_parse_datetime(self, value: str, expectation: datetime):
+        result = generate.parse_datetime(value=value)
+        self.assertEqual(result, expectation)
+
+    def test_get_artifact_jobs(self):
+        result = generate.get_artifact_jobs(
+            job_names=['docs', 'coverage'],
+            folders=['public', 'reports'],
+            index_files=['start.html']
+        )
+        self.assertEqual(result, [
+            generate.ArtifactJob(name='docs', folder='public',
+                                 index_file='start.html'),
+            generate.ArtifactJob(name='coverage', folder='reports',
+                                 index_file='index.html'),
+        ])
+
+    def _create_job(self, name: str, job_id: int, status: str) -> MagicMock:
+        job = MagicMock()
+        job.name = name
+        job.id = job_id
+        job.status = status
+        job.attributes = {'artifacts_expire_at': None}
+
+        return job
+
+    def test_set_job_info(self):
+        web_url = 'https://brainelectronics.gitlab.io/-/asdf'
+        tag_info = create_tag_info(name='0.1.0', job_id=-1)
+        jobs = [
+            self._create_job(name='docs', job_id=10, status='success'),
+            self._create_job(name='coverage', job_id=11, status='failed'),
+            self._create_job(name='benchmark', job_id=12, status='success'),
+            self._create_job(name='lint', job_id=13, status='success'),
+        ]
+        jobs[2].attributes['artifacts_expire_at'] = '2023-02-10T15:04:40.000Z'
+
+        generate.set_job_info(
+            tag_info=tag_info,
+            jobs=jobs,
+            job_name=None,
+            web_url=web_url,
+            artifact_jobs=[
+                generate.ArtifactJob(name='benchmark', folder='bench'),
+                generate.ArtifactJob(name='docs'),
+                generate.ArtifactJob(name='coverage'),
+            ]
+        )
+
+        self.assertEqual(tag_info.job_id, 12)
+        self.assertEqual(
+            tag_info.pages_url,
+            '{}/-/jobs/12/artifacts/bench/index.html'.format(web_url)
+        )
+        self.assertEqual(tag_info.artifacts_expire_at,
+                         datetime(2023, 2, 10, 15, 4, 40,
+                                  tzinfo=timezone.utc))
+        self.assertEqual(tag_info.job_ids, [
+            {'docs': 10}, {'coverage': 11}, {'benchmark': 12}, {'lint': 13}
+        ])
+        self.assertEqual(tag_info.job_statuses, {
+            10: 'success', 11: 'failed', 12: 'success', 13: 'success'
+        })
+        self.assertEqual(list(tag_info.jobs.keys()),
+                         ['benchmark', 'docs', 'coverage'])
+        self.assertEqual(tag_info.jobs['docs'].job_id, 10)
+        self.assertEqual(
+            tag_info.jobs['docs'].pages_url,
+            '{}/-/jobs/10/artifacts/public/index.html'.format(web_url)
+        )
+        self.assertEqual(tag_info.jobs['coverage'], generate.JobInfo())
+
+    def test_set_job_info_raw(self):
+        web_url = 'https://brainelectronics.gitlab.io/-/asdf'
+        jobs = [
+            self._create_job(name='docs', job_id=10, status='success'),
+            self._create_job(name='lint', job_id=11, status='failed'),
+        ]
+        jobs[0].attributes['artifacts_expire_at'] = '2023-02-10T15:04:40.000Z'
+        tag_infos = [
+            create_tag_info(name='0.1.0', job_id=-1) for _ in range(2)
+        ]
+
+        for tag_info, job_list in zip(tag_infos, (jobs, [
+            dict(x.attributes, name=x.name, id=x.id, status=x.status)
+            for x in jobs
+        ])):
+            generate.set_job_info(
+                tag_info=tag_info,
+                jobs=job_list,
+                job_name='docs',
+                web_url=web_url
+            )
+
+        self.assertEqual(tag_infos[1].job_id, 10)
+        self.assertEqual(tag_infos[1].artifacts_expire_at,
+                         datetime(2023, 2, 10, 15, 4, 40,
+                                  tzinfo=timezone.utc))
+        self.assertEqual(tag_infos[1].job_statuses,
+                         {10: 'success', 11: 'failed'})
+        for name in ('job_id', 'pages_url', 'job_ids', 'jobs'):
+            self.assertEqual(getattr(tag_infos[0], name),
+                             getattr(tag_infos[1], name))
+
+    def test_set_job_info_job_name(self):
+        tag_info = create_tag_info(name='0.1.0', job_id=-1)
+        jobs = [
+            self._create_job(name='docs', job_id=10, status='success'),
+            self._create_job(name='pages', job_id=11, status='success'),
+        ]
+
+        generate.set_job_info(
+            tag_info=tag_info,
+            jobs=jobs,
+            job_name='docs',
+            web_url='asdf'
+        )
+
+        self.assertEqual(tag_info.job_id, 10)
+        self.assertEqual(list(tag_info.jobs.keys()), ['docs'])
+
+    def test_get_output_paths(self):
+        result = generate.get_output_paths(
+            path=Path('public'),
+            templates=[None, Path('templates/atom.xml'), Path('sitemap.xml')],
+            outputs=[None, Path('feed/atom.xml')]
+        )
+
+        self.assertEqual(result, [
+            Path('public/index.html'),
+            Path('public/feed/atom.xml'),
+            Path('public/sitemap.xml'),
+        ])
+
+    @patch('sys.argv', ['main', '--project-id', '1234', '--job-name', 'carl'])
+    def test_get_fingerprint_config(self):
+        args = generate.parse_arguments()
+        config = generate.get_fingerprint_config(args=args)
+
+        self.assertEqual(config['job_name'], ['carl'])
+        self.assertNotIn('private_token', config)
+        self.assertEqual(len(config['templates']), 1)
+
+        args.template_file = [generate.TEMPLATE_FOLDER / 'atom.xml']
+        self.assertNotEqual(
+            generate.get_fingerprint_config(args=args)['templates'],
+            config['templates']
+        )
+
+        args.detail_pages = True
+        self.assertEqual(
+            len(generate.get_fingerprint_config(args=args)['templates']), 2
+        )
 
     def test_get_artifact_url(self):
         web_url = 'https://brainelectronics.gitlab.io/-/asdf'
@@ -196,9 +666,108 @@ class TestGenerate(unittest.TestCase):
         )
         self.assertEqual(result, expectation)
 
-    @unittest.skip("Not yet implemented")
-    def test_save_version_info_file(self):
-        pass
+    @params(
+        ('', ''),
+        ('https://asdf/-/jobs/1/index.html',
+         'https://asdf/-/jobs/1/index.html'),
+        ('versions/0.1.0/index.html',
+         'https://site/versions/0.1.0/index.html'),
+    )
+    def test_get_absolute_url(self, url: str, expectation: str):
+        for base_url in ('https://site', 'https://site/'):
+            self.assertEqual(
+                generate.get_absolute_url(url=url, base_url=base_url),
+                expectation
+            )
+
+    @params(
+        (datetime(2023, 2, 3, 15, 4, 40), '2023-02-03T15:04:40Z'),
+        (datetime(2023, 2, 3, 15, 4, 40, tzinfo=timezone.utc),
+         '2023-02-03T15:04:40Z'),
+        (datetime(2023, 2, 3, 10, 34, 40,
+                  tzinfo=timezone(timedelta(hours=-4, minutes=-30))),
+         '2023-02-03T15:04:40Z'),
+    )
+    def test_format_utc(self, value: datetime, expectation: str):
+        result = generate.format_utc(value=value, format='%Y-%m-%dT%H:%M:%SZ')
+        self.assertEqual(result, expectation)
+
+    @params(
+        ('json', generate.VERSION_INFO_FIELD_PRESETS['minimal']),
+        ('ndjson', generate.VERSION_INFO_FIELD_PRESETS['minimal']),
+        ('compact', generate.VERSION_INFO_FIELD_PRESETS['full']),
+        ('compact', ('name', 'not_existing')),
+    )
+    def test_save_version_info_file(self,
+                                    versions_format: str,
+                                    fields: Tuple[str, ...]):
+        tag_list = [
+            create_tag_info(name='0.2.0', job_id=2),
+            create_tag_info(name='0.1.0', job_id=1),
+        ]
+
+        with TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'sub' / 'versions.json'
+            generate.save_version_info_file(
+                tag_list=tag_list,
+                file_path=file_path,
+                versions_format=versions_format,
+                fields=fields
+            )
+            content = file_path.read_text(encoding='utf-8')
+
+        if versions_format == 'ndjson':
+            result = [json.loads(line) for line in content.splitlines()]
+        else:
+            result = json.loads(content)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['name'], '0.2.0')
+        if '*' in fields:
+            self.assertEqual(result[0]['commit_info'],
+                             tag_list[0].commit.attributes)
+            self.assertIn('message', result[0])
+        else:
+            self.assertEqual(set(result[0].keys()), set(fields))
+        if 'created_at' in fields:
+            self.assertEqual(result[1]['created_at'],
+                             '2023-02-03T15:04:40+00:00')
+            self.assertEqual(result[1]['commit_id'], 'bcf014941')
+
+    def test_save_version_info_file_invalid_format(self):
+        with self.assertRaises(ValueError):
+            generate.save_version_info_file(
+                tag_list=[],
+                file_path=Path('versions.json'),
+                versions_format='xml'
+            )
+
+    @params(
+        ('minimal', generate.VERSION_INFO_FIELD_PRESETS['minimal']),
+        ('full', generate.VERSION_INFO_FIELD_PRESETS['full']),
+        ('name,job_id', ('name', 'job_id')),
+    )
+    def test_parse_version_info_fields(self,
+                                       arg: str,
+                                       expectation: Tuple[str, ...]):
+        result = generate.parse_version_info_fields(arg=arg)
+        self.assertEqual(result, expectation)
+
+        with self.assertRaises(argparse.ArgumentTypeError):
+            generate.parse_version_info_fields(arg=' , ')
+
+    @params(
+        ('*/tags=60', ('*/tags', 60.0)),
+        ('*/pipelines/*/jobs=0.5', ('*/pipelines/*/jobs', 0.5)),
+        ('a=b=1', ('a=b', 1.0)),
+    )
+    def test_parse_cache_ttl(self, arg: str, expectation: Tuple[str, float]):
+        result = generate.parse_cache_ttl(arg=arg)
+        self.assertEqual(result, expectation)
+
+        for invalid in ('*/tags', '=60', '*/tags=-1', '*/tags=soon'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                generate.parse_cache_ttl(arg=invalid)
 
     @params(
         ('index.html', None),           # use template folder of package
@@ -236,9 +805,193 @@ class TestGenerate(unittest.TestCase):
     def test_create_output_directory(self):
         pass
 
-    @unittest.skip("Not yet implemented")
     def test_create_html_files(self):
-        pass
+        tag_list = [create_tag_info(name='0.1.0', job_id=1)]
+        tag_list[0].commit.web_url = \
+            'https://gitlab.com/asdf/-/commit/bcf014941'
+
+        with TemporaryDirectory() as tmp_dir:
+            generate.create_html_files(
+                tag_list=tag_list,
+                path=Path(tmp_dir),
+                template=self._tests_directory / 'data' / 'index.txt'
+            )
+            content = (Path(tmp_dir) / 'index.txt').read_text()
+
+        self.assertIn('https://gitlab.com/asdf/-/tags/', content)
+
+    def test_create_html_files_project_url(self):
+        tag_list = [create_tag_info(name='0.1.0', job_id=1)]
+        tag_list[0].commit.web_url = \
+            'https://gitlab.com/asdf/-/commit/bcf014941'
+
+        with TemporaryDirectory() as tmp_dir:
+            generate.create_html_files(
+                tag_list=tag_list,
+                path=Path(tmp_dir),
+                template=self._tests_directory / 'data' / 'index.txt',
+                project_url='https://gitlab.com/qwertz'
+            )
+            content = (Path(tmp_dir) / 'index.txt').read_text()
+
+            self.assertIn('https://gitlab.com/qwertz/-/tags/0.1.0', content)
+
+            # all tags may be hidden as unavailable
+            generate.create_html_files(tag_list=[], path=Path(tmp_dir))
+            content = (Path(tmp_dir) / 'index.html').read_text()
+
+        self.assertNotIn('/-/tags/', content)
+
+    def test_create_html_files_pending(self):
+        tag_list = [
+            create_tag_info(name='0.3.0', job_id=-1, pending=True),
+            create_tag_info(name='0.2.0', job_id=2, pending=True),
+            create_tag_info(name='0.1.0', job_id=-1),
+        ]
+
+        with TemporaryDirectory() as tmp_dir:
+            generate.create_html_files(tag_list=tag_list, path=Path(tmp_dir))
+            content = (Path(tmp_dir) / 'index.html').read_text()
+
+        # pending tags are shown even without a job, tags without job are not
+        self.assertIn('>0.3.0</a> <span class="badge bg-secondary">Pending',
+                      content)
+        self.assertIn('>0.2.0</a> <span class="badge bg-secondary">Pending',
+                      content)
+        self.assertNotIn('>0.1.0</a>', content)
+        self.assertEqual(content.count('aria-disabled="true">Pending</a>'), 1)
+
+    def test_create_output_files(self):
+        tag_list = [
+            create_tag_info(name='0.2.0', job_id=2),
+            create_tag_info(name='0.1.0', job_id=-1),
+        ]
+        # mirrored versions are linked relative to the output folder
+        tag_list[0].pages_url = 'versions/0.2.0/index.html'
+        # feeds and sitemaps are in UTC
+        tag_list[0].created_at = datetime(
+            2023, 2, 4, 0, 30, tzinfo=timezone(timedelta(hours=1))
+        )
+        for tag in tag_list:
+            tag.commit.web_url = 'https://gitlab.com/asdf/-/commit/bcf01494'
+            tag.commit.author_name = 'brainelectronics'
+            tag.commit.title = 'Fix <things> & stuff'
+
+        with TemporaryDirectory() as tmp_dir:
+            generate.create_output_files(
+                tag_list=tag_list,
+                path=Path(tmp_dir),
+                templates=[
+                    None,
+                    generate.TEMPLATE_FOLDER / 'atom.xml',
+                    generate.TEMPLATE_FOLDER / 'sitemap.xml',
+                ],
+                outputs=[None, Path('feed/releases.xml')],
+                pages_base_url='https://brainelectronics.gitlab.io/-/asdf',
+                site_url='https://brainelectronics.gitlab.io/asdf',
+                workers=2
+            )
+            files = sorted(
+                str(x.relative_to(tmp_dir)) for x in Path(tmp_dir).rglob('*')
+                if x.is_file()
+            )
+            feed = ElementTree.parse(Path(tmp_dir) / 'feed' / 'releases.xml')
+            sitemap = ElementTree.parse(Path(tmp_dir) / 'sitemap.xml')
+
+        self.assertEqual(
+            files, ['feed/releases.xml', 'index.html', 'sitemap.xml']
+        )
+        entries = feed.findall('{http://www.w3.org/2005/Atom}entry')
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(
+            entries[0].find('{http://www.w3.org/2005/Atom}summary').text,
+            'Fix <things> & stuff'
+        )
+        self.assertEqual(
+            entries[0].find('{http://www.w3.org/2005/Atom}link').get('href'),
+            'https://brainelectronics.gitlab.io/asdf/versions/0.2.0/'
+            'index.html'
+        )
+        self.assertEqual(
+            entries[0].find('{http://www.w3.org/2005/Atom}updated').text,
+            '2023-02-03T23:30:00Z'
+        )
+        self.assertEqual(
+            feed.find('{http://www.w3.org/2005/Atom}link').get('href'),
+            'https://brainelectronics.gitlab.io/asdf/'
+        )
+        urls = sitemap.findall(
+            '{http://www.sitemaps.org/schemas/sitemap/0.9}url'
+        )
+        self.assertEqual(len(urls), 2)
+        self.assertEqual(
+            [x.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc').text
+             for x in urls],
+            ['https://brainelectronics.gitlab.io/asdf/',
+             'https://brainelectronics.gitlab.io/asdf/versions/0.2.0/'
+             'index.html']
+        )
+        self.assertEqual(
+            urls[1].find(
+                '{http://www.sitemaps.org/schemas/sitemap/0.9}lastmod'
+            ).text,
+            '2023-02-03'
+        )
+
+    @params(
+        ([], 0),
+        (['--debug', '-vvv'], 2),
+    )
+    def test_main_logging(self, arguments: List[str], expectation: int):
+        root_logger = logging.getLogger()
+        package_logger = logging.getLogger(generate.__package__)
+        self.addCleanup(root_logger.setLevel, root_logger.level)
+        self.addCleanup(package_logger.setLevel, package_logger.level)
+        # the root logger may be configured already, by the test runner
+        root_logger.setLevel(logging.INFO)
+        handler = logging.handlers.BufferingHandler(capacity=100)
+        root_logger.addHandler(handler)
+        self.addCleanup(root_logger.removeHandler, handler)
+
+        with TemporaryDirectory() as tmp_dir:
+            argv = [
+                'main', '--project-id', '1234', '--job-name', 'docs',
+                '--url', 'https://gitlab.example.com',
+                '--output-dir', tmp_dir,
+                '--detail-pages',
+                '--replay', str(self._tests_directory / 'data' /
+                                'cassettes' / 'refresh_twice.json'),
+            ]
+            with patch('sys.argv', argv + arguments):
+                generate.main()
+
+        # the loggers of all modules follow the debug option
+        self.assertEqual(len(handler.buffer), expectation)
+
+    def test_main_skip_unchanged_unknown_total(self):
+        with TemporaryDirectory() as tmp_dir:
+            argv = [
+                'main', '--project-id', '1234', '--job-name', 'docs',
+                '--url', 'https://gitlab.example.com',
+                '--output-dir', tmp_dir,
+                '--skip-unchanged',
+                '--replay', str(self._tests_directory / 'data' /
+                                'cassettes' / 'refresh_twice.json'),
+            ]
+            # no fingerprint without the total number of tags
+            with patch('sys.argv', argv), \
+                    patch.object(generator.VersionedPagesGenerator,
+                                 'fingerprint',
+                                 return_value=None), \
+                    patch.object(generate,
+                                 'create_output_directory',
+                                 wraps=generate.create_output_directory
+                                 ) as mock:
+                generate.main()
+                generate.main()
+
+        # the second run is not skipped
+        self.assertEqual(mock.call_count, 2)
 
     '''
     @patch('sys.argv', ['main', '--debug'])
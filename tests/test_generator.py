@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the in-process generator API"""
+
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, List
+import json
+import unittest
+
+from lightweight_versioned_gitlab_pages import cassette, generate, generator
+
+CASSETTE = Path(__file__).parent / 'data' / 'cassettes' / 'refresh_twice.json'
+
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        self._tmp_dir = TemporaryDirectory()
+        self._path = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _create_generator(self, **kwargs: Any) -> generator.\
+            VersionedPagesGenerator:
+        return generator.VersionedPagesGenerator(
+            project_id=1234,
+            url='https://gitlab.example.com',
+            artifact_jobs=[generate.ArtifactJob(name='docs')],
+            session=cassette.ReplaySession(path=CASSETTE),
+            **kwargs
+        )
+
+    def test_get_fetcher(self):
+        def fetcher(**kwargs: Any) -> List[generate.TagInfo]:
+            return []
+
+        self.assertIs(generator.get_fetcher(fetcher='serial', workers=2),
+                      generate.get_project_tags)
+        self.assertIs(generator.get_fetcher(fetcher=fetcher, workers=2),
+                      fetcher)
+
+        result = generator.get_fetcher(fetcher='threaded', workers=2)
+        self.assertIsInstance(result, partial)
+        self.assertEqual(result.keywords, {'workers': 2, 'raw': False})
+
+        result = generator.get_fetcher(fetcher='serial', workers=2, raw=True)
+        self.assertEqual(result.keywords, {'raw': True})
+
+        result = generator.get_fetcher(fetcher='bulk', workers=2, raw=True)
+        self.assertIs(result.func, generate.get_project_tags_graphql)
+        self.assertEqual(result.keywords, {'workers': 2, 'raw': True})
+
+        with self.assertRaises(ValueError):
+            generator.get_fetcher(fetcher='async', workers=2)
+
+    def test_refresh_render(self):
+        pages = self._create_generator(fetcher='threaded', workers=2)
+
+        # the project is fetched once, the tags on every refresh
+        for _ in range(2):
+            tag_list = pages.refresh()
+
+            self.assertEqual([x.tag.name for x in tag_list], ['0.1.0'])
+            self.assertEqual(tag_list[0].job_id, 8)
+            self.assertEqual(pages.pending, 0)
+            self.assertEqual(pages.stats,
+                             {'commits': 1, 'pipelines': 1, 'coalesced': 0})
+
+            pages.render(
+                path=self._path,
+                templates=[None, generate.TEMPLATE_FOLDER / 'sitemap.xml'],
+                versions_format='json'
+            )
+
+        self.assertEqual(pages.web_url, 'https://qwertz.gitlab.io/-/asdf')
+        self.assertEqual(pages.site_url, 'https://qwertz.gitlab.io/asdf')
+        self.assertEqual(len(pages._environments), 1)
+        self.assertIn('0.1.0', (self._path / 'index.html').read_text())
+        self.assertIn('<loc>https://qwertz.gitlab.io/asdf/</loc>',
+                      (self._path / 'sitemap.xml').read_text())
+        versions = json.loads((self._path / 'versions.json').read_text())
+        self.assertEqual(versions[0]['pages_url'],
+                         'https://qwertz.gitlab.io/-/asdf/-/jobs/8/'
+                         'artifacts/public/index.html')
+
+        with self.assertRaises(cassette.CassetteError):
+            pages.refresh()
+
+    def test_refresh_custom_fetcher(self):
+        calls = []
+
+        def fetcher(**kwargs: Any) -> List[generate.TagInfo]:
+            calls.append(kwargs)
+            return []
+
+        pages = self._create_generator(fetcher=fetcher,
+                                       pages_base_url='https://pages')
+
+        self.assertEqual(pages.refresh(deadline=1.0), [])
+        self.assertEqual(calls[0]['job_name'], 'docs')
+        self.assertEqual(calls[0]['web_url'], 'https://pages')
+        self.assertEqual(calls[0]['deadline'], 1.0)
+        self.assertEqual(calls[0]['project'].id, 1234)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the GraphQL fetch backend"""
+
+from datetime import datetime, timezone
+from gitlab import Gitlab
+from gitlab.v4.objects.projects import Project
+from gitlab.v4.objects.tags import ProjectTag
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+from pathlib import Path
+from threading import Thread
+from typing import Any, Dict, List, Optional
+import unittest
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+from lightweight_versioned_gitlab_pages import generate, graphql
+
+RECORDINGS = Path(__file__).parent / 'data' / 'graphql'
+
+
+class GraphQLStandIn(BaseHTTPRequestHandler):
+    """
+    Serve recorded GraphQL responses based on the query and cursor, and the
+    REST responses of the same project based on the path
+    """
+    requests: List[Dict[str, Any]] = []
+    errors = False
+
+    def do_GET(self) -> None:
+        url = 'http://{}:{}'.format(*self.server.server_address[:2])
+        recording = json.loads((RECORDINGS / 'rest.json').read_text())
+        path = urlsplit(self.path).path
+
+        if path not in recording:
+            self.send_error(404)
+            return
+
+        content = json.dumps(recording[path]).replace('{url}', url).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self) -> None:
+        length = int(self.headers['Content-Length'])
+        body = json.loads(self.rfile.read(length))
+        self.requests.append(body)
+
+        if self.errors:
+            recording = 'errors.json'
+        elif 'query PipelineJobs' in body['query']:
+            recording = 'pipeline_jobs_{}.json'.format(
+                body['variables']['iid']
+            )
+        elif body['variables']['after'] is None:
+            recording = 'tag_pipelines_1.json'
+        else:
+            recording = 'tag_pipelines_2.json'
+
+        content = (RECORDINGS / recording).read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestGraphQL(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        GraphQLStandIn.requests = []
+        GraphQLStandIn.errors = False
+        self._server = HTTPServer(('127.0.0.1', 0), GraphQLStandIn)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        url = 'http://127.0.0.1:{}'.format(self._server.server_port)
+        self._gl = Gitlab(url=url)
+        self._project = Project(self._gl.projects, {
+            'id': 43170198,
+            'path_with_namespace':
+                'brainelectronics/lightweight-versioned-gitlab-pages',
+        })
+        # the tags are listed by REST, as returned by the stand-in
+        recording = json.loads((RECORDINGS / 'rest.json').read_text())
+        self._project_tags = [
+            ProjectTag(self._project.tags, x, created_from_list=True)
+            for x in recording['/api/v4/projects/43170198/repository/tags']
+        ]
+        self._list_patch = patch.object(self._project.tags, 'list',
+                                        return_value=self._project_tags)
+        self._list_patch.start()
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._list_patch.stop()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def test_parse_global_id(self):
+        result = graphql.parse_global_id(gid='gid://gitlab/Ci::Build/3575')
+        self.assertEqual(result, 3575)
+
+    def test_get_tag_pipelines(self):
+        pipelines = list(graphql.get_tag_pipelines(
+            gl=self._gl,
+            full_path='brainelectronics/lightweight-versioned-gitlab-pages'
+        ))
+
+        self.assertEqual(
+            [x['tag'] for x in pipelines], ['0.3.2', '0.3.1', '0.3.0']
+        )
+        self.assertEqual(
+            [x['name'] for x in pipelines[0]['jobs']],
+            ['pages', 'deploy', 'generate-docs']
+        )
+        # the last pipeline of the commit of 0.3.1 is a branch pipeline
+        self.assertEqual(pipelines[1]['ref'], 'main')
+        self.assertEqual(
+            [x['name'] for x in pipelines[1]['jobs']],
+            ['pages', 'generate-docs']
+        )
+        self.assertEqual(len(GraphQLStandIn.requests), 4)
+        self.assertEqual(
+            GraphQLStandIn.requests[0]['variables']['jobsFirst'], 100
+        )
+        self.assertEqual(
+            GraphQLStandIn.requests[1]['variables']['iid'], '22'
+        )
+        self.assertEqual(
+            GraphQLStandIn.requests[1]['variables']['first'], 100
+        )
+        self.assertEqual(
+            GraphQLStandIn.requests[2]['variables']['iid'], '23'
+        )
+        self.assertIsNone(GraphQLStandIn.requests[2]['variables']['after'])
+
+    def test_get_tag_pipelines_refs(self):
+        full_path = 'brainelectronics/lightweight-versioned-gitlab-pages'
+
+        # pipelines of deleted tags are skipped
+        pipelines = list(graphql.get_tag_pipelines(
+            gl=self._gl,
+            full_path=full_path,
+            refs={'0.3.2', '0.3.0', '0.2.0'}
+        ))
+        self.assertEqual([x['tag'] for x in pipelines], ['0.3.2', '0.3.0'])
+
+        # no further page is fetched once all tags are found
+        GraphQLStandIn.requests = []
+        pipelines = list(graphql.get_tag_pipelines(
+            gl=self._gl,
+            full_path=full_path,
+            refs={'0.3.2'}
+        ))
+        self.assertEqual([x['tag'] for x in pipelines], ['0.3.2'])
+        self.assertEqual(len(GraphQLStandIn.requests), 2)
+
+    def test_get_tag_pipelines_errors(self):
+        GraphQLStandIn.errors = True
+
+        with self.assertRaises(graphql.GraphQLError) as ctx:
+            list(graphql.get_tag_pipelines(gl=self._gl, full_path='asdf'))
+
+        self.assertIn("Field 'pipelines' doesn't exist", str(ctx.exception))
+
+    def test_get_project_tags_graphql(self):
+        web_url = 'https://brainelectronics.gitlab.io/-/asdf'
+        tags = generate.get_project_tags_graphql(
+            project=self._project,
+            job_name='generate-docs',
+            web_url=web_url
+        )
+
+        self.assertEqual(
+            [x.tag.name for x in tags], ['0.3.2', '0.3.1', '0.3.0']
+        )
+        self.assertEqual(tags[0].job_id, 3575328540)
+        self.assertEqual(tags[0].pages_url, generate.get_artifact_url(
+            web_url=web_url,
+            job_id=3575328540,
+            folder='public',
+            index_file='index.html'
+        ))
+        self.assertEqual(tags[0].job_ids, [
+            {'pages': 3575328560},
+            {'deploy': 3575328552},
+            {'generate-docs': 3575328540},
+        ])
+        self.assertEqual(
+            tags[0].created_at,
+            datetime(2023, 1, 14, 10, 26, 42, tzinfo=timezone.utc)
+        )
+        self.assertEqual(tags[0].artifacts_expire_at,
+                         datetime(2023, 2, 13, 10, 30, tzinfo=timezone.utc))
+        self.assertEqual(
+            tags[0].tag.attributes['commit']['id'],
+            '23fb4d72b5ac1a35e07a7c3c5e1d2ab1f3a54a3e'
+        )
+        self.assertEqual(tags[0].tag.message, '')
+        self.assertIsNone(tags[0].tag.release)
+        self.assertFalse(tags[0].tag.protected)
+        self.assertEqual(tags[0].commit.short_id, '23fb4d72')
+        self.assertEqual(tags[0].commit.last_pipeline['id'], 771143290)
+        self.assertEqual(tags[0].commit.last_pipeline['source'], 'push')
+        self.assertEqual(
+            tags[0].commit.last_pipeline['web_url'],
+            '{}/brainelectronics/lightweight-versioned-gitlab-pages/-/'
+            'pipelines/771143290'.format(self._gl.url)
+        )
+        self.assertEqual(tags[1].job_id, 3575400001)
+        self.assertEqual(tags[1].commit.last_pipeline['ref'], 'main')
+        self.assertEqual(tags[2].job_id, -1)
+        self.assertEqual(tags[2].pages_url, '')
+
+        # the pipeline of a deleted tag is not returned
+        del self._project_tags[1]
+        tags = generate.get_project_tags_graphql(
+            project=self._project,
+            job_name='generate-docs',
+            web_url=web_url
+        )
+
+        self.assertEqual([x.tag.name for x in tags], ['0.3.2', '0.3.0'])
+
+    def test_get_project_tags_graphql_rest(self):
+        web_url = 'https://brainelectronics.gitlab.io/-/asdf'
+        rest_tags = generate.get_project_tags(
+            project=self._project,
+            job_name='generate-docs',
+            web_url=web_url
+        )
+        tags = generate.get_project_tags_graphql(
+            project=self._project,
+            job_name='generate-docs',
+            web_url=web_url
+        )
+
+        # tags without any pipeline are skipped by both backends
+        self.assertEqual([x.tag.name for x in rest_tags],
+                         ['0.3.2', '0.3.1', '0.3.0'])
+        self.assertEqual([x.tag.name for x in tags],
+                         [x.tag.name for x in rest_tags])
+
+        fields = generate.VERSION_INFO_FIELD_PRESETS['full']
+        for tag, rest_tag in zip(tags, rest_tags):
+            info = generate.get_version_info(tag=tag, fields=fields)
+            rest_info = generate.get_version_info(tag=rest_tag, fields=fields)
+            # the commits of the GraphQL backend have no stats
+            del rest_info['commit_info']['stats']
+
+            self.assertEqual(info, rest_info)
+            self.assertEqual(tag.created_at, rest_tag.created_at)
+            self.assertEqual(tag.job_ids, rest_tag.job_ids)
+            self.assertEqual(tag.job_statuses, rest_tag.job_statuses)
+            self.assertEqual(tag.artifacts_expire_at,
+                             rest_tag.artifacts_expire_at)
+
+    def test_get_project_tags_graphql_fallback(self):
+        GraphQLStandIn.errors = True
+        expectation: List[Optional[generate.TagInfo]] = []
+
+        with patch.object(generate,
+                          'get_project_tags',
+                          return_value=expectation) as mock:
+            tags = generate.get_project_tags_graphql(
+                project=self._project,
+                job_name='generate-docs',
+                web_url='asdf',
+                workers=4,
+                raw=True
+            )
+
+        self.assertIs(tags, expectation)
+        mock.assert_called_once_with(
+            project=self._project,
+            job_name='generate-docs',
+            web_url='asdf',
+            artifact_jobs=None,
+            deadline=None,
+            workers=4,
+            coalescer=None,
+            raw=True
+        )
+
+    def test_get_project_tags_graphql_deadline(self):
+        tags = generate.get_project_tags_graphql(
+            project=self._project,
+            job_name='generate-docs',
+            web_url='asdf',
+            deadline=0.0
+        )
+
+        self.assertEqual([x.tag.name for x in tags],
+                         ['0.3.2', '0.3.1', '0.3.0', '0.2.0'])
+        self.assertEqual([x.pending for x in tags],
+                         [False, True, True, True])
+        self.assertEqual(tags[0].job_id, 3575328540)
+        self.assertEqual(tags[1].commit.id,
+                         'bcf01494d9d5d4b6ff44a7d0b5a0f0b3a7fd4fb8')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the conditional request cache of API responses"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
+from nose2.tools import params
+from pathlib import Path
+from requests import Request, Session
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import Any, List, Optional
+import unittest
+
+from lightweight_versioned_gitlab_pages import httpcache
+
+
+class ETagStandIn(BaseHTTPRequestHandler):
+    """Serve tags with an ETag and answer matching requests with a 304"""
+    requests: List[Optional[str]] = []
+    content = json.dumps([{'name': '0.1.0'}, {'name': '0.2.0'}]).encode()
+
+    def do_GET(self) -> None:
+        self.requests.append(self.headers.get('If-None-Match'))
+
+        if self.path.startswith('/plain'):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(self.content)))
+            self.end_headers()
+            self.wfile.write(self.content)
+        elif self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(self.content)))
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write(self.content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        ETagStandIn.requests = []
+        self._server = HTTPServer(('127.0.0.1', 0), ETagStandIn)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._url = 'http://127.0.0.1:{}'.format(self._server.server_port)
+
+        self._tmp_dir = TemporaryDirectory()
+        self._path = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._tmp_dir.cleanup()
+
+    def _get_session(self, cache: httpcache.ResponseCache) -> Session:
+        return httpcache.create_session(pool_size=1, cache=cache)
+
+    def test_create_session(self):
+        session = httpcache.create_session(pool_size=3)
+        adapter = session.get_adapter('https://gitlab.com')
+
+        self.assertNotIsInstance(adapter, httpcache.CachingAdapter)
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+        cache = httpcache.ResponseCache(path=self._path)
+        session = httpcache.create_session(pool_size=2, cache=cache)
+        adapter = session.get_adapter('https://gitlab.com')
+
+        self.assertIsInstance(adapter, httpcache.CachingAdapter)
+        self.assertIs(adapter.cache, cache)
+        self.assertEqual(adapter._pool_maxsize, 2)
+
+    def test_revalidate(self):
+        url = self._url + '/api/v4/projects/1/repository/tags'
+
+        # every run creates its own cache and session on the same folder
+        for _ in range(2):
+            cache = httpcache.ResponseCache(path=self._path)
+            response = self._get_session(cache=cache).get(url)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()[1]['name'], '0.2.0')
+            self.assertEqual(response.headers['ETag'], '"v1"')
+
+        self.assertEqual(ETagStandIn.requests, [None, '"v1"'])
+        self.assertEqual(cache.stats, {
+            'hits': 0, 'revalidated': 1, 'misses': 0, 'evicted': 0
+        })
+        self.assertEqual(len(list(self._path.glob('*.json'))), 1)
+
+    def test_ttl(self):
+        cache = httpcache.ResponseCache(
+            path=self._path,
+            ttls=[('*/jobs', 0), ('*/tags', 60)]
+        )
+        session = self._get_session(cache=cache)
+
+        for _ in range(3):
+            response = session.get(self._url + '/api/v4/projects/1/'
+                                   'repository/tags')
+            self.assertEqual(response.json()[0]['name'], '0.1.0')
+
+        self.assertEqual(ETagStandIn.requests, [None])
+        self.assertEqual(cache.stats['hits'], 2)
+
+        # responses without validators are only kept with a time to live
+        for path in ('/plain', '/plain/tags'):
+            for _ in range(2):
+                session.get(self._url + path)
+
+        self.assertEqual(len(ETagStandIn.requests), 4)
+        self.assertEqual(cache.stats['misses'], 4)
+
+    def test_not_cached(self):
+        cache = httpcache.ResponseCache(path=self._path)
+        session = self._get_session(cache=cache)
+
+        for _ in range(2):
+            response = session.get(self._url + '/tags', stream=True)
+            self.assertEqual(response.json()[0]['name'], '0.1.0')
+
+        self.assertEqual(ETagStandIn.requests, [None, None])
+        self.assertEqual(cache.stats['misses'], 0)
+        self.assertFalse(self._path.exists() and any(self._path.iterdir()))
+
+    @params(
+        ({'PRIVATE-TOKEN': 'a'}, {'PRIVATE-TOKEN': 'b'}),
+        ({'PRIVATE-TOKEN': 'a'}, {'JOB-TOKEN': 'a'}),
+        ({}, {'Authorization': 'Bearer a'}),
+    )
+    def test_get_cache_key(self, first: dict, second: dict):
+        keys = [
+            httpcache.get_cache_key(request=Request(
+                'GET', self._url + '/tags', headers=headers
+            ).prepare()) for headers in (first, second, first)
+        ]
+
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(keys[0], keys[2])
+
+    def test_evict(self):
+        entry = {'url': 'x', 'stored_at': 0, 'response': {'body': 'a' * 300}}
+        size = len(json.dumps(dict(entry, version=httpcache.CACHE_VERSION)))
+        cache = httpcache.ResponseCache(path=self._path, max_size=3 * size)
+
+        for index in range(3):
+            cache.store(key=str(index), entry=entry)
+            # the file system time resolution may be too coarse
+            os.utime(self._path / '{}.json'.format(index), (index, index))
+
+        # the oldest entry is used again, the next oldest one is removed
+        self.assertIsNotNone(cache.load(key='0'))
+        cache.store(key='3', entry=entry)
+
+        self.assertEqual(
+            sorted(x.stem for x in self._path.glob('*.json')),
+            ['0', '2', '3']
+        )
+        self.assertEqual(cache.stats['evicted'], 1)
+        self.assertIsNone(cache.load(key='1'))
+
+        # the use order of another run is taken from the modification times
+        for index, key in enumerate(('2', '0', '3')):
+            os.utime(self._path / '{}.json'.format(key), (index, index))
+
+        cache = httpcache.ResponseCache(path=self._path, max_size=3 * size)
+        cache.store(key='4', entry=entry)
+        cache.store(key='3', entry=entry)
+        cache.store(key='5', entry=entry)
+
+        self.assertEqual(
+            sorted(x.stem for x in self._path.glob('*.json')),
+            ['3', '4', '5']
+        )
+        self.assertEqual(cache.stats['evicted'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the artifact mirroring"""
+
+from io import BytesIO
+from pathlib import Path
+from requests import Response
+from tempfile import TemporaryDirectory
+from time import monotonic
+from typing import Dict
+import unittest
+from unittest.mock import MagicMock
+import zipfile
+
+from lightweight_versioned_gitlab_pages import mirror
+from tests.helpers import create_tag_info
+
+
+class TestMirror(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        self._archives: Dict[int, bytes] = {}
+        self._project = MagicMock()
+        self._project.id = 1234
+        self._project.manager.gitlab.http_get.side_effect = self._http_get
+
+        self._tmp_dir = TemporaryDirectory()
+        self._path = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _http_get(self, path: str, **kwargs) -> Response:
+        job_id = int(path.split('/')[-2])
+        response = Response()
+        response.status_code = 200
+        response.raw = BytesIO(self._archives[job_id])
+
+        return response
+
+    def _create_archive(self, files: Dict[str, bytes]) -> bytes:
+        content = BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            for name, data in files.items():
+                archive.writestr(name, data)
+
+        return content.getvalue()
+
+    def test_get_version_folder_name(self):
+        result = mirror.get_version_folder_name(tag_name='release/1.0')
+        self.assertEqual(result, 'release_1.0')
+
+    def test_download_artifacts_too_large(self):
+        self._archives[1] = b'x' * 100
+
+        with self.assertRaises(mirror.MirrorError):
+            mirror.download_artifacts(
+                project=self._project,
+                job_id=1,
+                file=BytesIO(),
+                max_size=99
+            )
+
+    def test_extract_artifacts(self):
+        archive = self._create_archive({
+            'public/index.html': b'<html></html>',
+            'public/_static/style.css': b'body {}',
+            'reports/junit.xml': b'<xml/>',
+        })
+
+        mirror.extract_artifacts(
+            file=BytesIO(archive),
+            folder='public',
+            target=self._path,
+            max_size=1024
+        )
+
+        files = sorted(
+            str(x.relative_to(self._path)) for x in self._path.rglob('*')
+            if x.is_file()
+        )
+        self.assertEqual(files, ['_static/style.css', 'index.html'])
+
+        with self.assertRaises(mirror.MirrorError):
+            mirror.extract_artifacts(
+                file=BytesIO(archive),
+                folder='public',
+                target=self._path,
+                max_size=10
+            )
+
+    def test_extract_artifacts_invalid_path(self):
+        archive = self._create_archive({'public/../../evil.sh': b'rm -rf /'})
+
+        with self.assertRaises(mirror.MirrorError):
+            mirror.extract_artifacts(
+                file=BytesIO(archive),
+                folder='public',
+                target=self._path,
+                max_size=1024
+            )
+
+    def test_mirror_artifacts(self):
+        self._archives[2] = self._create_archive({
+            'public/index.html': b'0.2.0',
+        })
+        self._archives[3] = self._create_archive({
+            'public/index.html': b'0.3.0',
+        })
+        self._archives[4] = b'no zip file'
+
+        versions = self._path / mirror.VERSIONS_FOLDER
+        (versions / '0.1.0').mkdir(parents=True)
+        (versions / '0.3.0').mkdir(parents=True)
+        (versions / '0.3.0' / mirror.MARKER_FILE).write_text('3')
+        (versions / '0.3.0' / 'index.html').write_text('cached')
+        # detail pages are only kept for existing tags
+        (versions / '0.3.0.html').write_text('details')
+        (versions / '0.1.0.html').write_text('details')
+
+        tag_list = [
+            create_tag_info(name='0.4.0', job_id=4),
+            create_tag_info(name='0.3.0', job_id=3),
+            create_tag_info(name='0.2.0', job_id=2),
+            create_tag_info(name='0.0.1', job_id=-1),
+        ]
+
+        result = mirror.mirror_artifacts(
+            project=self._project,
+            tag_list=tag_list,
+            path=self._path,
+            workers=2
+        )
+
+        self.assertEqual(
+            result,
+            {'mirrored': 1, 'skipped': 1, 'failed': 1, 'deferred': 0,
+             'pruned': 2}
+        )
+        self.assertEqual(self._project.manager.gitlab.http_get.call_count, 2)
+        self.assertEqual(
+            sorted(x.name for x in versions.iterdir()),
+            ['0.2.0', '0.3.0', '0.3.0.html']
+        )
+        self.assertEqual((versions / '0.2.0' / 'index.html').read_text(),
+                         '0.2.0')
+        self.assertEqual((versions / '0.3.0' / 'index.html').read_text(),
+                         'cached')
+        self.assertTrue(tag_list[0].pages_url.startswith('https://'))
+        self.assertEqual(tag_list[1].pages_url, 'versions/0.3.0/index.html')
+        self.assertEqual(tag_list[2].pages_url, 'versions/0.2.0/index.html')
+        self.assertEqual(tag_list[2].jobs['docs'].pages_url,
+                         'versions/0.2.0/index.html')
+
+    def test_mirror_artifacts_deadline(self):
+        self._archives[2] = self._create_archive({
+            'public/index.html': b'0.2.0',
+        })
+        versions = self._path / mirror.VERSIONS_FOLDER
+        (versions / '0.3.0').mkdir(parents=True)
+        (versions / '0.3.0' / mirror.MARKER_FILE).write_text('3')
+
+        tag_list = [
+            create_tag_info(name='0.3.0', job_id=3),
+            create_tag_info(name='0.2.0', job_id=2),
+        ]
+
+        # mirrored versions are linked, no download is started
+        result = mirror.mirror_artifacts(
+            project=self._project,
+            tag_list=tag_list,
+            path=self._path,
+            deadline=monotonic() - 1
+        )
+
+        self.assertEqual(result['skipped'], 1)
+        self.assertEqual(result['deferred'], 1)
+        self.assertFalse(self._project.manager.gitlab.http_get.called)
+        self.assertEqual(tag_list[0].pages_url, 'versions/0.3.0/index.html')
+        self.assertTrue(tag_list[1].pages_url.startswith('https://'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the artifact availability verification"""
+
+from datetime import datetime, timedelta, timezone
+from nose2.tools import params
+from requests.exceptions import ConnectionError
+import unittest
+from unittest.mock import MagicMock
+
+from lightweight_versioned_gitlab_pages import probe
+from tests.helpers import create_tag_info
+
+
+class TestProbe(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        pass
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        pass
+
+    def test_is_url_available(self):
+        session = MagicMock()
+
+        session.head.return_value.status_code = 200
+        self.assertTrue(probe.is_url_available(session, 'url', timeout=1))
+        session.head.assert_called_once_with(
+            'url', allow_redirects=False, timeout=1
+        )
+
+        session.head.return_value.status_code = 404
+        self.assertFalse(probe.is_url_available(session, 'url', timeout=1))
+
+        session.head.side_effect = ConnectionError()
+        self.assertIsNone(probe.is_url_available(session, 'url', timeout=1))
+
+    @params(
+        ('/-/asdf/-/jobs/1/artifacts/public/', True),
+        ('https://asdf.gitlab.io/-/asdf/-/jobs/1/artifacts/public/', True),
+        ('https://gitlab.com/oauth/authorize?client_id=1', False),
+        ('https://asdf.gitlab.io/users/sign_in', False),
+        ('/users/sign_in/', False),
+    )
+    def test_is_url_available_redirect(self, location: str, expectation: bool):
+        url = 'https://asdf.gitlab.io/-/asdf/-/jobs/1/artifacts/public'
+        session = MagicMock()
+        session.head.return_value.status_code = 302
+        session.head.return_value.headers = {'Location': location}
+
+        self.assertEqual(probe.is_url_available(session, url, timeout=1),
+                         expectation)
+
+    def test_probe_artifacts(self):
+        now = datetime.now(timezone.utc)
+        expired = create_tag_info(job_id=1,
+                                  artifacts_expire_at=now - timedelta(days=1))
+        not_expired = create_tag_info(
+            job_id=2,
+            artifacts_expire_at=now + timedelta(days=1)
+        )
+        online = create_tag_info(job_id=3)
+        offline = create_tag_info(job_id=4)
+        no_job = create_tag_info(job_id=-1)
+
+        def head(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200 if '/3/' in url else 404
+            return response
+
+        session = MagicMock()
+        session.head.side_effect = head
+
+        probe.probe_artifacts(
+            tag_list=[expired, not_expired, online, offline, no_job],
+            workers=2,
+            session=session
+        )
+
+        self.assertFalse(expired.available)
+        self.assertTrue(not_expired.available)
+        self.assertTrue(online.available)
+        self.assertFalse(offline.available)
+        self.assertIsNone(no_job.available)
+        self.assertEqual(session.head.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()